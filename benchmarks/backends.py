@@ -0,0 +1,164 @@
+# benchmarks/backends.py
+"""存储后端基准
+
+对每个已注册的后端，在不同任务数下执行同一组操作，输出各操作耗时的对比表：
+
+    load    用 import_tasks 批量写入初始任务 (只执行一次，报告每秒任务数)
+    add     add_task 添加一个任务
+    filter  get_tasks_page 按分类和完成状态筛选一页 (50 个)
+    search  search_tasks 搜索关键词，最多 50 个结果
+    update  update_task 切换一个任务的完成状态
+    delete  delete_task 删除一个任务
+
+每个操作执行 --ops 次，报告中位数和 p90。数据写入临时目录，结束后删除。
+JSON 后端每次写入都整体重写文件，默认只在 JSON_MAX_SIZE 个任务以内测量。
+
+用法 (在仓库根目录)::
+
+    python benchmarks/backends.py
+    python benchmarks/backends.py --sizes 1000,100000 --backends sqlite,journal --json backends.json
+"""
+import argparse
+import gc
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from todo_app.cli.backends import available_backends  # noqa: E402
+from todo_app.cli.core import TaskManager  # noqa: E402
+
+OPERATIONS = ('add', 'filter', 'search', 'update', 'delete')
+DEFAULT_SIZES = '1000,100000,1000000'
+# 超过此任务数时跳过 JSON 后端 (--all 时不跳过)
+JSON_MAX_SIZE = 100000
+WORDS = ('报告', '会议', '复盘', 'review', 'deploy', 'invoice', '采购', '面试', 'refactor', '培训')
+CATEGORIES = ('工作', '学习', '生活', '健康', '财务')
+
+
+def generate_records(size, seed):
+    """生成 size 个任务记录，约四分之一已完成"""
+    rng = random.Random(seed)
+    for i in range(size):
+        yield {
+            'name': f'{rng.choice(WORDS)} {rng.choice(WORDS)} {i}',
+            'date': f'2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+            'category': rng.choice(CATEGORIES),
+            'done': rng.random() < 0.25,
+        }
+
+
+def percentile(values, percent):
+    """最近秩法的百分位数"""
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))]
+
+
+def measure(func, runs):
+    """执行 func(i) runs 次，返回每次的耗时（毫秒）"""
+    timings = []
+    for i in range(runs):
+        started = time.perf_counter()
+        func(i)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def run_backend(name, size, runs, seed):
+    """在临时目录中测量一个后端，返回 {操作: 结果}"""
+    rng = random.Random(seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as data_dir:
+        manager = TaskManager(storage_type=name, data_dir=data_dir)
+        try:
+            started = time.perf_counter()
+            summary = manager.import_tasks(generate_records(size, seed))
+            elapsed = time.perf_counter() - started
+            results['load'] = {'rows_per_s': round(summary['imported'] / elapsed) if elapsed > 0 else None}
+            ids = [task['id'] for task in manager.export_tasks()]
+            # 基准之间的垃圾回收暂停计入耗时会放大抖动
+            gc.collect()
+
+            operations = {
+                'add': lambda i: manager.add_task(f'{WORDS[i % len(WORDS)]} 新任务 {i}', '2025-06-01', '工作'),
+                'filter': lambda i: manager.get_tasks_page(
+                    filter_done=bool(i % 2), category=CATEGORIES[i % len(CATEGORIES)], page_size=50),
+                'search': lambda i: manager.search_tasks(f'{WORDS[i % len(WORDS)]} {i % 10}', limit=50),
+                'update': lambda i: manager.update_task(rng.choice(ids), {'done': bool(i % 2)}),
+                'delete': lambda i: manager.delete_task(ids.pop(rng.randrange(len(ids)))),
+            }
+            for operation in OPERATIONS:
+                timings = measure(operations[operation], runs)
+                results[operation] = {
+                    'p50_ms': round(statistics.median(timings), 3),
+                    'p90_ms': round(percentile(timings, 90), 3),
+                    'mean_ms': round(statistics.mean(timings), 3),
+                }
+        finally:
+            manager.close()
+    return results
+
+
+def print_table(size, backends, results):
+    """打印一个任务数下各后端的对比表：每行一个操作，每列一个后端"""
+    print(f"\n任务数 {size}  (p50 / p90 毫秒，load 为每秒写入任务数)")
+    print(f"{'操作':<8}" + ''.join(f"{name:>22}" for name in backends))
+    for operation in ('load',) + OPERATIONS:
+        cells = []
+        for name in backends:
+            result = results.get(name, {}).get(operation)
+            if result is None:
+                cells.append('跳过')
+            elif operation == 'load':
+                cells.append(f"{result['rows_per_s']}/s")
+            else:
+                cells.append(f"{result['p50_ms']:.3f} / {result['p90_ms']:.3f}")
+        print(f"{operation:<8}" + ''.join(f"{cell:>22}" for cell in cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='在相同负载下比较各存储后端')
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help=f'任务数，逗号分隔（默认 {DEFAULT_SIZES}）')
+    parser.add_argument('--backends', default=','.join(available_backends()),
+                        help='要测量的后端，逗号分隔（默认全部已注册的后端）')
+    parser.add_argument('--ops', type=int, default=200, help='每个操作的执行次数（默认 200）')
+    parser.add_argument('--seed', type=int, default=42, help='随机数种子（默认 42）')
+    parser.add_argument('--all', action='store_true', help=f'任务数超过 {JSON_MAX_SIZE} 时也测量 JSON 后端')
+    parser.add_argument('--json', help='将结果写入 JSON 文件，便于在不同提交之间比较')
+    args = parser.parse_args()
+
+    try:
+        sizes = sorted(int(size) for size in args.sizes.split(','))
+    except ValueError:
+        parser.error('--sizes 必须是逗号分隔的整数')
+    backends = [name for name in args.backends.split(',') if name]
+    unknown = set(backends) - set(available_backends())
+    if unknown:
+        parser.error(f"未知的后端: {', '.join(sorted(unknown))}")
+    if args.ops < 1:
+        parser.error('--ops 必须大于 0')
+
+    report = {'python': sys.version.split()[0], 'ops': args.ops, 'seed': args.seed, 'results': {}}
+    for size in sizes:
+        results = {}
+        for name in backends:
+            if name == 'json' and size > JSON_MAX_SIZE and not args.all:
+                continue
+            print(f"测量 {name}，{size} 个任务…", file=sys.stderr)
+            results[name] = run_backend(name, size, min(args.ops, max(size // 2, 1)), args.seed)
+        report['results'][str(size)] = results
+        print_table(size, backends, results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+# benchmarks/startup.py
+"""命令行启动耗时基准
+
+每次调用命令行都要启动解释器并导入模块，脚本中频繁调用时这部分开销决定了整体耗时。
+本脚本测量两项指标：
+
+    1. 各命令的端到端耗时：启动子进程执行 python -m todo_app.cli.cli <参数>，取中位数
+    2. 导入耗时：python -X importtime 输出中 todo_app.cli.cli 的累计耗时，以及自身耗时最多的模块
+
+测量前先编译 todo_app 下的 .pyc：设置了 PYTHONDONTWRITEBYTECODE 时解释器不会写入缓存，
+修改过的模块每次都要重新编译，测得的就不是日常使用时的启动耗时。
+
+用法 (在仓库根目录)::
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 50 --json startup.json
+"""
+import argparse
+import compileall
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+CLI_MODULE = 'todo_app.cli.cli'
+# 默认测量的命令：--help 不需要存储，list 需要打开存储并读取任务
+DEFAULT_COMMANDS = ('--help', 'list')
+
+
+def time_command(args, runs):
+    """执行命令 runs 次，返回每次的耗时（毫秒）"""
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, '-m', CLI_MODULE, *args],
+            cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def import_times(module):
+    """用 -X importtime 导入模块，返回 {模块名: (自身耗时, 累计耗时)}，单位微秒"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description='测量命令行的启动耗时')
+    parser.add_argument('--runs', type=int, default=20, help='每个命令的执行次数（默认 20）')
+    parser.add_argument('--top', type=int, default=10, help='列出自身导入耗时最多的模块数（默认 10）')
+    parser.add_argument('--command', action='append', dest='commands',
+                        help='要测量的命令参数，可多次指定（默认 --help 和 list）')
+    parser.add_argument('--json', help='将结果写入 JSON 文件，便于在不同提交之间比较')
+    args = parser.parse_args()
+
+    compileall.compile_dir(ROOT / 'todo_app', quiet=1)
+    report = {'python': sys.version.split()[0], 'runs': args.runs, 'commands': {}}
+
+    print(f"{'命令':<20}{'中位数(ms)':>12}{'最小(ms)':>12}")
+    for command in args.commands or DEFAULT_COMMANDS:
+        timings = time_command(command.split(), args.runs)
+        report['commands'][command] = {
+            'median_ms': round(statistics.median(timings), 2),
+            'min_ms': round(min(timings), 2),
+        }
+        print(f"{command:<20}{statistics.median(timings):>12.2f}{min(timings):>12.2f}")
+
+    times = import_times(CLI_MODULE)
+    total = times[CLI_MODULE][1] / 1000
+    slowest = sorted(times.items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+    report['import'] = {
+        'cumulative_ms': round(total, 2),
+        'modules': len(times),
+        'slowest': {name: round(self_us / 1000, 2) for name, (self_us, _) in slowest},
+    }
+
+    print(f"\n导入 {CLI_MODULE}: {total:.2f} ms，共 {len(times)} 个模块")
+    print(f"{'模块':<40}{'自身(ms)':>10}")
+    for name, (self_us, _) in slowest:
+        print(f"{name:<40}{self_us / 1000:>10.2f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
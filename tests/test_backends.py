@@ -0,0 +1,207 @@
+# tests/test_backends.py
+"""存储后端一致性测试
+
+对每个已注册的后端执行同一组操作，检查通过 TaskManager 得到的结果一致。
+新增后端注册后自动参与测试。
+"""
+import pytest
+
+from todo_app.cli import backends
+from todo_app.cli.backends import StorageBackend, available_backends, get_backend, register_backend
+from todo_app.cli.core import TaskManager
+from todo_app.cli.events import TaskEvent
+
+BACKENDS = available_backends()
+# 数据保存在文件中、重新打开后仍然存在的后端
+PERSISTENT = [name for name in BACKENDS if name != 'memory']
+
+
+def seed_records(count=60):
+    # 部分名称含非 ASCII 字母和全角字母，各后端都须按 str.lower() 忽略大小写
+    return [
+        {'name': f'Task {i} {"report" if i % 4 == 0 else "call"}{" Übung ＡＢＣ" if i % 7 == 0 else ""}',
+         'date': f'2025-03-{i % 28 + 1:02d}',
+         'category': f'c{i % 3}'}
+        for i in range(count)
+    ]
+
+
+@pytest.fixture(params=BACKENDS)
+def manager(request, tmp_path):
+    manager = TaskManager(storage_type=request.param, data_dir=tmp_path)
+    tasks = manager.add_tasks(seed_records())
+    manager.update_tasks({task['id']: {'done': True} for task in tasks[::5]})
+    yield manager
+    manager.close()
+
+
+def comparable(tasks):
+    """只比较各后端共有的字段"""
+    return [(t['id'], t['name'], t['date'], t['category'], t['done']) for t in tasks]
+
+
+def expected(manager, filter_done=None, category=None, search_query=None, start_date=None, end_date=None):
+    """按定义在全部任务上筛选，作为查询结果的参照"""
+    return [
+        task for task in manager.get_tasks()
+        if (filter_done is None or task['done'] == filter_done)
+        and (not category or task['category'] == category)
+        and (not search_query or search_query.lower() in task['name'].lower())
+        and (not start_date or task['date'] >= start_date)
+        and (not end_date or task['date'] <= end_date)
+    ]
+
+
+FILTERS = [
+    {},
+    {'filter_done': True},
+    {'filter_done': False, 'category': 'c1'},
+    {'search_query': 'report'},
+    {'search_query': 'rep', 'filter_done': False},
+    {'search_query': 'ÜB'},
+    {'search_query': 'übung'},
+    {'search_query': 'ａｂ'},
+    {'search_query': 'ａｂｃ', 'filter_done': False},
+    {'start_date': '2025-03-05', 'end_date': '2025-03-12'},
+    {'category': 'c2', 'start_date': '2025-03-10'},
+]
+
+
+def test_backend_implements_protocol(manager):
+    assert isinstance(manager.backend, StorageBackend)
+
+
+def test_add_and_get(manager):
+    task = manager.add_task('  新任务  ', '2025-04-01', '工作')
+    assert (task['name'], task['date'], task['category'], task['done']) == ('新任务', '2025-04-01', '工作', False)
+    assert comparable([manager.get_task_by_id(task['id'])]) == comparable([task])
+    assert manager.add_task('   ') is None
+    assert manager.get_task_by_id(10 ** 6) is None
+
+
+def test_add_tasks_keeps_input_order(manager):
+    results = manager.add_tasks([{'name': 'a'}, {'name': ''}, {'name': 'b', 'category': 'x'}])
+    assert results[1] is None
+    assert [r['name'] for r in (results[0], results[2])] == ['a', 'b']
+    assert results[0]['category'] == '未分类'
+    assert results[2]['id'] > results[0]['id']
+
+
+def test_tasks_sorted_by_date(manager):
+    dates = [task['date'] for task in manager.get_tasks()]
+    assert len(dates) == 60
+    assert dates == sorted(dates)
+
+
+@pytest.mark.parametrize('filters', FILTERS)
+def test_query_matches_reference(manager, filters):
+    reference = expected(manager, **filters)
+    assert comparable(manager.get_tasks(**filters)) == comparable(reference)
+    assert manager.count_tasks(**filters) == len(reference)
+    assert comparable(manager.iter_tasks(**filters, chunk_size=7)) == comparable(reference)
+    assert comparable(manager.get_tasks(**filters, limit=5, offset=3)) == comparable(reference[3:8])
+
+
+@pytest.mark.parametrize('filters', FILTERS)
+def test_cursor_pages_cover_all_tasks(manager, filters):
+    pages = []
+    cursor = None
+    while True:
+        page, cursor = manager.get_tasks_page(**filters, page_size=8, cursor=cursor)
+        pages.extend(page)
+        if cursor is None:
+            break
+    assert comparable(pages) == comparable(expected(manager, **filters))
+
+
+def test_search(manager):
+    results = manager.search_tasks('REPORT task')
+    assert results
+    assert all('report' in t['name'].lower() and 'task' in t['name'].lower() for t in results)
+    assert len(results) == len(expected(manager, search_query='report'))
+    assert len(manager.search_tasks('report', limit=3)) == 3
+    assert len(manager.search_tasks('ÜBUNG ａｂ')) == len(expected(manager, search_query='übung'))
+    assert manager.search_tasks('   ') == []
+
+
+def test_update(manager):
+    task = manager.get_tasks()[0]
+    assert manager.update_task(task['id'], {'name': ' 改名 ', 'done': True})
+    updated = manager.get_task_by_id(task['id'])
+    assert (updated['name'], updated['done']) == ('改名', True)
+    assert not manager.update_task(10 ** 6, {'done': True})
+    assert not manager.update_task(task['id'], {})
+
+    ids = [t['id'] for t in manager.get_tasks(filter_done=False)[:3]]
+    results = manager.update_tasks({**{task_id: {'category': 'moved'} for task_id in ids}, 10 ** 6: {'done': True}})
+    assert results == {**{task_id: True for task_id in ids}, 10 ** 6: False}
+    assert [t['id'] for t in manager.get_tasks(category='moved')] == ids
+
+
+def test_delete(manager):
+    first, second, third = manager.get_tasks()[:3]
+    assert manager.delete_task(first['id'])
+    assert not manager.delete_task(first['id'])
+    assert manager.delete_tasks([second['id'], third['id'], 10 ** 6]) == {
+        second['id']: True, third['id']: True, 10 ** 6: False}
+    assert manager.count_tasks() == 57
+    assert manager.get_task_by_id(second['id']) is None
+
+
+def test_categories_and_stats(manager):
+    assert manager.get_categories() == ['c0', 'c1', 'c2']
+    stats = manager.get_stats(date_bucket='month')
+    tasks = manager.get_tasks()
+    done = sum(t['done'] for t in tasks)
+    assert (stats['total'], stats['done'], stats['pending']) == (60, done, 60 - done)
+    assert stats['categories']['c1'] == {
+        'total': len(expected(manager, category='c1')),
+        'done': len(expected(manager, category='c1', filter_done=True))}
+    assert stats['dates'] == {'2025-03': {'total': 60, 'done': done}}
+
+
+def test_import_and_export(manager):
+    summary = manager.import_tasks(
+        [{'name': 'x', 'date': '2025/05/01', 'done': 'yes'}, {'name': ''}, {'name': 'y'}] * 5, batch_size=4)
+    assert (summary['imported'], summary['skipped']) == (10, 5)
+
+    exported = list(manager.export_tasks(chunk_size=7))
+    assert [t['id'] for t in exported] == sorted(t['id'] for t in manager.get_tasks())
+    assert all('created_at' in t for t in exported)
+    assert manager.count_tasks(filter_done=True, start_date='2025-05-01') == 5
+
+
+def test_events(manager):
+    events = []
+    manager.subscribe(events.append)
+    task = manager.add_task('事件')
+    manager.update_task(task['id'], {'done': True})
+    manager.delete_task(task['id'])
+
+    assert [event.action for event in events] == ['add', 'update', 'delete']
+    assert all(isinstance(event, TaskEvent) and event.ids == [task['id']] for event in events)
+    assert events[1].previous[task['id']]['done'] is False
+    assert events[1].tasks[task['id']]['done'] is True
+    assert events[2].previous[task['id']]['name'] == '事件'
+
+
+@pytest.mark.parametrize('storage_type', PERSISTENT)
+def test_data_persists(tmp_path, storage_type):
+    with TaskManager(storage_type=storage_type, data_dir=tmp_path) as manager:
+        manager.add_tasks(seed_records(10))
+        manager.update_task(1, {'done': True})
+        manager.delete_task(2)
+        before = comparable(manager.get_tasks())
+    with TaskManager(storage_type=storage_type, data_dir=tmp_path) as manager:
+        assert comparable(manager.get_tasks()) == before
+
+
+def test_register_backend(tmp_path, monkeypatch):
+    monkeypatch.setattr(backends, '_BACKENDS', dict(backends._BACKENDS))
+    register_backend('test-memory', get_backend('memory'))
+    assert 'test-memory' in available_backends()
+    with TaskManager(storage_type='test-memory', data_dir=tmp_path) as manager:
+        assert manager.add_task('a')['id'] == 1
+
+    with pytest.raises(ValueError):
+        TaskManager(storage_type='no-such-backend', data_dir=tmp_path)
@@ -0,0 +1,151 @@
+# tests/test_batch.py
+"""批量写入测试：多个任务的增删改在一个事务 (或一次文件写入) 中完成"""
+import json
+import sqlite3
+import sys
+
+import pytest
+
+from todo_app.cli.backends.jsonfile import JSONBackend
+from todo_app.cli.cli import TodoCLI
+from todo_app.cli.core import TaskManager
+
+
+def records(count):
+    return [{'name': f'task {i}', 'date': '2025-03-01', 'category': 'c'} for i in range(count)]
+
+
+@pytest.fixture
+def sqlite_manager(tmp_path):
+    with TaskManager(storage_type='sqlite', data_dir=tmp_path) as manager:
+        yield manager
+
+
+def traced(manager, call):
+    """执行 call，返回写连接上执行的语句"""
+    statements = []
+    manager.backend.conn.set_trace_callback(statements.append)
+    try:
+        call()
+    finally:
+        manager.backend.conn.set_trace_callback(None)
+    return statements
+
+
+def commits(statements):
+    return sum(1 for s in statements if s.strip().upper() == 'COMMIT')
+
+
+def test_sqlite_batch_writes_use_one_transaction(sqlite_manager):
+    statements = traced(sqlite_manager, lambda: sqlite_manager.add_tasks(records(200)))
+    assert commits(statements) == 1
+    ids = [task['id'] for task in sqlite_manager.get_tasks()]
+    assert len(ids) == 200
+
+    statements = traced(sqlite_manager, lambda: sqlite_manager.update_tasks({i: {'done': True} for i in ids}))
+    assert commits(statements) == 1
+    assert sqlite_manager.count_tasks(filter_done=True) == 200
+
+    statements = traced(sqlite_manager, lambda: sqlite_manager.delete_tasks(ids[:150]))
+    assert commits(statements) == 1
+    assert sqlite_manager.count_tasks() == 50
+
+
+def test_json_batch_writes_save_once(tmp_path, monkeypatch):
+    saves = []
+    original = JSONBackend._save
+
+    def counting_save(self, tasks):
+        saves.append(len(tasks))
+        original(self, tasks)
+
+    monkeypatch.setattr(JSONBackend, '_save', counting_save)
+    with TaskManager(storage_type='json', data_dir=tmp_path) as manager:
+        tasks = manager.add_tasks(records(100))
+        manager.update_tasks({task['id']: {'done': True} for task in tasks})
+        manager.delete_tasks([task['id'] for task in tasks[:40]])
+        assert saves == [100, 100, 60]
+
+    with TaskManager(storage_type='json', data_dir=tmp_path) as manager:
+        assert manager.count_tasks(filter_done=True) == 60
+
+
+def test_batch_results_are_per_item(sqlite_manager):
+    results = sqlite_manager.add_tasks([{'name': 'a'}, {'name': '  '}, {'name': 'b'}])
+    assert [r and r['name'] for r in results] == ['a', None, 'b']
+    a, b = results[0]['id'], results[2]['id']
+
+    assert sqlite_manager.update_tasks({a: {'done': True}, b: {}, 999: {'done': True}}) == {
+        a: True, b: False, 999: False}
+    assert sqlite_manager.delete_tasks([a, 999, a]) == {a: True, 999: False}
+    assert [t['name'] for t in sqlite_manager.get_tasks()] == ['b']
+
+
+def test_batch_events_cover_all_items(sqlite_manager):
+    events = []
+    sqlite_manager.subscribe(events.append)
+    tasks = sqlite_manager.add_tasks(records(10))
+    ids = [task['id'] for task in tasks]
+    sqlite_manager.update_tasks({task_id: {'done': True} for task_id in ids})
+    sqlite_manager.delete_tasks(ids)
+
+    assert [(event.action, sorted(event.ids)) for event in events] == [
+        ('add', ids), ('update', ids), ('delete', ids)]
+
+
+class InsertAfterCommit:
+    """包装写连接：每次事务提交后由另一个连接插入一条任务，模拟其他进程的并发写入"""
+
+    def __init__(self, conn, db_path):
+        self._conn = conn
+        self._db_path = db_path
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, *exc):
+        result = self._conn.__exit__(*exc)
+        other = sqlite3.connect(self._db_path)
+        with other:
+            other.execute("INSERT INTO tasks (name, name_lower, date, category, done) "
+                          "VALUES ('other', 'other', '', '', 0)")
+        other.close()
+        return result
+
+
+def test_inserted_rows_exclude_concurrent_writes(sqlite_manager, monkeypatch):
+    backend = sqlite_manager.backend
+    monkeypatch.setattr(backend, 'conn', InsertAfterCommit(backend.conn, backend.db_path))
+    events = []
+    sqlite_manager.subscribe(events.append)
+
+    tasks = sqlite_manager.add_tasks(records(5))
+    assert [task['name'] for task in tasks] == [f'task {i}' for i in range(5)]
+
+    summary = sqlite_manager.import_tasks(records(7), batch_size=3)
+    assert (summary['imported'], summary['failed']) == (7, None)
+    added = [task for event in events[1:] for task in event.tasks.values()]
+    assert [task['name'] for task in added] == [f'task {i}' for i in range(7)]
+    monkeypatch.undo()
+    assert sqlite_manager.count_tasks(search_query='other') == 4
+
+
+def test_failed_import_is_reported(sqlite_manager, tmp_path, monkeypatch):
+    # 第二块中的任务触发数据库错误，该块回滚，第一块保留
+    sqlite_manager.backend.conn.execute(
+        "CREATE TRIGGER fail_import BEFORE INSERT ON tasks WHEN NEW.name = 'task 4' "
+        "BEGIN SELECT RAISE(ABORT, 'boom'); END")
+    summary = sqlite_manager.import_tasks(records(10), batch_size=3)
+    assert (summary['imported'], summary['failed']) == (3, 'boom')
+    assert [task['name'] for task in sqlite_manager.get_tasks()] == ['task 0', 'task 1', 'task 2']
+    assert sqlite_manager.count_tasks(search_query='task') == 3
+
+    # 命令行导入失败时退出码非零 (run 结束时关闭存储)
+    path = tmp_path / 'tasks.ndjson'
+    path.write_text('\n'.join(json.dumps(record) for record in records(10)), encoding='utf-8')
+    monkeypatch.setattr(sys, 'argv', ['todo', 'import', str(path), '--batch-size', '3'])
+    monkeypatch.setattr(TodoCLI, '_open_manager', lambda self: sqlite_manager)
+    assert TodoCLI().run() == 1
@@ -0,0 +1,167 @@
+# tests/test_daemon.py
+"""常驻进程测试：转发调用、整数键还原、回退到本进程、残留套接字和方法白名单"""
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+
+import pytest
+
+from todo_app.cli import daemon
+from todo_app.cli.cli import TodoCLI
+from todo_app.cli.core import TaskManager
+from todo_app.cli.daemon import NO_DAEMON_ENV, DaemonClient, DaemonError, serve, shutdown
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason='需要 Unix 套接字')
+
+
+@pytest.fixture
+def socket_path():
+    # pytest 的 tmp_path 可能超过 Unix 套接字路径的长度上限，套接字放在较短的临时目录中
+    directory = tempfile.mkdtemp(prefix='todo-')
+    yield os.path.join(directory, daemon.SOCKET_NAME)
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    with TaskManager(storage_type='json', data_dir=tmp_path) as manager:
+        yield manager
+
+
+def start(manager, path):
+    """在后台线程中运行常驻进程，等待套接字可以连接"""
+    errors = []
+
+    def run():
+        try:
+            serve(manager, path)
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    while thread.is_alive():
+        client = DaemonClient.connect(path)
+        if client is not None:
+            client.close()
+            return thread
+        time.sleep(0.01)
+    raise errors[0]
+
+
+@pytest.fixture
+def running(manager, socket_path):
+    thread = start(manager, socket_path)
+    yield socket_path
+    shutdown(socket_path)
+    thread.join(5)
+    assert not thread.is_alive()
+
+
+@pytest.fixture
+def client(running):
+    with DaemonClient.connect(running) as client:
+        yield client
+
+
+def test_calls_are_forwarded(client, manager):
+    task = client.add_task('写周报', '2025-03-01', '工作')
+    assert task['name'] == '写周报'
+    assert manager.get_task_by_id(task['id'])['name'] == '写周报'
+
+    client.add_tasks([{'name': f'任务 {i}', 'category': '个人'} for i in range(3)])
+    assert client.count_tasks() == manager.count_tasks() == 4
+    assert client.get_tasks(category='个人') == manager.get_tasks(category='个人')
+    assert client.get_categories() == manager.get_categories()
+
+
+def test_int_keys_are_restored(client, manager):
+    ids = [task['id'] for task in client.add_tasks([{'name': 'a'}, {'name': 'b'}])]
+
+    result = client.update_tasks({ids[0]: {'done': True}, 999: {'done': True}})
+    assert result == {ids[0]: True, 999: False}
+    assert all(isinstance(key, int) for key in result)
+    assert manager.get_task_by_id(ids[0])['done']
+
+    result = client.delete_tasks([ids[1], 999])
+    assert result == {ids[1]: True, 999: False}
+    assert all(isinstance(key, int) for key in result)
+    assert manager.count_tasks() == 1
+
+
+def test_methods_outside_whitelist_are_rejected(client, manager):
+    with pytest.raises(AttributeError):
+        client.close_storage
+    for method in ('close', '_save', '__init__', 'subscribe'):
+        with pytest.raises(DaemonError, match='不支持的方法'):
+            client.call(method)
+    # 出错后连接仍可继续使用
+    assert client.count_tasks() == 0
+    # close 被拒绝，常驻进程的存储仍然打开
+    assert manager.count_tasks() == 0
+
+
+def test_errors_are_returned_to_the_client(client):
+    with pytest.raises(DaemonError):
+        client.get_tasks(no_such_argument=True)
+    assert client.count_tasks() == 0
+
+
+def test_falls_back_when_no_daemon(manager, socket_path, monkeypatch):
+    assert DaemonClient.connect(socket_path) is None
+
+    monkeypatch.setattr(daemon, 'get_socket_path', lambda data_dir=None: socket_path)
+    monkeypatch.setattr(TodoCLI, '_open_manager', lambda self: manager)
+    assert TodoCLI().manager is manager
+
+    thread = start(manager, socket_path)
+    try:
+        cli_manager = TodoCLI().manager
+        assert isinstance(cli_manager, DaemonClient)
+        cli_manager.close()
+
+        # 设置环境变量后即使常驻进程在运行也在本进程中执行
+        monkeypatch.setenv(NO_DAEMON_ENV, '1')
+        assert DaemonClient.connect(socket_path) is None
+        assert TodoCLI().manager is manager
+    finally:
+        assert shutdown(socket_path)
+        thread.join(5)
+    assert not os.path.exists(socket_path)
+    assert not shutdown(socket_path)
+
+
+def test_stale_socket_is_removed(manager, socket_path):
+    # 异常退出的常驻进程留下的套接字文件：文件存在但没有进程在监听
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(socket_path)
+    stale.close()
+    assert os.path.exists(socket_path)
+    assert DaemonClient.connect(socket_path) is None
+
+    thread = start(manager, socket_path)
+    try:
+        with DaemonClient.connect(socket_path) as client:
+            assert client.count_tasks() == 0
+    finally:
+        shutdown(socket_path)
+        thread.join(5)
+
+
+def test_second_daemon_is_refused(running, manager):
+    with pytest.raises(DaemonError, match='已在运行'):
+        serve(manager, running)
+    # 正在运行的常驻进程不受影响
+    with DaemonClient.connect(running) as client:
+        assert client.count_tasks() == 0
+
+
+def test_socket_path_too_long(manager, tmp_path):
+    path = str(tmp_path / ('x' * 120) / daemon.SOCKET_NAME)
+    os.makedirs(os.path.dirname(path))
+    with pytest.raises(DaemonError, match='无法在'):
+        serve(manager, path)
+    assert not os.path.exists(path)
@@ -0,0 +1,103 @@
+# tests/test_ingest.py
+"""多进程导入测试：小块并行解析的结果与单进程逐条导入完全一致"""
+import csv
+import json
+
+import pytest
+
+from todo_app.cli import ingest
+from todo_app.cli.core import MAX_IMPORT_ERRORS, TaskManager
+from todo_app.cli.transfer import normalize_records
+
+# 块很小，每个文件都会被切成许多块
+CHUNK_BYTES = 256
+
+
+def records(count, multiline=False):
+    """有效记录中夹杂名称为空和日期无效的记录"""
+    for i in range(count):
+        name = f'task {i}'
+        if multiline and i % 5 == 0:
+            name = f'task {i}\n第二行 "引号"\n第三行'
+        if i % 7 == 3:
+            name = ''
+        date = 'not a date' if i % 11 == 4 else f'2025-03-{i % 28 + 1:02d}'
+        yield {'name': name, 'date': date, 'category': f'c{i % 3}', 'done': i % 2 == 0}
+
+
+def write_csv(path, rows):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['name', 'date', 'category', 'done'])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_ndjson(path, rows):
+    with open(path, 'w', encoding='utf-8') as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + '\n')
+        f.write('not json\n')
+
+
+def import_file(data_dir, path, fmt, workers):
+    with TaskManager(storage_type='sqlite', data_dir=data_dir) as manager:
+        summary = manager.import_file(str(path), fmt, batch_size=50, workers=workers)
+        tasks = [(t['name'], t['date'], t['category'], t['done']) for t in manager.get_tasks()]
+    return summary, tasks
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    original = ingest.parse_file
+
+    def parse_file(*args, **kwargs):
+        kwargs['chunk_bytes'] = CHUNK_BYTES
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(ingest, 'parse_file', parse_file)
+
+
+@pytest.mark.parametrize('fmt, write, multiline', [
+    ('csv', write_csv, False),
+    ('csv', write_csv, True),
+    ('ndjson', write_ndjson, False),
+])
+def test_parallel_import_matches_sequential(tmp_path, small_chunks, fmt, write, multiline):
+    path = tmp_path / f'tasks.{fmt}'
+    write(path, records(400, multiline))
+    assert len(ingest.split_file(str(path), CHUNK_BYTES)) > 10
+
+    sequential = import_file(tmp_path / 'sequential', path, fmt, workers=1)
+    parallel = import_file(tmp_path / 'parallel', path, fmt, workers=2)
+    assert parallel == sequential
+
+    summary, tasks = parallel
+    assert summary['imported'] == len(tasks) > 0
+    assert summary['skipped'] > 0
+    # 失败原因按全局记录序号记录
+    assert summary['errors'] == sequential[0]['errors']
+    assert len(summary['errors']) == min(summary['skipped'], MAX_IMPORT_ERRORS)
+    if multiline:
+        assert any('\n' in name for name, *_ in tasks)
+
+
+def test_split_inside_quoted_field_falls_back(tmp_path):
+    path = tmp_path / 'tasks.csv'
+    write_csv(path, records(400, multiline=True))
+    # 至少有一个块边界落在引号字段中间
+    fieldnames, start = ingest._read_header(str(path))
+    ranges = ingest.split_file(str(path), CHUNK_BYTES, start)
+    quotes = 0
+    for chunk_start, chunk_end in ranges:
+        quotes += ingest._parse_chunk(str(path), 'csv', chunk_start, chunk_end, fieldnames, '2025-01-01')[3]
+        if quotes % 2:
+            break
+    else:
+        pytest.fail('没有落在引号字段中间的块边界')
+
+    summary = {'imported': 0, 'skipped': 0, 'errors': []}
+    rows = list(ingest.parse_file(str(path), 'csv', 2, summary, MAX_IMPORT_ERRORS, chunk_bytes=CHUNK_BYTES))
+    with open(path, encoding='utf-8', newline='') as f:
+        results = list(normalize_records(csv.DictReader(f)))
+    assert rows == [row for _, row, _ in results if row is not None]
+    assert summary['skipped'] == sum(1 for _, row, _ in results if row is None)
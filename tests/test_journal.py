@@ -0,0 +1,119 @@
+# tests/test_journal.py
+"""TaskJournal 崩溃恢复与并发压缩测试
+
+每个 TaskJournal 实例单独打开日志文件和文件锁，同一路径上的多个实例
+相当于 GUI、CLI 和守护进程分别持有的日志。
+"""
+import threading
+
+import pytest
+
+from todo_app.cli.journal import TaskJournal
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / 'tasks.jsonl'
+
+
+@pytest.fixture
+def open_journal(path):
+    """在同一路径上打开新的日志实例，测试结束时全部关闭"""
+    journals = []
+
+    def factory():
+        journal = TaskJournal(path, sync=False)
+        journals.append(journal)
+        return journal
+
+    yield factory
+    for journal in journals:
+        journal.close()
+
+
+def names(journal):
+    return sorted(task['name'] for task in journal.tasks())
+
+
+def test_reopen_replays_records(open_journal):
+    journal = open_journal()
+    first, second = journal.add_many([{'name': 'a'}, {'name': 'b'}])
+    journal.update(first['id'], {'done': True})
+    journal.delete(second['id'])
+
+    reopened = open_journal()
+    assert reopened.tasks() == [dict(first, done=True)]
+    assert reopened.add({'name': 'c'})['id'] == 3
+
+
+def test_torn_tail_is_ignored_and_truncated(path, open_journal):
+    journal = open_journal()
+    journal.add_many([{'name': 'a'}, {'name': 'b'}])
+    intact = path.stat().st_size
+    # 崩溃时只写入了半条记录
+    with open(path, 'ab') as f:
+        f.write(b'{"op":"put","task":{"id":3,"na')
+
+    reopened = open_journal()
+    assert names(reopened) == ['a', 'b']
+    assert path.stat().st_size > intact
+
+    # 下一次写入持有文件锁，先截断残缺尾行再追加
+    reopened.add({'name': 'c'})
+    assert path.read_bytes().endswith(b'\n')
+    assert names(open_journal()) == ['a', 'b', 'c']
+    assert names(journal) == ['a', 'b', 'c']
+
+
+def test_reopen_after_crash_during_compaction(path, open_journal):
+    journal = open_journal()
+    journal.add_many([{'name': str(i)} for i in range(5)])
+    # 压缩进程在重命名前崩溃，留下未完成的临时文件
+    leftover = path.with_name(path.name + '.123.compact')
+    leftover.write_bytes(b'{"op":"meta","next_id":1}\n{"op":"put","task":{"id":1')
+
+    reopened = open_journal()
+    assert names(reopened) == [str(i) for i in range(5)]
+    reopened.compact()
+    assert names(open_journal()) == [str(i) for i in range(5)]
+    assert reopened.add({'name': 'x'})['id'] == 6
+
+
+def test_compaction_keeps_concurrent_appends(path, open_journal):
+    open_journal().add_many([{'name': f'seed {i}'} for i in range(50)])
+    writers = [open_journal() for _ in range(2)]
+    compactors = [open_journal() for _ in range(2)]
+    stop = threading.Event()
+    errors = []
+
+    def append(journal, prefix):
+        try:
+            for i in range(100):
+                task = journal.add({'name': f'{prefix} {i}'})
+                journal.update(task['id'], {'done': True})
+        except Exception as e:  # pragma: no cover - 断言中报告
+            errors.append(e)
+
+    def compact(journal):
+        while not stop.is_set():
+            journal.compact()
+
+    threads = [threading.Thread(target=append, args=(journal, f'w{n}')) for n, journal in enumerate(writers)]
+    threads += [threading.Thread(target=compact, args=(journal,)) for journal in compactors]
+    for thread in threads:
+        thread.start()
+    for thread in threads[:len(writers)]:
+        thread.join()
+    stop.set()
+    for thread in threads[len(writers):]:
+        thread.join()
+
+    assert not errors
+    expected = sorted([f'seed {i}' for i in range(50)] + [f'w{n} {i}' for n in range(2) for i in range(100)])
+    for journal in writers + compactors + [open_journal()]:
+        assert names(journal) == expected
+    tasks = open_journal().tasks()
+    assert len({task['id'] for task in tasks}) == len(tasks)
+    assert sum(task.get('done', False) for task in tasks) == 200
+    # 临时快照文件都已被重命名或删除
+    assert not list(path.parent.glob('*.compact'))
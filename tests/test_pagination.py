@@ -0,0 +1,91 @@
+# tests/test_pagination.py
+"""游标分页与 iter_tasks 测试"""
+import pytest
+
+from todo_app.cli.backends import available_backends
+from todo_app.cli.core import TaskManager, _decode_cursor, _encode_cursor
+
+
+@pytest.fixture(params=available_backends())
+def manager(request, tmp_path):
+    with TaskManager(storage_type=request.param, data_dir=tmp_path) as manager:
+        # 同一日期的任务很多，游标必须靠 (创建时间, ID) 区分
+        manager.add_tasks([
+            {'name': f'task {i}', 'date': f'2025-03-{i % 4 + 1:02d}', 'category': f'c{i % 2}'}
+            for i in range(97)
+        ])
+        yield manager
+
+
+def walk(manager, page_size, between_pages=None, **filters):
+    """翻完所有页，返回每页的任务"""
+    pages = []
+    cursor = None
+    while True:
+        page, cursor = manager.get_tasks_page(page_size=page_size, cursor=cursor, **filters)
+        pages.append(page)
+        if cursor is None:
+            return pages
+        if between_pages:
+            between_pages(len(pages))
+
+
+def test_cursor_round_trip():
+    key = ('2025-03-01', '2025-02-28T10:00:00.123456', 42)
+    cursor = _encode_cursor(key)
+    assert isinstance(cursor, str) and '2025' not in cursor
+    assert _decode_cursor(cursor) == key
+    with pytest.raises(ValueError):
+        _decode_cursor('not a cursor')
+
+
+def test_invalid_cursor_returns_empty_page(manager):
+    assert manager.get_tasks_page(cursor='bm90IGEgY3Vyc29y') == ([], None)
+
+
+@pytest.mark.parametrize('page_size', [1, 10, 97, 200])
+def test_pages_cover_all_rows_once(manager, page_size):
+    pages = walk(manager, page_size)
+    ids = [task['id'] for page in pages for task in page]
+    assert ids == [task['id'] for task in manager.get_tasks()]
+    assert all(len(page) == page_size for page in pages[:-1])
+    assert 0 < len(pages[-1]) <= page_size
+
+
+def test_pages_are_stable_under_concurrent_writes(manager):
+    """翻页期间插入和删除任务，已有的任务既不重复也不遗漏 (offset 分页做不到)"""
+    original = [task['id'] for task in manager.get_tasks()]
+    deleted = set(original[1::9])
+
+    def write(page_number):
+        # 插入到已翻过的日期之前，并删除一些尚未翻到的任务
+        manager.add_task(f'inserted {page_number}', '2025-01-01', 'c0')
+        manager.delete_tasks([task_id for task_id in deleted if task_id % 7 == page_number % 7])
+
+    seen = [task['id'] for page in walk(manager, 10, write) for task in page]
+    assert len(seen) == len(set(seen))
+    assert [task_id for task_id in seen if task_id in original] == [
+        task_id for task_id in original if task_id in seen]
+    assert set(original) - deleted <= set(seen)
+
+
+def test_iter_tasks_matches_get_tasks(manager):
+    expected = [task['id'] for task in manager.get_tasks(category='c1')]
+    tasks = manager.iter_tasks(category='c1', chunk_size=6)
+    assert next(tasks)['id'] == expected[0]
+    assert [expected[0]] + [task['id'] for task in tasks] == expected
+
+
+def test_offset_without_limit(manager):
+    ids = [task['id'] for task in manager.get_tasks()]
+    assert [task['id'] for task in manager.get_tasks(offset=90)] == ids[90:]
+
+
+def test_page_offset_skips_from_cursor(manager):
+    ids = [task['id'] for task in manager.get_tasks()]
+    _, cursor = manager.get_tasks_page(page_size=10)
+    page, next_cursor = manager.get_tasks_page(page_size=10, cursor=cursor, offset=25)
+    assert [task['id'] for task in page] == ids[35:45]
+    page, _ = manager.get_tasks_page(page_size=10, cursor=next_cursor)
+    assert [task['id'] for task in page] == ids[45:55]
+    assert manager.get_tasks_page(page_size=10, offset=95) == (manager.get_tasks()[95:], None)
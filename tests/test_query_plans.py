@@ -0,0 +1,140 @@
+# tests/test_query_plans.py
+"""SQLite 查询计划回归测试
+
+对 TaskManager 实际执行的每种查询形态运行 EXPLAIN QUERY PLAN，
+确保后续修改不会悄悄退化为全表扫描或临时 B 树排序。
+"""
+import sqlite3
+
+import pytest
+
+from todo_app.cli.core import TaskManager
+from todo_app.cli.migrations import SCHEMA_VERSION, get_schema_version
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = TaskManager(storage_type='sqlite', data_dir=tmp_path)
+    manager.add_tasks([
+        {'name': f'task {i}', 'date': f'2025-03-{i % 28 + 1:02d}', 'category': f'c{i % 5}'}
+        for i in range(500)
+    ])
+    manager.update_tasks({i: {'done': True} for i in range(1, 500, 3)})
+    yield manager
+    manager.close()
+
+
+def query_plan(manager, call):
+    """执行 call 并返回其中最后一条 SELECT 语句的查询计划"""
+    statements = []
+    manager.backend.read_conn.set_trace_callback(statements.append)
+    try:
+        call()
+    finally:
+        manager.backend.read_conn.set_trace_callback(None)
+
+    selects = [s for s in statements if s.lstrip().upper().startswith('SELECT')]
+    assert selects, "没有执行任何查询"
+    rows = manager.backend.read_conn.execute('EXPLAIN QUERY PLAN ' + selects[-1]).fetchall()
+    return [row[3] for row in rows]
+
+
+def second_page(manager, **filters):
+    """翻到第二页，验证游标分页的查询计划"""
+    _, cursor = manager.get_tasks_page(page_size=10, **filters)
+    assert cursor is not None
+    return manager.get_tasks_page(page_size=10, cursor=cursor, **filters)
+
+
+QUERY_SHAPES = {
+    'all': (lambda m: m.get_tasks(), 'idx_tasks_order'),
+    'done': (lambda m: m.get_tasks(filter_done=False), 'idx_tasks_done_order'),
+    'category': (lambda m: m.get_tasks(category='c1'), 'idx_tasks_category_order'),
+    'category_done': (lambda m: m.get_tasks(category='c1', filter_done=True), 'idx_tasks_category_done_order'),
+    'date_range': (
+        lambda m: m.get_tasks(start_date='2025-03-01', end_date='2025-03-07'),
+        'idx_tasks_order'),
+    'done_date_range': (
+        lambda m: m.get_tasks(filter_done=False, start_date='2025-03-01', end_date='2025-03-07'),
+        'idx_tasks_done_order'),
+    'category_date_range': (
+        lambda m: m.get_tasks(category='c2', start_date='2025-03-01', end_date='2025-03-07'),
+        'idx_tasks_category_order'),
+    'category_done_date_range': (
+        lambda m: m.get_tasks(category='c2', filter_done=True, start_date='2025-03-01', end_date='2025-03-07'),
+        'idx_tasks_category_done_order'),
+    'limit_offset': (lambda m: m.get_tasks(limit=10, offset=100), 'idx_tasks_order'),
+    'keyset_page': (lambda m: second_page(m), 'idx_tasks_order'),
+    'keyset_page_done': (lambda m: second_page(m, filter_done=True), 'idx_tasks_done_order'),
+    'keyset_page_category': (lambda m: second_page(m, category='c3'), 'idx_tasks_category_order'),
+    'iter_tasks': (lambda m: list(m.iter_tasks(filter_done=False)), 'idx_tasks_done_order'),
+    'categories': (lambda m: m.get_categories(), 'idx_tasks_category'),
+    'count_category_done': (
+        lambda m: m.count_tasks(category='c1', filter_done=True), 'idx_tasks_category_done_order'),
+    'stats_categories': (lambda m: m.get_stats(), 'idx_tasks_category_done_order'),
+    'stats_dates': (lambda m: m.get_stats(date_bucket='week'), 'idx_tasks_done_order'),
+}
+
+
+@pytest.mark.parametrize('shape', QUERY_SHAPES)
+def test_list_queries_use_index_without_sort(manager, shape):
+    call, index = QUERY_SHAPES[shape]
+    plan = query_plan(manager, lambda: call(manager))
+
+    assert not any(step == 'SCAN tasks' for step in plan), plan
+    assert not any('TEMP B-TREE' in step for step in plan), plan
+    assert any(index in step for step in plan), plan
+
+
+def test_keyset_page_seeks_to_cursor(manager):
+    plan = query_plan(manager, lambda: second_page(manager, filter_done=True))
+    assert any('done=? AND date>?' in step for step in plan), plan
+
+
+def test_get_task_by_id_uses_primary_key(manager):
+    plan = query_plan(manager, lambda: manager.get_task_by_id(5))
+    assert plan == ['SEARCH tasks USING INTEGER PRIMARY KEY (rowid=?)']
+
+
+def test_search_uses_fulltext_index(manager):
+    if not manager.backend.fts_enabled:
+        pytest.skip('当前SQLite不支持FTS5 trigram')
+    plan = query_plan(manager, lambda: manager.get_tasks(search_query='task 1'))
+    assert any('VIRTUAL TABLE' in step for step in plan), plan
+    assert not any(step == 'SCAN tasks' for step in plan), plan
+
+
+def test_new_database_is_at_latest_schema_version(manager):
+    assert get_schema_version(manager.backend.conn) == SCHEMA_VERSION
+
+
+def test_legacy_database_is_migrated(tmp_path):
+    # 引入迁移之前创建的数据库：有表和单列索引，user_version 为 0
+    conn = sqlite3.connect(tmp_path / 'taskstest.db')
+    conn.executescript("""
+        CREATE TABLE tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            date TEXT NOT NULL,
+            category TEXT NOT NULL,
+            done INTEGER DEFAULT 0,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE INDEX idx_category ON tasks(category);
+        CREATE INDEX idx_done ON tasks(done);
+        CREATE INDEX idx_date ON tasks(date);
+        INSERT INTO tasks (name, date, category) VALUES ('旧任务', '2025-01-01', '工作');
+    """)
+    conn.close()
+
+    with TaskManager(storage_type='sqlite', data_dir=tmp_path) as manager:
+        assert get_schema_version(manager.backend.conn) == SCHEMA_VERSION
+        indexes = {row[0] for row in manager.backend.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'tasks'")}
+        assert not indexes & {'idx_category', 'idx_done', 'idx_date'}
+        assert [t['name'] for t in manager.get_tasks()] == ['旧任务']
+        # 迁移为已有任务补齐了小写名称列，短关键词也能搜到
+        assert [t['name'] for t in manager.get_tasks(search_query='任务')] == ['旧任务']
+        if manager.backend.fts_enabled:
+            assert [t['name'] for t in manager.search_tasks('旧任务')] == ['旧任务']
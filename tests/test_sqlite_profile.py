@@ -0,0 +1,79 @@
+# tests/test_sqlite_profile.py
+"""SQLite 性能配置与连接生命周期测试"""
+import sqlite3
+
+import pytest
+
+from todo_app.cli.core import TaskManager
+from todo_app.cli.sqlite_profile import SQLiteProfile, get_sqlite_profile
+
+
+def pragma(conn, name):
+    return conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+
+@pytest.fixture
+def manager(tmp_path):
+    with TaskManager(storage_type='sqlite', data_dir=tmp_path) as manager:
+        manager.add_task('a', '2025-03-01', 'c')
+        yield manager
+
+
+def test_performance_profile_pragmas(manager):
+    profile = get_sqlite_profile('performance')
+    write, read = manager.backend.conn, manager.backend.read_conn
+
+    assert pragma(write, 'journal_mode') == 'wal'
+    assert pragma(write, 'synchronous') == 1  # NORMAL
+    for conn in (write, read):
+        assert pragma(conn, 'cache_size') == profile.cache_size
+        assert pragma(conn, 'temp_store') == 2  # MEMORY
+        assert pragma(conn, 'mmap_size') == profile.mmap_size
+        assert pragma(conn, 'busy_timeout') == profile.busy_timeout * 1000
+
+
+def test_default_profile_keeps_sqlite_defaults(tmp_path):
+    with TaskManager(storage_type='sqlite', data_dir=tmp_path, sqlite_profile='default') as manager:
+        conn = manager.backend.conn
+        assert pragma(conn, 'journal_mode') == 'delete'
+        assert pragma(conn, 'synchronous') == 2  # FULL
+        assert pragma(conn, 'mmap_size') == 0
+
+
+def test_custom_profile_object(tmp_path):
+    profile = SQLiteProfile(cache_size=-1024, mmap_size=None)
+    with TaskManager(storage_type='sqlite', data_dir=tmp_path, sqlite_profile=profile) as manager:
+        assert pragma(manager.backend.read_conn, 'cache_size') == -1024
+        assert pragma(manager.backend.read_conn, 'mmap_size') == 0
+
+    with pytest.raises(ValueError):
+        get_sqlite_profile('no-such-profile')
+
+
+def test_reads_use_readonly_autocommit_connection(manager):
+    read = manager.backend.read_conn
+    assert read is not manager.backend.conn
+    assert read.isolation_level is None
+
+    manager.get_tasks()
+    manager.get_categories()
+    assert not read.in_transaction
+    assert not manager.backend.conn.in_transaction
+    with pytest.raises(sqlite3.OperationalError):
+        read.execute("DELETE FROM tasks")
+
+
+def test_read_connection_sees_committed_writes(manager):
+    before = manager.count_tasks()
+    manager.add_task('b')
+    assert manager.count_tasks() == before + 1
+
+
+def test_close_closes_all_connections(tmp_path):
+    manager = TaskManager(storage_type='sqlite', data_dir=tmp_path)
+    write, read = manager.backend.conn, manager.backend.read_conn
+    manager.close()
+    manager.close()  # 可重复调用
+    for conn in (write, read):
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
@@ -0,0 +1,72 @@
+# tests/test_store.py
+"""TaskStore 内存索引测试"""
+import random
+
+from todo_app.cli.store import TaskStore
+
+
+def make_tasks(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        {'id': i, 'name': f'task {i}', 'date': f'2025-03-{rng.randint(1, 28):02d}',
+         'category': f'c{i % 3}', 'done': rng.random() < 0.3, 'created_at': ''}
+        for i in range(1, count + 1)
+    ]
+
+
+def test_done_count_follows_writes():
+    tasks = make_tasks(200)
+    store = TaskStore(tasks)
+    by_id = {task['id']: task for task in tasks}
+
+    def check():
+        done = sum(task['done'] for task in by_id.values())
+        assert store.count(filter_done=True) == done
+        assert store.count(filter_done=False) == len(by_id) - done
+        assert store.count() == len(by_id)
+
+    check()
+    rng = random.Random(1)
+    for step in range(300):
+        task_id = rng.randint(1, 260)
+        if step % 5 == 0:
+            store.remove(task_id)
+            by_id.pop(task_id, None)
+        else:
+            task = dict(by_id.get(task_id) or make_tasks(1)[0], id=task_id, done=rng.random() < 0.5)
+            store.put(task)
+            by_id[task_id] = task
+        check()
+
+    # 重复设置同一状态不改变计数
+    store.put_many([dict(task, done=True) for task in list(by_id.values())[:40]])
+    for task in list(by_id.values())[:40]:
+        task['done'] = True
+    check()
+
+
+def test_search_matches_linear_scan():
+    words = ['aa', 'aaa', 'ab', 'ba', '报告', '会议', 'Übung', 'x']
+    rng = random.Random(2)
+    tasks = make_tasks(300)
+    for task in tasks:
+        task['name'] = ' '.join(rng.choice(words) for _ in range(rng.randint(1, 4)))
+    store = TaskStore(tasks)
+
+    for query in ['aa', 'AAA', 'a b', 'ab ba', '报告 会议', 'üb', 'x', 'aa x 报', 'zz']:
+        terms = query.lower().split()
+        reference = {task['id'] for task in tasks if all(term in task['name'].lower() for term in terms)}
+        results = store.search(query)
+        assert {task['id'] for task in results} == reference, query
+        # 堆选出的前几个结果与完整排序的前缀一致
+        assert store.search(query, limit=5) == results[:5]
+
+
+def test_search_ranks_repeated_terms_higher():
+    store = TaskStore([
+        {'id': 1, 'name': 'aa 报告', 'date': '2025-01-01', 'category': 'c', 'done': False},
+        {'id': 2, 'name': 'aaaa 报告', 'date': '2025-01-02', 'category': 'c', 'done': False},
+        {'id': 3, 'name': 'bb', 'date': '2025-01-03', 'category': 'c', 'done': False},
+    ])
+    assert [task['id'] for task in store.search('aa')] == [2, 1]
+    assert store.search_index().score('aaaa', ['aa']) > store.search_index().score('aa b', ['aa'])
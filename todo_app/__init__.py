@@ -1,9 +1,13 @@
 # todo_app/__init__.py
-from pathlib import Path
-from importlib.metadata import version
+# 命令行每次调用都会导入本包，--help 等命令用不到 pathlib，在函数中导入
 
 __version__ = "0.1.0"
 
-def get_data_dir() -> Path:
-    """返回数据存储目录"""
-    return Path(__file__).parent / 'data'
\ No newline at end of file
+def get_data_dir():
+    """返回数据存储目录
+
+    Returns:
+        数据目录的 pathlib.Path
+    """
+    from pathlib import Path
+    return Path(__file__).parent / 'data'
@@ -0,0 +1,154 @@
+# todo_app/cli/backends/__init__.py
+"""存储后端
+
+TaskManager 负责参数校验、变更事件和错误处理，读写数据委托给存储后端。
+后端实现 StorageBackend 中的方法，按名称注册后即可通过
+TaskManager(storage_type=名称) 使用::
+
+    register_backend('mybackend', 'mypackage.backend:MyBackend')
+
+内置后端:
+    sqlite   SQLite 数据库 (默认)
+    json     整体读写的 JSON 文件
+    journal  追加写入的 JSON Lines 日志
+    memory   只在内存中，不持久化，用于测试和基准
+
+注册时可以只给出 '模块:类名'，后端模块在第一次创建时才导入，
+命令行不会为用不到的后端付出导入开销。
+"""
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Protocol, Tuple, Union, runtime_checkable
+
+from ..store import SortKey
+
+# 筛选条件 (是否完成, 分类, 名称关键词, 开始日期, 结束日期)，各项含义与 TaskManager.get_tasks 相同
+Filters = Tuple[Optional[bool], Optional[str], Optional[str], Optional[str], Optional[str]]
+# 规范化后的新任务 (名称, 日期, 分类, 是否完成)
+TaskRow = Tuple[str, str, str, bool]
+
+NO_FILTERS: Filters = (None, None, None, None, None)
+
+
+@runtime_checkable
+class StorageBackend(Protocol):
+    """存储后端接口
+
+    传入的数据已由 TaskManager 校验和规范化，后端只负责存取。返回的任务字典至少包含
+    id/name/date/category/done，列表按 (日期, 创建时间, ID) 排序，与 store.sort_key 一致。
+    出错时直接抛出异常，由 TaskManager 记录日志并返回失败结果。
+
+    thread_safe 为 False 的后端由 TaskManager 用同一把锁串行化所有调用。
+    """
+
+    thread_safe: bool
+
+    def add_many(self, rows: List[TaskRow]) -> List[Dict]:
+        """在一次写入中添加任务，返回带ID的新任务，顺序与 rows 一致"""
+        ...
+
+    def import_rows(self, rows: Iterable[TaskRow], batch_size: int,
+                    returning: bool = True) -> Iterator[Tuple[int, List[Dict]]]:
+        """分块导入大量任务，每写入一块产生 (写入数, 新任务)
+
+        returning 为 False 时可以不读取新任务 (产生空列表)，省去回读的开销。
+        """
+        ...
+
+    def get(self, task_id: int) -> Optional[Dict]:
+        """根据ID返回任务，找不到返回None"""
+        ...
+
+    def get_many(self, task_ids: List[int]) -> Dict[int, Dict]:
+        """返回存在的任务 (ID -> 任务)"""
+        ...
+
+    def query(self, filters: Filters, limit: Optional[int] = None, offset: Optional[int] = None) -> List[Dict]:
+        """返回符合条件的任务"""
+        ...
+
+    def query_after(self, filters: Filters, after: Optional[SortKey], limit: int,
+                    offset: int = 0) -> List[Tuple[Dict, SortKey]]:
+        """跳过排序键大于 after 的前 offset 个任务，返回其后 limit 个任务及各自的排序键，用于游标分页"""
+        ...
+
+    def scan(self, filters: Filters, chunk_size: int) -> Iterator[List[Dict]]:
+        """按排序键顺序分块产生符合条件的任务，不把结果整体读入内存"""
+        ...
+
+    def count(self, filters: Filters) -> int:
+        """统计符合条件的任务数"""
+        ...
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Dict]:
+        """按相关度搜索任务名称，名称须包含全部关键词 (子串匹配，不区分大小写)"""
+        ...
+
+    def update_many(self, changes: Dict[int, Dict]) -> List[int]:
+        """在一次写入中更新任务的部分字段，返回实际更新的任务ID"""
+        ...
+
+    def delete_many(self, task_ids: List[int]) -> List[int]:
+        """在一次写入中删除任务，返回实际删除的任务ID"""
+        ...
+
+    def categories(self) -> List[str]:
+        """返回排序后的分类列表"""
+        ...
+
+    def counts(self, by_date: bool = False) -> Tuple[Dict[str, List[int]], Dict[str, List[int]]]:
+        """按分类、按日期统计 [总数, 已完成数]，by_date 为 False 时日期统计为空"""
+        ...
+
+    def export(self, chunk_size: int) -> Iterator[List[Dict]]:
+        """按ID顺序分块产生全部任务，任务中包含 created_at"""
+        ...
+
+    def close(self):
+        """释放连接、文件等资源，可重复调用"""
+        ...
+
+
+# 名称 -> 后端类，或 '模块:类名' (首次使用时导入)
+_BACKENDS: Dict[str, Union[str, Callable[..., StorageBackend]]] = {
+    'sqlite': 'todo_app.cli.backends.sqlite:SQLiteBackend',
+    'json': 'todo_app.cli.backends.jsonfile:JSONBackend',
+    'journal': 'todo_app.cli.backends.journal:JournalBackend',
+    'memory': 'todo_app.cli.backends.memory:MemoryBackend',
+}
+
+
+def register_backend(name: str, factory: Union[str, Callable[..., StorageBackend]]):
+    """注册存储后端，同名时覆盖
+
+    Args:
+        name: 后端名称，即 TaskManager 的 storage_type
+        factory: 后端类 (以 data_dir 和关键字参数调用)，或 '模块:类名'
+    """
+    _BACKENDS[name] = factory
+
+
+def available_backends() -> List[str]:
+    """返回已注册的后端名称"""
+    return sorted(_BACKENDS)
+
+
+def get_backend(name: str) -> Callable[..., StorageBackend]:
+    """返回后端类，未注册时抛出 ValueError"""
+    factory = _BACKENDS.get(name)
+    if factory is None:
+        raise ValueError(f"未知的存储类型: {name}")
+    if isinstance(factory, str):
+        import importlib
+        module, attr = factory.split(':')
+        factory = _BACKENDS[name] = getattr(importlib.import_module(module), attr)
+    return factory
+
+
+def create_backend(name: str, data_dir, **options) -> StorageBackend:
+    """创建后端实例
+
+    Args:
+        name: 后端名称
+        data_dir: 数据目录 (Path)
+        **options: 传给后端的参数，如 SQLite 的 profile
+    """
+    return get_backend(name)(data_dir, **options)
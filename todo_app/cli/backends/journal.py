@@ -0,0 +1,52 @@
+# todo_app/cli/backends/journal.py
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple, Union
+
+from ..journal import TaskJournal
+from .memory import MemoryBackend
+
+
+class JournalBackend(MemoryBackend):
+    """JSON Lines 日志存储后端
+
+    写操作只向日志末尾追加记录，开销与任务总数无关；读操作走内存索引，
+    日志的写入代数与索引记录的不一致 (其他进程写入) 时重建索引。
+    """
+
+    def __init__(self, data_dir: Union[str, Path]):
+        """
+        Args:
+            data_dir: 数据目录，日志文件为其中的 taskstest.jsonl
+        """
+        super().__init__()
+        self.journal = TaskJournal(Path(data_dir) / 'taskstest.jsonl')
+
+    def _source_token(self) -> Any:
+        """日志的写入代数"""
+        return self.journal.version()
+
+    def _load(self) -> Tuple[Any, List[Dict]]:
+        return self.journal.snapshot()
+
+    def _append(self, tasks: List[Dict]) -> List[Dict]:
+        return self.journal.add_many(tasks)
+
+    def _write_updates(self, changes: Dict[int, Dict], updated_at: str) -> List[Dict]:
+        written = self.journal.update_many(
+            {task_id: dict(fields, updated_at=updated_at) for task_id, fields in changes.items()})
+        return [self.journal.get(task_id) for task_id, ok in written.items() if ok]
+
+    def _write_deletes(self, task_ids: List[int]) -> List[int]:
+        written = self.journal.delete_many(list(dict.fromkeys(task_ids)))
+        return [task_id for task_id, ok in written.items() if ok]
+
+    def _apply(self, put: List[Dict] = (), removed: Iterable[int] = (), records: int = 0):
+        store = self._store
+        if store is not None and self._source_token() != store.token + records:
+            # 期间有其他进程写入，索引已过期，下次读取时重建
+            self._store = None
+            return
+        super()._apply(put, removed, records)
+
+    def close(self):
+        self.journal.close()
@@ -0,0 +1,86 @@
+# todo_app/cli/backends/jsonfile.py
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+
+from . import TaskRow
+from .memory import MemoryBackend, _new_task
+
+logger = logging.getLogger(__name__)
+
+
+class JSONBackend(MemoryBackend):
+    """JSON 文件存储后端
+
+    每次写入都整体重写文件，读操作走内存索引；文件的 mtime 和大小变化 (其他进程写入) 时重建索引。
+    """
+
+    def __init__(self, data_dir: Union[str, Path]):
+        """
+        Args:
+            data_dir: 数据目录，数据文件为其中的 taskstest.json
+        """
+        super().__init__()
+        self.json_path = Path(data_dir) / 'taskstest.json'
+
+    def _source_token(self) -> Any:
+        """文件 mtime 和大小"""
+        try:
+            stat = self.json_path.stat()
+            return stat.st_mtime_ns, stat.st_size
+        except FileNotFoundError:
+            return None
+
+    def _load(self) -> Tuple[Any, List[Dict]]:
+        token = self._source_token()
+        try:
+            if self.json_path.exists():
+                with open(self.json_path, 'r', encoding='utf-8') as f:
+                    return token, json.load(f)
+            return token, []
+        except Exception as e:
+            logger.error(f"加载JSON数据失败: {str(e)}")
+            return token, []
+
+    def _save(self, tasks: List[Dict]):
+        """保存全部任务，失败时抛出异常"""
+        try:
+            with open(self.json_path, 'w', encoding='utf-8') as f:
+                json.dump(tasks, f, indent=2, ensure_ascii=False)
+        except Exception:
+            # 文件内容未知，丢弃内存索引以便下次重新加载
+            self._store = None
+            raise
+
+    def _append(self, tasks: List[Dict]) -> List[Dict]:
+        added = super()._append(tasks)
+        self._save(self._get_store().all() + added)
+        return added
+
+    def _write_updates(self, changes: Dict[int, Dict], updated_at: str) -> List[Dict]:
+        changed = super()._write_updates(changes, updated_at)
+        if changed:
+            by_id = {task['id']: task for task in changed}
+            self._save([by_id.get(task['id'], task) for task in self._get_store().all()])
+        return changed
+
+    def _write_deletes(self, task_ids: List[int]) -> List[int]:
+        deleted = super()._write_deletes(task_ids)
+        if deleted:
+            removed = set(deleted)
+            self._save([task for task in self._get_store().all() if task['id'] not in removed])
+        return deleted
+
+    def import_rows(self, rows: Iterable[TaskRow], batch_size: int,
+                    returning: bool = True) -> Iterator[Tuple[int, List[Dict]]]:
+        """全部读完后只写一次文件，文件整体重写的开销与批次数无关"""
+        created_at = datetime.now().isoformat()
+        added = super()._append([_new_task(row, created_at) for row in rows])
+        if not added:
+            return
+        self._save(self._get_store().all() + added)
+        # 大量新任务逐个加入内存索引不如下次读取时整体重建
+        self._store = None
+        yield len(added), added
@@ -0,0 +1,185 @@
+# todo_app/cli/backends/memory.py
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..store import SortKey, TaskStore, sort_key
+from . import Filters, TaskRow
+
+
+def _new_task(row: TaskRow, created_at: str) -> Dict:
+    """由规范化的任务行生成不含ID的新任务"""
+    return {'name': row[0], 'date': row[1], 'category': row[2], 'done': row[3], 'created_at': created_at}
+
+
+class MemoryBackend:
+    """进程内存储后端，数据只保存在 TaskStore 索引中，不持久化
+
+    也是 JSON 和日志后端的基类：读操作都走内存索引 (分桶/位图/二分查找)，
+    子类提供数据源的加载 (_load/_source_token) 和写入 (_append/_write_updates/_write_deletes)，
+    数据源被其他进程修改时按版本标记重建索引。
+    """
+
+    thread_safe = False
+
+    def __init__(self, data_dir=None):
+        """
+        Args:
+            data_dir: 不使用，与其他后端的参数保持一致
+        """
+        self._store: Optional[TaskStore] = None
+        # 已分配的最大ID及其所属的索引，索引重建后重新计算
+        self._last_id = 0
+        self._last_id_store: Optional[TaskStore] = None
+
+    # ------------------------------------------------------------------
+    # 数据源，由子类覆盖
+    # ------------------------------------------------------------------
+
+    def _source_token(self) -> Any:
+        """数据源的版本标记，与索引中记录的不同时重建索引"""
+        return None
+
+    def _load(self) -> Tuple[Any, List[Dict]]:
+        """读取数据源，返回 (版本标记, 全部任务)"""
+        return None, []
+
+    def _append(self, tasks: List[Dict]) -> List[Dict]:
+        """为新任务分配ID并写入数据源，返回带ID的任务"""
+        store = self._get_store()
+        if self._last_id_store is not store:
+            self._last_id = max(store.by_id, default=0)
+            self._last_id_store = store
+        next_id = self._last_id + 1
+        self._last_id += len(tasks)
+        return [dict(task, id=next_id + i) for i, task in enumerate(tasks)]
+
+    def _write_updates(self, changes: Dict[int, Dict], updated_at: str) -> List[Dict]:
+        """将字段更新写入数据源，返回更新后的任务"""
+        store = self._get_store()
+        changed = []
+        for task_id, fields in changes.items():
+            task = store.get(task_id)
+            if task is not None:
+                task.update(fields, updated_at=updated_at)
+                changed.append(task)
+        return changed
+
+    def _write_deletes(self, task_ids: List[int]) -> List[int]:
+        """从数据源删除任务，返回实际删除的ID"""
+        by_id = self._get_store().by_id
+        return [task_id for task_id in dict.fromkeys(task_ids) if task_id in by_id]
+
+    # ------------------------------------------------------------------
+    # 内存索引
+    # ------------------------------------------------------------------
+
+    def _get_store(self) -> TaskStore:
+        """返回与数据源同步的内存索引，数据源变化时重建"""
+        token = self._source_token()
+        if self._store is None or self._store.token != token:
+            token, tasks = self._load()
+            self._store = TaskStore(tasks, token)
+        return self._store
+
+    def _apply(self, put: List[Dict] = (), removed: Iterable[int] = (), records: int = 0):
+        """将本进程的写入增量应用到内存索引
+
+        Args:
+            put: 新增或更新后的任务
+            removed: 被删除的任务ID
+            records: 本次写入追加的记录数，日志后端用于发现其他进程的并发写入
+        """
+        store = self._store
+        if store is None:
+            return
+        store.put_many([dict(task) for task in put])
+        for task_id in removed:
+            store.remove(task_id)
+        store.token = self._source_token()
+
+    # ------------------------------------------------------------------
+    # StorageBackend
+    # ------------------------------------------------------------------
+
+    def add_many(self, rows: List[TaskRow]) -> List[Dict]:
+        created_at = datetime.now().isoformat()
+        added = self._append([_new_task(row, created_at) for row in rows])
+        self._apply(put=added, records=len(added))
+        return added
+
+    def import_rows(self, rows: Iterable[TaskRow], batch_size: int,
+                    returning: bool = True) -> Iterator[Tuple[int, List[Dict]]]:
+        from ..transfer import chunked
+
+        for chunk in chunked(rows, batch_size):
+            added = self.add_many(chunk)
+            yield len(added), added
+
+    def get(self, task_id: int) -> Optional[Dict]:
+        return self._get_store().get(task_id)
+
+    def get_many(self, task_ids: List[int]) -> Dict[int, Dict]:
+        store = self._get_store()
+        tasks = (store.get(task_id) for task_id in task_ids)
+        return {task['id']: task for task in tasks if task}
+
+    def query(self, filters: Filters, limit: Optional[int] = None, offset: Optional[int] = None) -> List[Dict]:
+        # 索引已按 (日期, 创建时间) 排序，筛选条件走分桶/位图/二分查找
+        tasks = self._get_store().query(*filters)
+        if limit is not None or offset:
+            start = offset or 0
+            tasks = islice(tasks, start, None if limit is None else start + limit)
+        return list(tasks)
+
+    def query_after(self, filters: Filters, after: Optional[SortKey], limit: int,
+                    offset: int = 0) -> List[Tuple[Dict, SortKey]]:
+        tasks = islice(self._get_store().query(*filters, after=after), offset, offset + limit)
+        return [(task, sort_key(task)) for task in tasks]
+
+    def scan(self, filters: Filters, chunk_size: int) -> Iterator[List[Dict]]:
+        """每块从上一块最后一个排序键之后继续，块之间的写入不会打乱遍历"""
+        after = None
+        while True:
+            chunk = self.query_after(filters, after, chunk_size)
+            if chunk:
+                yield [task for task, _ in chunk]
+            if len(chunk) < chunk_size:
+                return
+            after = chunk[-1][1]
+
+    def count(self, filters: Filters) -> int:
+        return self._get_store().count(*filters)
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Dict]:
+        return self._get_store().search(query, limit)
+
+    def update_many(self, changes: Dict[int, Dict]) -> List[int]:
+        changed = self._write_updates(changes, datetime.now().isoformat())
+        self._apply(put=changed, records=len(changed))
+        return [task['id'] for task in changed]
+
+    def delete_many(self, task_ids: List[int]) -> List[int]:
+        deleted = self._write_deletes(task_ids)
+        self._apply(removed=deleted, records=len(deleted))
+        return deleted
+
+    def categories(self) -> List[str]:
+        return self._get_store().categories()
+
+    def counts(self, by_date: bool = False) -> Tuple[Dict[str, List[int]], Dict[str, List[int]]]:
+        """直接读取索引中维护的计数，开销与分类数、日期数成正比，与任务总数无关"""
+        store = self._get_store()
+        category_counts = {key: list(value) for key, value in store.category_counts.items()}
+        date_counts = {key: list(value) for key, value in store.date_counts.items()} if by_date else {}
+        return category_counts, date_counts
+
+    def export(self, chunk_size: int) -> Iterator[List[Dict]]:
+        """先取ID快照，再分块复制任务"""
+        ids = sorted(self._get_store().by_id)
+        for start in range(0, len(ids), chunk_size):
+            by_id = self._get_store().by_id
+            yield [dict(by_id[task_id]) for task_id in ids[start:start + chunk_size] if task_id in by_id]
+
+    def close(self):
+        pass
@@ -0,0 +1,349 @@
+# todo_app/cli/backends/sqlite.py
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from ..search import split_terms
+from ..sqlite_profile import SQLiteProfile, get_sqlite_profile
+from ..store import SortKey
+from . import Filters, TaskRow
+
+# 查询任务时读取的列，与 _task 的下标对应
+_COLUMNS = "id, name, date, category, done"
+
+
+# 插入任务的语句，name_lower 由 _insert_params 按 str.lower() 计算
+_INSERT = "INSERT INTO tasks (name, name_lower, date, category, done) VALUES (?, ?, ?, ?, ?)"
+
+
+def _insert_params(rows: Iterable[TaskRow]) -> Iterator[tuple]:
+    """将任务行转换为 _INSERT 的参数"""
+    for name, task_date, category, done in rows:
+        yield name, name.lower(), task_date, category, done
+
+
+def _task(row) -> Dict:
+    """将查询结果行转换为任务字典"""
+    return {
+        'id': row[0],
+        'name': row[1],
+        'date': row[2],
+        'category': row[3],
+        'done': bool(row[4])
+    }
+
+
+class SQLiteBackend:
+    """SQLite 存储后端
+
+    写连接负责所有事务；每个线程另有一个只读连接，处于自动提交模式，查询不开启事务，
+    后台线程的查询不与界面线程共享连接。数据库自身负责写入加锁，可以被多个线程同时调用。
+    """
+
+    thread_safe = True
+
+    def __init__(self, data_dir: Union[str, Path], profile: Union[str, SQLiteProfile] = 'performance'):
+        """
+        Args:
+            data_dir: 数据目录，数据库文件为其中的 taskstest.db
+            profile: SQLite 性能配置名称 ('performance' 或 'default') 或配置对象
+        """
+        self.db_path = Path(data_dir) / 'taskstest.db'
+        self.profile = get_sqlite_profile(profile)
+        self._local = threading.local()
+        self._read_conns = []
+        self._lock = threading.Lock()
+        self.conn = self.profile.connect(self.db_path)
+        self._init_db()
+
+    @property
+    def read_conn(self):
+        """当前线程的只读数据库连接，首次访问时创建"""
+        conn = getattr(self._local, 'read_conn', None)
+        if conn is None:
+            conn = self.profile.connect(self.db_path, readonly=True)
+            self._local.read_conn = conn
+            with self._lock:
+                self._read_conns.append(conn)
+        return conn
+
+    def _init_db(self):
+        """初始化数据库表结构，按 PRAGMA user_version 执行尚未应用的迁移"""
+        from ..migrations import migrate
+        migrate(self.conn)
+        self.fts_enabled = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts'"
+        ).fetchone() is not None
+
+    def add_many(self, rows: List[TaskRow]) -> List[Dict]:
+        if len(rows) == 1:
+            with self.conn:
+                result = self.conn.execute(
+                    f"{_INSERT} RETURNING {_COLUMNS}", next(_insert_params(rows))).fetchone()
+            return [_task(result)]
+
+        with self.conn:
+            # 立即获取写锁，保证本事务插入的ID连续
+            self.conn.execute("BEGIN IMMEDIATE")
+            last_id = self._last_id()
+            self.conn.executemany(_INSERT, _insert_params(rows))
+            return self._fetch_after(last_id, self._last_id())
+
+    def import_rows(self, rows: Iterable[TaskRow], batch_size: int,
+                    returning: bool = True) -> Iterator[Tuple[int, List[Dict]]]:
+        """每 batch_size 条在一个事务中用 executemany 写入，全文索引整块补建"""
+        from ..migrations import FTS_INSERT_TRIGGER
+        from ..transfer import chunked
+
+        for chunk in chunked(rows, batch_size):
+            with self.conn:
+                self.conn.execute("BEGIN IMMEDIATE")
+                last_id = self._last_id()
+                if self.fts_enabled:
+                    # 逐行触发器写全文索引比整块写入慢数倍。事务持有写锁，
+                    # 删除触发器期间其他连接无法插入，不会漏建索引
+                    self.conn.execute("DROP TRIGGER IF EXISTS tasks_fts_insert")
+                self.conn.executemany(_INSERT, _insert_params(chunk))
+                if self.fts_enabled:
+                    self.conn.execute(
+                        "INSERT INTO tasks_fts(rowid, name) SELECT id, name FROM tasks WHERE id > ?",
+                        (last_id,))
+                    self.conn.execute(FTS_INSERT_TRIGGER)
+                # 在提交前读取，事务持有写锁，读到的只有本块插入的任务
+                inserted = self._fetch_after(last_id, self._last_id()) if returning else []
+            yield len(chunk), inserted
+
+    def get(self, task_id: int) -> Optional[Dict]:
+        result = self.read_conn.execute(
+            f"SELECT {_COLUMNS} FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return _task(result) if result else None
+
+    def get_many(self, task_ids: List[int], chunk_size: int = 500) -> Dict[int, Dict]:
+        """分块查询以避免超出参数个数限制。使用写连接，读到本连接刚提交的写入"""
+        tasks = {}
+        for i in range(0, len(task_ids), chunk_size):
+            chunk = task_ids[i:i + chunk_size]
+            cursor = self.conn.execute(
+                f"SELECT {_COLUMNS} FROM tasks WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+            for row in cursor:
+                tasks[row[0]] = _task(row)
+        return tasks
+
+    def query(self, filters: Filters, limit: Optional[int] = None, offset: Optional[int] = None) -> List[Dict]:
+        where, params = self._build_where(*filters)
+        query = f"""SELECT {_COLUMNS}
+                  FROM tasks WHERE {where}
+                  ORDER BY date ASC, created_at ASC, id ASC"""
+
+        if limit is not None or offset:
+            # LIMIT -1 表示不限制条数，使单独的 offset 也能生效
+            query += " LIMIT ? OFFSET ?"
+            params.extend([-1 if limit is None else limit, offset or 0])
+
+        return [_task(row) for row in self.read_conn.execute(query, params).fetchall()]
+
+    def query_after(self, filters: Filters, after: Optional[SortKey], limit: int,
+                    offset: int = 0) -> List[Tuple[Dict, SortKey]]:
+        where, params = self._build_where(*filters)
+        if after is not None:
+            # 冗余的 date >= ? 让带等值前缀的组合索引也能直接定位到游标位置
+            where += " AND date >= ? AND (date, created_at, id) > (?, ?, ?)"
+            params.extend([after[0], *after])
+        params.extend([limit, offset])
+
+        cursor = self.read_conn.execute(
+            f"""SELECT {_COLUMNS}, created_at
+            FROM tasks WHERE {where}
+            ORDER BY date ASC, created_at ASC, id ASC LIMIT ? OFFSET ?""",
+            params)
+        return [(_task(row), (row[2], row[5], row[0])) for row in cursor.fetchall()]
+
+    def scan(self, filters: Filters, chunk_size: int) -> Iterator[List[Dict]]:
+        """从一个游标分块读取，不把结果集整体读入内存"""
+        where, params = self._build_where(*filters)
+        cursor = self.read_conn.execute(
+            f"""SELECT {_COLUMNS}
+            FROM tasks WHERE {where}
+            ORDER BY date ASC, created_at ASC, id ASC""",
+            params)
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [_task(row) for row in rows]
+        finally:
+            cursor.close()
+
+    def count(self, filters: Filters) -> int:
+        where, params = self._build_where(*filters)
+        return self.read_conn.execute(f"SELECT COUNT(*) FROM tasks WHERE {where}", params).fetchone()[0]
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Dict]:
+        terms = split_terms(query)
+        if not terms:
+            return []
+
+        # 3个字符以上的关键词走全文索引并参与排序，更短的关键词只能逐行匹配子串
+        fts_terms = [t for t in terms if self.fts_enabled and len(t) >= 3]
+        scan_terms = [t for t in terms if t not in fts_terms]
+        params = []
+
+        if fts_terms:
+            query_sql = """SELECT t.id, t.name, t.date, t.category, t.done
+                FROM tasks_fts f JOIN tasks t ON t.id = f.rowid
+                WHERE tasks_fts MATCH ?"""
+            params.append(' '.join(self._fts_phrase(t) for t in fts_terms))
+            order = "f.rank, t.date, t.created_at, t.id"
+        else:
+            query_sql = """SELECT t.id, t.name, t.date, t.category, t.done
+                FROM tasks t WHERE 1=1"""
+            order = "t.date, t.created_at, t.id"
+
+        for term in scan_terms:
+            query_sql += " AND instr(t.name_lower, ?) > 0"
+            params.append(term)
+
+        query_sql += f" ORDER BY {order}"
+        if limit is not None:
+            query_sql += " LIMIT ?"
+            params.append(limit)
+
+        return [_task(row) for row in self.read_conn.execute(query_sql, params).fetchall()]
+
+    def update_many(self, changes: Dict[int, Dict]) -> List[int]:
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            existing = self._existing_ids(list(changes))
+
+            # 按更新的列分组，每组一次 executemany
+            groups: Dict[tuple, List[tuple]] = {}
+            for task_id, fields in changes.items():
+                if task_id in existing:
+                    if 'name' in fields:
+                        fields = dict(fields, name_lower=fields['name'].lower())
+                    groups.setdefault(tuple(fields), []).append((*fields.values(), task_id))
+
+            for columns, params in groups.items():
+                set_clause = ', '.join(f"{column} = ?" for column in columns)
+                self.conn.executemany(
+                    f"UPDATE tasks SET {set_clause}, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                    params)
+        return [task_id for task_id in changes if task_id in existing]
+
+    def delete_many(self, task_ids: List[int]) -> List[int]:
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            existing = self._existing_ids(task_ids)
+            self.conn.executemany(
+                "DELETE FROM tasks WHERE id = ?",
+                [(task_id,) for task_id in existing])
+        return [task_id for task_id in dict.fromkeys(task_ids) if task_id in existing]
+
+    def categories(self) -> List[str]:
+        cursor = self.read_conn.execute("SELECT DISTINCT category FROM tasks ORDER BY category")
+        return [row[0] for row in cursor.fetchall()]
+
+    def counts(self, by_date: bool = False) -> Tuple[Dict[str, List[int]], Dict[str, List[int]]]:
+        # 分组顺序与 idx_tasks_category_done_order / idx_tasks_done_order 一致，只扫描索引
+        category_counts = {}
+        for category, done, count in self.read_conn.execute(
+                "SELECT category, done, COUNT(*) FROM tasks GROUP BY category, done"):
+            entry = category_counts.setdefault(category, [0, 0])
+            entry[0] += count
+            entry[1] += count if done else 0
+
+        date_counts = {}
+        if by_date:
+            for done, task_date, count in self.read_conn.execute(
+                    "SELECT done, date, COUNT(*) FROM tasks GROUP BY done, date"):
+                entry = date_counts.setdefault(task_date, [0, 0])
+                entry[0] += count
+                entry[1] += count if done else 0
+        return category_counts, date_counts
+
+    def export(self, chunk_size: int) -> Iterator[List[Dict]]:
+        """直接从游标分块读取，不把结果集整体读入内存"""
+        cursor = self.read_conn.execute(
+            f"SELECT {_COLUMNS}, created_at FROM tasks ORDER BY id")
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [dict(_task(row), created_at=row[5]) for row in rows]
+        finally:
+            cursor.close()
+
+    def close(self):
+        with self._lock:
+            read_conns, self._read_conns = self._read_conns, []
+        for conn in read_conns:
+            conn.close()
+        self.conn.close()
+
+    def _build_where(
+            self,
+            filter_done: Optional[bool],
+            category: Optional[str],
+            search_query: Optional[str],
+            start_date: Optional[str],
+            end_date: Optional[str]
+    ) -> Tuple[str, List]:
+        """根据筛选条件生成 WHERE 子句和参数 (内部方法)"""
+        conditions = ["1=1"]
+        params = []
+
+        if filter_done is not None:
+            conditions.append("done = ?")
+            params.append(int(filter_done))
+
+        if category:
+            conditions.append("category = ?")
+            params.append(category)
+
+        if search_query:
+            if self.fts_enabled and len(search_query) >= 3:
+                # 全文索引的短语查询即子串匹配
+                conditions.append("id IN (SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH ?)")
+                params.append(self._fts_phrase(search_query))
+            else:
+                # 与内存索引一样按 str.lower() 忽略大小写 (LIKE 只忽略 ASCII 字母的大小写)
+                conditions.append("instr(name_lower, ?) > 0")
+                params.append(search_query.lower())
+
+        if start_date:
+            conditions.append("date >= ?")
+            params.append(start_date)
+
+        if end_date:
+            conditions.append("date <= ?")
+            params.append(end_date)
+
+        return " AND ".join(conditions), params
+
+    @staticmethod
+    def _fts_phrase(text: str) -> str:
+        """将文本转义为 FTS5 短语，避免关键词被解析为查询语法 (内部方法)"""
+        return '"' + text.replace('"', '""') + '"'
+
+    def _last_id(self) -> int:
+        """当前最大的已分配ID，须在写事务中调用 (内部方法)"""
+        seq = self.conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'tasks'").fetchone()
+        return seq[0] if seq else 0
+
+    def _fetch_after(self, last_id: int, max_id: int) -> List[Dict]:
+        """读取ID在 (last_id, max_id] 内的任务，即本事务刚插入的任务，须在写事务中调用 (内部方法)"""
+        cursor = self.conn.execute(
+            f"SELECT {_COLUMNS} FROM tasks WHERE id > ? AND id <= ? ORDER BY id", (last_id, max_id))
+        return [_task(row) for row in cursor]
+
+    def _existing_ids(self, task_ids: List[int], chunk_size: int = 500) -> set:
+        """返回数据库中存在的任务ID，分块查询以避免超出参数个数限制 (内部方法)"""
+        existing = set()
+        for i in range(0, len(task_ids), chunk_size):
+            chunk = task_ids[i:i + chunk_size]
+            cursor = self.conn.execute(
+                f"SELECT id FROM tasks WHERE id IN ({', '.join('?' * len(chunk))})", chunk)
+            existing.update(row[0] for row in cursor)
+        return existing
@@ -1,12 +1,24 @@
 # todo_app/cli/cli.py
 import argparse
-from .core import TaskManager
 
 
 class TodoCLI:
     def __init__(self):
-        self.manager = TaskManager(storage_type='json')  # 可改为'sqlite'
         self.parser = self._setup_parser()
+        # 首次访问 manager 时才导入存储模块并打开存储，--help 和参数错误不会触及数据目录
+        self._manager = None
+
+    @property
+    def manager(self):
+        """常驻进程在运行时返回转发调用的客户端，否则在本进程中打开存储"""
+        if self._manager is None:
+            from .daemon import DaemonClient
+            self._manager = DaemonClient.connect() or self._open_manager()
+        return self._manager
+
+    def _open_manager(self):
+        from .core import TaskManager
+        return TaskManager(storage_type='json')  # 可改为'sqlite'
 
     def _setup_parser(self) -> argparse.ArgumentParser:
         parser = argparse.ArgumentParser(description='待办事项管理')
@@ -24,17 +36,153 @@ class TodoCLI:
         list_parser.add_argument('--pending', action='store_true', help='只显示未完成')
         list_parser.add_argument('--category', help='按分类筛选')
 
+        # 标记完成 (可一次指定多个任务)
+        done_parser = subparsers.add_parser('done', help='标记任务为已完成')
+        done_parser.add_argument('ids', nargs='+', type=int, help='任务ID')
+        done_parser.add_argument('--undo', action='store_true', help='标记为未完成')
+
+        # 删除任务 (可一次指定多个任务)
+        delete_parser = subparsers.add_parser('delete', help='删除任务')
+        delete_parser.add_argument('ids', nargs='+', type=int, help='任务ID')
+
+        # 导入导出 (CSV / NDJSON)
+        import_parser = subparsers.add_parser('import', help='从 CSV 或 NDJSON 文件批量导入任务')
+        import_parser.add_argument('file', help='文件路径，- 表示标准输入')
+        import_parser.add_argument('-f', '--format', choices=['csv', 'ndjson'], help='文件格式，默认按扩展名判断')
+        import_parser.add_argument('--batch-size', type=int, default=5000, help='每个事务写入的任务数（默认 5000）')
+        import_parser.add_argument('-j', '--workers', type=int, default=1,
+                                   help='并行解析的进程数，0 表示 CPU 核数（默认 1；读取标准输入时总是 1）')
+
+        export_parser = subparsers.add_parser('export', help='将全部任务导出为 CSV 或 NDJSON 文件')
+        export_parser.add_argument('file', help='文件路径，- 表示标准输出')
+        export_parser.add_argument('-f', '--format', choices=['csv', 'ndjson'], help='文件格式，默认按扩展名判断')
+
+        # 常驻进程
+        serve_parser = subparsers.add_parser('serve', help='启动常驻进程，其他命令自动转发给它执行')
+        serve_parser.add_argument('--stop', action='store_true', help='停止正在运行的常驻进程')
+
         return parser
 
     def run(self):
         args = self.parser.parse_args()
+        handlers = {
+            'add': self._handle_add,
+            'list': self._handle_list,
+            'done': self._handle_done,
+            'delete': self._handle_delete,
+            'import': self._handle_import,
+            'export': self._handle_export,
+        }
+        if args.command == 'serve':
+            self._handle_serve(args)
+            return
+        if args.command not in handlers:
+            self.parser.print_help()
+            return
+
+        if args.command in ('import', 'export'):
+            # 数据流无法通过常驻进程转发，总是在本进程中执行
+            self._manager = self._open_manager()
+
+        from .daemon import DaemonError
+        with self.manager:
+            try:
+                return handlers[args.command](args)
+            except DaemonError as e:
+                print(f"✗ 常驻进程执行失败: {e}")
+                return 1
+
+    def _handle_serve(self, args):
+        from .daemon import DaemonError, serve, shutdown
+        if args.stop:
+            print("✓ 已通知常驻进程退出" if shutdown() else "常驻进程未运行")
+            return
+        with self._open_manager() as manager:
+            try:
+                serve(manager)
+            except DaemonError as e:
+                print(f"✗ {e}")
+
+    def _transfer_format(self, args):
+        """导入导出的文件格式，无法确定时提示并返回 None"""
+        from .transfer import guess_format
 
-        if args.command == 'add':
-            self._handle_add(args)
-        elif args.command == 'list':
-            self._handle_list(args)
+        fmt = args.format or guess_format(args.file)
+        if fmt is None:
+            print("✗ 无法根据扩展名判断文件格式，请用 --format 指定 csv 或 ndjson")
+        return fmt
+
+    def _open_transfer_file(self, args, mode):
+        """打开导入导出文件，返回 (文件对象, 格式)，格式无法确定时返回 (None, None)"""
+        import sys
+
+        fmt = self._transfer_format(args)
+        if fmt is None:
+            return None, None
+        if args.file == '-':
+            return (sys.stdin if mode == 'r' else sys.stdout), fmt
+        # utf-8-sig 读取时去掉 Excel 写入的 BOM
+        encoding = 'utf-8-sig' if mode == 'r' else 'utf-8'
+        return open(args.file, mode, encoding=encoding, newline=''), fmt
+
+    def _handle_import(self, args):
+        import os
+        import time
+        from .transfer import read_records
+
+        workers = args.workers or os.cpu_count() or 1
+        started = time.perf_counter()
+        if args.file == '-':
+            file, fmt = self._open_transfer_file(args, 'r')
+            if file is None:
+                return
+            summary = self.manager.import_tasks(read_records(file, fmt), batch_size=args.batch_size)
         else:
-            self.parser.print_help()
+            fmt = self._transfer_format(args)
+            if fmt is None:
+                return
+            try:
+                summary = self.manager.import_file(args.file, fmt, batch_size=args.batch_size, workers=workers)
+            except OSError as e:
+                print(f"✗ 无法打开文件: {e}")
+                return 1
+        elapsed = time.perf_counter() - started
+
+        for number, error in summary['errors']:
+            print(f"✗ 第 {number} 条: {error}")
+        if summary['failed']:
+            print(f"✗ 导入中途失败: {summary['failed']}")
+            print(f"  已提交的 {summary['imported']} 个任务保留，失败的一块已回滚")
+            return 1
+        rate = summary['imported'] / elapsed if elapsed > 0 else 0
+        print(f"✓ 已导入 {summary['imported']} 个任务，跳过 {summary['skipped']} 个，"
+              f"用时 {elapsed:.2f} 秒 ({rate:.0f} 个/秒)")
+
+    def _handle_export(self, args):
+        import sys
+        import time
+        from .transfer import write_records
+
+        try:
+            file, fmt = self._open_transfer_file(args, 'w')
+        except OSError as e:
+            print(f"✗ 无法打开文件: {e}")
+            return
+        if file is None:
+            return
+
+        started = time.perf_counter()
+        try:
+            count = write_records(self.manager.export_tasks(), file, fmt)
+        finally:
+            if args.file != '-':
+                file.close()
+        elapsed = time.perf_counter() - started
+
+        rate = count / elapsed if elapsed > 0 else 0
+        # 导出到标准输出时，统计信息写到标准错误，不混入导出内容
+        print(f"✓ 已导出 {count} 个任务，用时 {elapsed:.2f} 秒 ({rate:.0f} 个/秒)",
+              file=sys.stderr if args.file == '-' else sys.stdout)
 
     def _handle_add(self, args):
         task = self.manager.add_task(args.name, args.date, args.category)
@@ -55,8 +203,28 @@ class TodoCLI:
 
         for i, task in enumerate(tasks, 1):
             status = '✓' if task['done'] else '◻'
-            print(f"{i}. {status} {task['name']} ({task['category']})")
+            print(f"{i}. {status} {task['name']} ({task['category']}) #{task['id']}")
+
+    def _handle_done(self, args):
+        results = self.manager.update_tasks({task_id: {'done': not args.undo} for task_id in args.ids})
+        for task_id, success in results.items():
+            if success:
+                print(f"✓ 已更新任务 #{task_id}")
+            else:
+                print(f"✗ 更新任务 #{task_id} 失败")
+
+    def _handle_delete(self, args):
+        results = self.manager.delete_tasks(args.ids)
+        for task_id, success in results.items():
+            if success:
+                print(f"✓ 已删除任务 #{task_id}")
+            else:
+                print(f"✗ 删除任务 #{task_id} 失败")
 
 
 if __name__ == '__main__':
-    TodoCLI().run()
\ No newline at end of file
+    # logging 只在入口导入和配置，--help 等不需要存储的命令不加载
+    import logging
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(TodoCLI().run())
@@ -1,52 +1,134 @@
 # todo_app/cli/core.py
+import base64
+import functools
 import json
-import sqlite3
-from datetime import datetime
+import threading
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Optional, Union
+from typing import TYPE_CHECKING, Callable, List, Dict, Iterable, Iterator, Optional, Tuple, Union
 import logging
 
-# 配置日志
-logging.basicConfig(level=logging.INFO)
+from .events import TaskEvent
+from .store import SortKey
+
+if TYPE_CHECKING:
+    from .backends import StorageBackend
+    from .sqlite_profile import SQLiteProfile
+
+# 日志配置由入口 (cli.py / main_window.py) 负责，导入本模块不修改全局日志设置
 logger = logging.getLogger(__name__)
 
 
+def _encode_cursor(key: SortKey) -> str:
+    """将排序键 (日期, 创建时间, ID) 编码为不透明的分页游标"""
+    return base64.urlsafe_b64encode(
+        json.dumps(list(key), separators=(',', ':')).encode('utf-8')
+    ).decode('ascii')
+
+
+def _decode_cursor(cursor: str) -> SortKey:
+    """解析分页游标，格式错误时抛出 ValueError"""
+    try:
+        date, created_at, task_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return str(date), str(created_at), int(task_id)
+    except Exception:
+        raise ValueError(f"无效的分页游标: {cursor}") from None
+
+
+# import_tasks 结果中最多保留的错误数
+MAX_IMPORT_ERRORS = 100
+
+# get_stats 支持的日期分组粒度
+DATE_BUCKETS = ('day', 'week', 'month')
+
+
+def _date_bucket(task_date: str, bucket: str) -> str:
+    """将任务日期 (YYYY-MM-DD) 归入分组：当天、所在周的周一或所在月 (YYYY-MM)"""
+    if bucket == 'month':
+        return task_date[:7]
+    if bucket == 'week':
+        day = date.fromisoformat(task_date)
+        return (day - timedelta(days=day.weekday())).isoformat()
+    return task_date
+
+
+def _store_locked(method):
+    """串行化对非线程安全后端 (JSON/日志的内存索引) 的访问
+
+    SQLite 后端每个线程使用自己的只读连接，写操作由数据库加锁，无需额外的锁。
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.backend.thread_safe:
+            return method(self, *args, **kwargs)
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class TaskManager:
-    def __init__(self, storage_type: str = 'sqlite'):
+    def __init__(
+            self,
+            storage_type: str = 'sqlite',
+            data_dir: Optional[Union[str, Path]] = None,
+            sqlite_profile: Union[str, 'SQLiteProfile'] = 'performance',
+            **backend_options
+    ):
         """初始化任务管理器
 
+        使用完毕后应调用 close()，或作为上下文管理器使用::
+
+            with TaskManager() as manager:
+                manager.add_task('写周报')
+
         Args:
-            storage_type: 存储类型 ('json' 或 'sqlite')
+            storage_type: 存储后端名称 ('sqlite'、'json'、'journal'、'memory' 或用
+                backends.register_backend 注册的名称)
+            data_dir: 数据目录，默认为包内的 data 目录
+            sqlite_profile: SQLite 性能配置名称 ('performance' 或 'default') 或配置对象
+            **backend_options: 传给存储后端的其他参数
+
+        Raises:
+            ValueError: 存储类型未注册
         """
+        from .backends import create_backend
+
         self.storage_type = storage_type
-        self.data_dir = Path(__file__).parent.parent / 'data'
-        self.data_dir.mkdir(exist_ok=True)
+        self.data_dir = Path(data_dir) if data_dir else Path(__file__).parent.parent / 'data'
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        # 后端不是线程安全的时，所有调用持有这把锁
+        self._lock = threading.RLock()
+        # 变更事件的订阅者
+        self._listeners: List[Callable[[TaskEvent], None]] = []
 
         if storage_type == 'sqlite':
-            self.conn = sqlite3.connect(self.data_dir / 'taskstest.db')
-            self._init_db()
-        else:
-            self.json_path = self.data_dir / 'taskstest.json'
-
-    def _init_db(self):
-        """初始化数据库表结构"""
-        with self.conn:
-            self.conn.execute("""
-                CREATE TABLE IF NOT EXISTS tasks (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    date TEXT NOT NULL,
-                    category TEXT NOT NULL,
-                    done INTEGER DEFAULT 0,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            # 创建索引提高查询性能
-            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_category ON tasks(category)")
-            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_done ON tasks(done)")
-            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_date ON tasks(date)")
+            backend_options.setdefault('profile', sqlite_profile)
+        # 后端模块 (sqlite3 等依赖) 只在使用时导入，缩短命令行的启动时间
+        self.backend: 'StorageBackend' = create_backend(storage_type, self.data_dir, **backend_options)
+        self._closed = False
+
+    def subscribe(self, listener: Callable[[TaskEvent], None]) -> Callable[[], None]:
+        """订阅任务变更事件
+
+        每次写操作成功后调用 listener(TaskEvent)，事件中包含受影响任务变更前后的内容。
+        listener 在执行写操作的线程中同步调用，其中的异常只记录日志。
 
+        Args:
+            listener: 接收 TaskEvent 的函数
+
+        Returns:
+            取消订阅的函数
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+        def unsubscribe():
+            with self._lock:
+                if listener in self._listeners:
+                    self._listeners.remove(listener)
+        return unsubscribe
+
+    @_store_locked
     def add_task(self, name: str, date: Optional[str] = None, category: Optional[str] = None) -> Optional[Dict]:
         """添加新任务
 
@@ -66,39 +148,14 @@ class TaskManager:
         task_category = category or '未分类'
 
         try:
-            if self.storage_type == 'sqlite':
-                with self.conn:
-                    cursor = self.conn.cursor()
-                    cursor.execute(
-                        """INSERT INTO tasks (name, date, category) 
-                        VALUES (?, ?, ?) RETURNING id, name, date, category, done""",
-                        (name.strip(), task_date, task_category))
-                    result = cursor.fetchone()
-                    return {
-                        'id': result[0],
-                        'name': result[1],
-                        'date': result[2],
-                        'category': result[3],
-                        'done': bool(result[4])
-                    }
-            else:
-                tasks = self._load_json()
-                new_id = max([t.get('id', 0) for t in tasks] or [0]) + 1
-                task = {
-                    'id': new_id,
-                    'name': name.strip(),
-                    'date': task_date,
-                    'category': task_category,
-                    'done': False,
-                    'created_at': datetime.now().isoformat()
-                }
-                tasks.append(task)
-                self._save_json(tasks)
-                return task
+            task = self.backend.add_many([(name.strip(), task_date, task_category, False)])[0]
+            self._notify('add', {task['id']: task})
+            return task
         except Exception as e:
             logger.error(f"添加任务失败: {str(e)}")
             return None
 
+    @_store_locked
     def get_tasks(
             self,
             filter_done: Optional[bool] = None,
@@ -124,81 +181,110 @@ class TaskManager:
             任务字典列表
         """
         try:
-            if self.storage_type == 'sqlite':
-                query = """SELECT id, name, date, category, done 
-                          FROM tasks WHERE 1=1"""
-                params = []
-
-                if filter_done is not None:
-                    query += " AND done = ?"
-                    params.append(int(filter_done))
-
-                if category:
-                    query += " AND category = ?"
-                    params.append(category)
-
-                if search_query:
-                    query += " AND name LIKE ?"
-                    params.append(f"%{search_query}%")
-
-                if start_date:
-                    query += " AND date >= ?"
-                    params.append(start_date)
-
-                if end_date:
-                    query += " AND date <= ?"
-                    params.append(end_date)
-
-                query += " ORDER BY date ASC, created_at ASC"
-
-                if limit is not None:
-                    query += " LIMIT ?"
-                    params.append(limit)
-                    if offset is not None:
-                        query += " OFFSET ?"
-                        params.append(offset)
-
-                with self.conn:
-                    cursor = self.conn.cursor()
-                    cursor.execute(query, params)
-                    return [{
-                        'id': row[0],
-                        'name': row[1],
-                        'date': row[2],
-                        'category': row[3],
-                        'done': bool(row[4])
-                    } for row in cursor.fetchall()]
-            else:
-                tasks = self._load_json()
-
-                # 应用筛选条件
-                if filter_done is not None:
-                    tasks = [t for t in tasks if t['done'] == filter_done]
-                if category:
-                    tasks = [t for t in tasks if t['category'] == category]
-                if search_query:
-                    search_lower = search_query.lower()
-                    tasks = [t for t in tasks if search_lower in t['name'].lower()]
-
-                # 日期筛选
-                if start_date:
-                    tasks = [t for t in tasks if t['date'] >= start_date]
-                if end_date:
-                    tasks = [t for t in tasks if t['date'] <= end_date]
-
-                # 排序
-                tasks.sort(key=lambda x: (x['date'], x.get('created_at', '')))
-
-                # 分页
-                if limit is not None:
-                    start = offset or 0
-                    tasks = tasks[start:start + limit]
-
-                return tasks
+            return self.backend.query((filter_done, category, search_query, start_date, end_date), limit, offset)
         except Exception as e:
             logger.error(f"获取任务列表失败: {str(e)}")
             return []
 
+    @_store_locked
+    def count_tasks(
+            self,
+            filter_done: Optional[bool] = None,
+            category: Optional[str] = None,
+            search_query: Optional[str] = None,
+            start_date: Optional[str] = None,
+            end_date: Optional[str] = None
+    ) -> int:
+        """统计符合条件的任务数
+
+        筛选参数与 get_tasks 相同，配合 limit/offset 实现按需分页加载。
+
+        Returns:
+            任务数量，失败时返回0
+        """
+        try:
+            return self.backend.count((filter_done, category, search_query, start_date, end_date))
+        except Exception as e:
+            logger.error(f"统计任务数失败: {str(e)}")
+            return 0
+
+    @_store_locked
+    def get_tasks_page(
+            self,
+            filter_done: Optional[bool] = None,
+            category: Optional[str] = None,
+            search_query: Optional[str] = None,
+            start_date: Optional[str] = None,
+            end_date: Optional[str] = None,
+            page_size: int = 50,
+            cursor: Optional[str] = None,
+            offset: int = 0
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """按 (日期, 创建时间, ID) 游标分页获取任务
+
+        与 offset 分页不同，翻到任意深度的页面都只需一次索引定位。
+
+        Args:
+            filter_done/category/search_query/start_date/end_date: 同 get_tasks
+            page_size: 每页任务数
+            cursor: 上一页返回的游标，None 表示第一页
+            offset: 从游标位置再跳过的任务数，用于跳转到没有游标的页面 (如拖动滚动条)，
+                开销与跳过的任务数成正比，应从最近的游标开始跳
+
+        Returns:
+            (任务字典列表, 下一页游标)，没有下一页时游标为None
+        """
+        try:
+            after = _decode_cursor(cursor) if cursor else None
+            rows = self.backend.query_after(
+                (filter_done, category, search_query, start_date, end_date), after, page_size + 1, offset)
+            tasks = [task for task, _ in rows]
+            if len(tasks) > page_size:
+                return tasks[:page_size], _encode_cursor(rows[page_size - 1][1])
+            return tasks, None
+        except Exception as e:
+            logger.error(f"获取任务分页失败: {str(e)}")
+            return [], None
+
+    def iter_tasks(
+            self,
+            filter_done: Optional[bool] = None,
+            category: Optional[str] = None,
+            search_query: Optional[str] = None,
+            start_date: Optional[str] = None,
+            end_date: Optional[str] = None,
+            chunk_size: int = 500
+    ) -> Iterator[Dict]:
+        """惰性遍历符合条件的任务，每次只取出 chunk_size 条，内存占用与任务总数无关
+
+        Args:
+            filter_done/category/search_query/start_date/end_date: 同 get_tasks
+            chunk_size: 每批读取的任务数
+
+        Yields:
+            按 (日期, 创建时间, ID) 排序的任务字典
+        """
+        yield from self._iter_chunks(
+            self.backend.scan((filter_done, category, search_query, start_date, end_date), chunk_size))
+
+    @_store_locked
+    def search_tasks(self, query: str, limit: Optional[int] = None) -> List[Dict]:
+        """按相关度搜索任务
+
+        Args:
+            query: 以空白分隔的关键词，任务名称须包含全部关键词 (子串匹配，不区分大小写)
+            limit: 最多返回的任务数
+
+        Returns:
+            按 BM25 相关度降序排列的任务字典列表
+        """
+        try:
+            return self.backend.search(query, limit)
+        except Exception as e:
+            logger.error(f"搜索任务失败: {str(e)}")
+            return []
+
+    @_store_locked
     def get_task_by_id(self, task_id: int) -> Optional[Dict]:
         """根据ID获取单个任务
 
@@ -209,33 +295,12 @@ class TaskManager:
             任务字典，找不到返回None
         """
         try:
-            if self.storage_type == 'sqlite':
-                with self.conn:
-                    cursor = self.conn.cursor()
-                    cursor.execute(
-                        """SELECT id, name, date, category, done 
-                        FROM tasks WHERE id = ?""",
-                        (task_id,)
-                    )
-                    result = cursor.fetchone()
-                    if result:
-                        return {
-                            'id': result[0],
-                            'name': result[1],
-                            'date': result[2],
-                            'category': result[3],
-                            'done': bool(result[4])
-                        }
-            else:
-                tasks = self._load_json()
-                for task in tasks:
-                    if task.get('id') == task_id:
-                        return task
-            return None
+            return self.backend.get(task_id)
         except Exception as e:
             logger.error(f"获取任务失败: {str(e)}")
             return None
 
+    @_store_locked
     def update_task(self, task_id: int, updates: Dict) -> bool:
         """更新任务
 
@@ -246,66 +311,18 @@ class TaskManager:
         Returns:
             是否更新成功
         """
+        previous = self._snapshot([task_id])
         try:
-            if self.storage_type == 'sqlite':
-                set_clause = []
-                params = []
-
-                if 'name' in updates:
-                    set_clause.append("name = ?")
-                    params.append(updates['name'].strip())
-
-                if 'date' in updates:
-                    set_clause.append("date = ?")
-                    params.append(updates['date'])
-
-                if 'category' in updates:
-                    set_clause.append("category = ?")
-                    params.append(updates['category'])
-
-                if 'done' in updates:
-                    set_clause.append("done = ?")
-                    params.append(int(updates['done']))
-
-                if not set_clause:
-                    return False
-
-                set_clause.append("updated_at = CURRENT_TIMESTAMP")
-                params.append(task_id)
-
-                with self.conn:
-                    cursor = self.conn.cursor()
-                    cursor.execute(
-                        f"UPDATE tasks SET {', '.join(set_clause)} WHERE id = ?",
-                        params
-                    )
-                    return cursor.rowcount > 0
-            else:
-                tasks = self._load_json()
-                updated = False
-
-                for task in tasks:
-                    if task.get('id') == task_id:
-                        if 'name' in updates:
-                            task['name'] = updates['name'].strip()
-                        if 'date' in updates:
-                            task['date'] = updates['date']
-                        if 'category' in updates:
-                            task['category'] = updates['category']
-                        if 'done' in updates:
-                            task['done'] = updates['done']
-                        task['updated_at'] = datetime.now().isoformat()
-                        updated = True
-                        break
-
-                if updated:
-                    self._save_json(tasks)
-                    return True
-                return False
+            fields = self._clean_updates(updates)
+            updated = bool(fields) and task_id in self.backend.update_many({task_id: fields})
         except Exception as e:
             logger.error(f"更新任务失败: {str(e)}")
             return False
+        if updated:
+            self._notify('update', self._snapshot([task_id]), previous)
+        return updated
 
+    @_store_locked
     def delete_task(self, task_id: int) -> bool:
         """删除任务
 
@@ -315,25 +332,212 @@ class TaskManager:
         Returns:
             是否删除成功
         """
+        previous = self._snapshot([task_id])
         try:
-            if self.storage_type == 'sqlite':
-                with self.conn:
-                    cursor = self.conn.cursor()
-                    cursor.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
-                    return cursor.rowcount > 0
-            else:
-                tasks = self._load_json()
-                original_count = len(tasks)
-                tasks = [t for t in tasks if t.get('id') != task_id]
-
-                if len(tasks) < original_count:
-                    self._save_json(tasks)
-                    return True
-                return False
+            deleted = task_id in self.backend.delete_many([task_id])
         except Exception as e:
             logger.error(f"删除任务失败: {str(e)}")
             return False
+        if deleted:
+            self._notify('delete', previous=previous)
+        return deleted
 
+    @_store_locked
+    def add_tasks(self, records: Iterable[Dict]) -> List[Optional[Dict]]:
+        """批量添加任务，所有任务在同一个事务 (或同一次文件写入) 中完成
+
+        Args:
+            records: 任务字典列表，每项可包含 name/date/category
+
+        Returns:
+            与输入顺序一致的结果列表，成功为新任务字典，失败为None
+        """
+        today = datetime.now().strftime('%Y-%m-%d')
+        results: List[Optional[Dict]] = []
+        positions = []  # 有效任务在结果中的位置
+        rows = []  # (名称, 日期, 分类, 是否完成)
+        for record in records:
+            name = (record.get('name') or '').strip()
+            if name:
+                positions.append(len(results))
+                rows.append((name, record.get('date') or today, record.get('category') or '未分类', False))
+            else:
+                logger.warning("任务名称不能为空")
+            results.append(None)
+
+        if not rows:
+            return results
+
+        try:
+            for position, task in zip(positions, self.backend.add_many(rows)):
+                results[position] = task
+            self._notify('add', {task['id']: task for task in results if task})
+            return results
+        except Exception as e:
+            logger.error(f"批量添加任务失败: {str(e)}")
+            return [None] * len(results)
+
+    @_store_locked
+    def update_tasks(self, updates: Dict[int, Dict]) -> Dict[int, bool]:
+        """批量更新任务，所有更新在同一个事务 (或同一次文件写入) 中完成
+
+        Args:
+            updates: 任务ID -> 更新字段字典 (可包含 name/date/category/done)
+
+        Returns:
+            任务ID -> 是否更新成功
+        """
+        results = {task_id: False for task_id in updates}
+        previous = self._snapshot(list(updates))
+        try:
+            changes = {}
+            for task_id, fields in updates.items():
+                cleaned = self._clean_updates(fields)
+                if cleaned:
+                    changes[task_id] = cleaned
+            updated = self.backend.update_many(changes) if changes else []
+        except Exception as e:
+            logger.error(f"批量更新任务失败: {str(e)}")
+            return results
+
+        for task_id in updated:
+            results[task_id] = True
+        if updated:
+            self._notify(
+                'update',
+                self._snapshot(updated),
+                {task_id: previous[task_id] for task_id in updated if task_id in previous}
+            )
+        return results
+
+    @_store_locked
+    def delete_tasks(self, task_ids: Iterable[int]) -> Dict[int, bool]:
+        """批量删除任务，所有删除在同一个事务 (或同一次文件写入) 中完成
+
+        Args:
+            task_ids: 要删除的任务ID列表
+
+        Returns:
+            任务ID -> 是否删除成功
+        """
+        task_ids = list(task_ids)
+        results = {task_id: False for task_id in task_ids}
+        if not results:
+            return results
+
+        previous = self._snapshot(task_ids)
+        try:
+            deleted = self.backend.delete_many(task_ids)
+        except Exception as e:
+            logger.error(f"批量删除任务失败: {str(e)}")
+            return results
+
+        for task_id in deleted:
+            results[task_id] = True
+        removed = {task_id: previous[task_id] for task_id in deleted if task_id in previous}
+        if removed:
+            self._notify('delete', previous=removed)
+        return results
+
+    @_store_locked
+    def import_tasks(self, records: Iterable[Dict], batch_size: int = 5000) -> Dict:
+        """批量导入任务，适合一次导入大量数据
+
+        记录逐条校验规范化 (见 transfer.normalize_records)，无效记录跳过并记下原因。
+        写入由后端的 import_rows 完成：SQLite 模式下每 batch_size 条在一个事务中用 executemany 写入，
+        全文索引整块补建；日志模式每块追加一次；JSON 模式全部读完后只写一次文件。导入的任务逐块生效，
+        中途失败时已写入的块保留，失败的一块回滚，原因记入 summary['failed']。订阅者按块收到 'add' 事件。
+
+        Args:
+            records: 任务字典，可包含 name/date/category/done，可以是生成器
+            batch_size: 每块的任务数
+
+        Returns:
+            {'imported': 导入数, 'skipped': 跳过数, 'errors': [(记录序号, 原因), ...], 'failed': 失败原因}，
+            errors 最多保留 MAX_IMPORT_ERRORS 条；failed 在导入中途失败时为错误信息，否则为 None，
+            此时 imported 只包含已提交的块
+        """
+        from .transfer import normalize_records
+
+        summary = {'imported': 0, 'skipped': 0, 'errors': [], 'failed': None}
+
+        def valid_rows():
+            for number, row, error in normalize_records(records):
+                if row is None:
+                    summary['skipped'] += 1
+                    if len(summary['errors']) < MAX_IMPORT_ERRORS:
+                        summary['errors'].append((number, error))
+                else:
+                    yield row
+
+        self._import_rows(valid_rows(), summary, batch_size)
+        return summary
+
+    @_store_locked
+    def import_file(self, path: str, fmt: str, batch_size: int = 5000, workers: int = 1) -> Dict:
+        """从 CSV / NDJSON 文件导入任务
+
+        workers 大于1时文件按字节范围分块，由 workers 个进程并行解析校验 (见 ingest.py)，
+        本进程按文件顺序写入，写入方式和结果与 import_tasks 相同。CSV 引号字段中包含换行、
+        块边界落在字段中间时，从该块起改为在本进程中逐条解析，结果不变。
+
+        Args:
+            path: 文件路径
+            fmt: 'csv' 或 'ndjson'
+            batch_size: 每块写入的任务数
+            workers: 解析进程数，1 表示在本进程中逐条解析
+
+        Returns:
+            同 import_tasks
+
+        Raises:
+            OSError: 文件无法读取
+        """
+        if workers <= 1:
+            from .transfer import read_records
+            with open(path, encoding='utf-8-sig', newline='') as f:
+                return self.import_tasks(read_records(f, fmt), batch_size)
+
+        from .ingest import parse_file
+
+        summary = {'imported': 0, 'skipped': 0, 'errors': [], 'failed': None}
+        rows = parse_file(path, fmt, workers, summary, MAX_IMPORT_ERRORS)
+        try:
+            self._import_rows(rows, summary, batch_size)
+        finally:
+            # 写入失败时停止仍在解析的进程
+            rows.close()
+        return summary
+
+    def _import_rows(self, rows: Iterable[Tuple], summary: Dict, batch_size: int):
+        """分块写入已规范化的任务行 (名称, 日期, 分类, 是否完成)，导入数记入 summary (内部方法)
+
+        所有导入路径都经过这里，存储只有本连接一个写入者。块提交后才计入导入数，
+        写入或解析失败时停止导入，失败原因记入 summary['failed']。
+        """
+        try:
+            for count, added in self.backend.import_rows(rows, batch_size, returning=bool(self._listeners)):
+                summary['imported'] += count
+                if added:
+                    self._notify('add', {task['id']: task for task in added})
+        except Exception as e:
+            logger.error(f"导入任务失败: {str(e)}")
+            summary['failed'] = str(e)
+
+    def export_tasks(self, chunk_size: int = 1000) -> Iterator[Dict]:
+        """按ID顺序逐条导出全部任务
+
+        后端分块读取，不把全部任务整体读入内存，也不在导出期间一直持锁。
+
+        Args:
+            chunk_size: 每批读取的任务数
+
+        Yields:
+            任务字典，包含 id/name/date/category/done/created_at
+        """
+        yield from self._iter_chunks(self.backend.export(chunk_size))
+
+    @_store_locked
     def get_categories(self) -> List[str]:
         """获取所有分类列表
 
@@ -341,39 +545,126 @@ class TaskManager:
             分类字符串列表
         """
         try:
-            if self.storage_type == 'sqlite':
-                with self.conn:
-                    cursor = self.conn.cursor()
-                    cursor.execute("SELECT DISTINCT category FROM tasks ORDER BY category")
-                    return [row[0] for row in cursor.fetchall()]
-            else:
-                tasks = self._load_json()
-                categories = {t['category'] for t in tasks}
-                return sorted(categories)
+            return self.backend.categories()
         except Exception as e:
             logger.error(f"获取分类列表失败: {str(e)}")
             return []
 
-    def _load_json(self) -> List[Dict]:
-        """从JSON文件加载任务 (内部方法)"""
-        try:
-            if self.json_path.exists():
-                with open(self.json_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return []
-        except Exception as e:
-            logger.error(f"加载JSON数据失败: {str(e)}")
-            return []
+    @_store_locked
+    def get_stats(self, date_bucket: Optional[str] = None) -> Dict:
+        """获取任务统计
+
+        聚合在存储层完成：SQLite 模式下为走组合索引的 GROUP BY，
+        JSON/日志模式下直接读取内存索引中维护的计数，开销与分类数、日期数成正比，与任务总数无关。
+
+        Args:
+            date_bucket: 日期直方图的分组粒度 ('day'、'week' 或 'month')，None 表示不统计
+
+        Returns:
+            统计字典::
+
+                {
+                    'total': 总数, 'done': 已完成数, 'pending': 未完成数,
+                    'categories': {分类: {'total': 总数, 'done': 已完成数}},
+                    'dates': {分组: {'total': 总数, 'done': 已完成数}}  # 仅在指定 date_bucket 时返回
+                }
+
+            周分组的键为该周周一的日期，月分组的键为 YYYY-MM。
+        """
+        if date_bucket is not None and date_bucket not in DATE_BUCKETS:
+            raise ValueError(f"未知的日期分组: {date_bucket}")
+
+        stats = {'total': 0, 'done': 0, 'pending': 0, 'categories': {}}
+        if date_bucket is not None:
+            stats['dates'] = {}
 
-    def _save_json(self, tasks: List[Dict]):
-        """保存任务到JSON文件 (内部方法)"""
         try:
-            with open(self.json_path, 'w', encoding='utf-8') as f:
-                json.dump(tasks, f, indent=2, ensure_ascii=False)
+            category_counts, date_counts = self.backend.counts(date_bucket is not None)
+
+            for category in sorted(category_counts):
+                total, done = category_counts[category]
+                stats['categories'][category] = {'total': total, 'done': done}
+                stats['total'] += total
+                stats['done'] += done
+            stats['pending'] = stats['total'] - stats['done']
+
+            if date_bucket is not None:
+                buckets = {}
+                for task_date, (total, done) in date_counts.items():
+                    entry = buckets.setdefault(_date_bucket(task_date, date_bucket), {'total': 0, 'done': 0})
+                    entry['total'] += total
+                    entry['done'] += done
+                stats['dates'] = dict(sorted(buckets.items()))
+            return stats
         except Exception as e:
-            logger.error(f"保存JSON数据失败: {str(e)}")
+            logger.error(f"获取任务统计失败: {str(e)}")
+            stats = {'total': 0, 'done': 0, 'pending': 0, 'categories': {}}
+            if date_bucket is not None:
+                stats['dates'] = {}
+            return stats
+
+    def _iter_chunks(self, chunks: Iterator[List[Dict]]) -> Iterator[Dict]:
+        """逐条产生后端分块读出的任务；后端不是线程安全的时，每取一块持锁一次 (内部方法)
+
+        每块之间释放锁，遍历期间其他线程的写入不会被阻塞。
+        """
+        while True:
+            if self.backend.thread_safe:
+                chunk = next(chunks, None)
+            else:
+                with self._lock:
+                    chunk = next(chunks, None)
+            if chunk is None:
+                return
+            yield from chunk
+
+    def _clean_updates(self, updates: Dict) -> Dict:
+        """提取并规范化可更新的字段 (内部方法)"""
+        fields = {}
+        if 'name' in updates:
+            fields['name'] = updates['name'].strip()
+        if 'date' in updates:
+            fields['date'] = updates['date']
+        if 'category' in updates:
+            fields['category'] = updates['category']
+        if 'done' in updates:
+            fields['done'] = bool(updates['done'])
+        return fields
+
+    def _snapshot(self, task_ids: List[int]) -> Dict[int, Dict]:
+        """读取任务的当前内容，用于变更事件；没有订阅者时不读取 (内部方法)"""
+        if not self._listeners or not task_ids:
+            return {}
+        return self.backend.get_many(task_ids)
+
+    def _notify(self, action: str, tasks: Optional[Dict[int, Dict]] = None, previous: Optional[Dict[int, Dict]] = None):
+        """向订阅者发送变更事件 (内部方法)"""
+        with self._lock:
+            listeners = list(self._listeners)
+        if not listeners or not (tasks or previous):
+            return
+
+        event = TaskEvent(action, tasks or {}, previous or {})
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"处理任务变更事件失败: {str(e)}")
+
+    def close(self):
+        """关闭存储后端 (数据库连接、日志压缩线程等)，可重复调用"""
+        if self._closed:
+            return
+        self._closed = True
+        self.backend.close()
+
+    def __enter__(self) -> 'TaskManager':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
     def __del__(self):
-        """析构函数，确保数据库连接关闭"""
-        if hasattr(self, 'conn'):
-            self.conn.close()
\ No newline at end of file
+        """析构函数，未显式关闭时兜底释放资源"""
+        if not getattr(self, '_closed', True):
+            self.close()
@@ -0,0 +1,233 @@
+# todo_app/cli/daemon.py
+"""常驻进程：在本地 Unix 套接字上提供 TaskManager 的方法调用
+
+每次执行命令行都要启动解释器、重新加载 JSON 文件或打开数据库，脚本中连续执行
+大量命令时这部分开销远大于命令本身。`todo serve` 启动常驻进程，持有一个已加载
+数据的 TaskManager；命令行发现常驻进程时把调用转发过去，只需一次套接字往返。
+
+协议为 JSON Lines，每个连接可以发送多个请求，按顺序返回响应:
+    请求  {"method": "add_task", "args": [...], "kwargs": {...}}
+    响应  {"result": ...} 或 {"error": "错误信息"}
+
+只允许调用 METHODS 中列出的方法。本模块的客户端部分只依赖 socket 和 json，
+不导入 core.py，转发路径上的启动开销最小。
+"""
+import json
+import os
+import socket
+from typing import Any, Dict, Optional
+
+# 常驻进程的套接字文件名，位于数据目录中
+SOCKET_NAME = 'todo.sock'
+# 设置后命令行不转发，总是在本进程中执行
+NO_DAEMON_ENV = 'TODO_NO_DAEMON'
+
+# 允许远程调用的方法 -> 是否为写操作。写操作在常驻进程中串行执行
+METHODS = {
+    'add_task': True,
+    'add_tasks': True,
+    'update_task': True,
+    'update_tasks': True,
+    'delete_task': True,
+    'delete_tasks': True,
+    'get_tasks': False,
+    'count_tasks': False,
+    'get_tasks_page': False,
+    'search_tasks': False,
+    'get_task_by_id': False,
+    'get_categories': False,
+    'get_stats': False,
+}
+# 参数或返回值是以任务ID为键的字典的方法。JSON 对象的键只能是字符串，收发时还原为整数
+_INT_KEY_METHODS = {'update_tasks', 'delete_tasks'}
+
+
+class DaemonError(RuntimeError):
+    """常驻进程返回错误或连接中断"""
+
+
+def get_socket_path(data_dir=None) -> str:
+    """常驻进程的套接字路径，默认位于包内的 data 目录"""
+    if data_dir is None:
+        from .. import get_data_dir
+        data_dir = get_data_dir()
+    return os.path.join(str(data_dir), SOCKET_NAME)
+
+
+def _connect(path: str) -> Optional[socket.socket]:
+    """连接套接字，常驻进程未运行 (文件不存在或无人监听) 时返回 None"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def _int_keys(value: Dict) -> Dict[int, Any]:
+    return {int(key): item for key, item in value.items()}
+
+
+class DaemonClient:
+    """常驻进程的客户端，方法调用与 TaskManager 相同
+
+    只在连接时判断常驻进程是否可用；连接后调用失败抛出 DaemonError，不会自动
+    改为本进程执行，避免写操作被执行两次。
+    """
+
+    def __init__(self, sock: socket.socket):
+        self._sock = sock
+        self._reader = sock.makefile('r', encoding='utf-8')
+
+    @classmethod
+    def connect(cls, path: Optional[str] = None) -> Optional['DaemonClient']:
+        """连接常驻进程，未运行时返回 None
+
+        Args:
+            path: 套接字路径，默认为 get_socket_path()
+        """
+        if os.environ.get(NO_DAEMON_ENV) or not hasattr(socket, 'AF_UNIX'):
+            return None
+        sock = _connect(path or get_socket_path())
+        return cls(sock) if sock is not None else None
+
+    def call(self, method: str, *args, **kwargs) -> Any:
+        """调用常驻进程中 TaskManager 的方法"""
+        if method in _INT_KEY_METHODS and args and isinstance(args[0], dict):
+            args = ({str(key): value for key, value in args[0].items()},) + args[1:]
+        request = json.dumps({'method': method, 'args': args, 'kwargs': kwargs}, ensure_ascii=False)
+        try:
+            self._sock.sendall(request.encode('utf-8') + b'\n')
+            line = self._reader.readline()
+        except OSError as e:
+            raise DaemonError(f"与常驻进程通信失败: {str(e)}") from e
+        if not line:
+            raise DaemonError("常驻进程已断开连接")
+
+        response = json.loads(line)
+        if 'error' in response:
+            raise DaemonError(response['error'])
+        result = response['result']
+        if method in _INT_KEY_METHODS and isinstance(result, dict):
+            result = _int_keys(result)
+        return result
+
+    def __getattr__(self, name: str):
+        if name not in METHODS:
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self.call(name, *args, **kwargs)
+
+    def close(self):
+        self._reader.close()
+        self._sock.close()
+
+    def __enter__(self) -> 'DaemonClient':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def shutdown(path: Optional[str] = None, timeout: float = 5.0) -> bool:
+    """通知常驻进程退出并等待套接字文件删除，未运行时返回 False
+
+    Args:
+        path: 套接字路径，默认为 get_socket_path()
+        timeout: 最多等待的秒数
+    """
+    import time
+
+    path = path or get_socket_path()
+    # 不经过 DaemonClient.connect：NO_DAEMON_ENV 只关闭命令转发，设置后也要能停止常驻进程
+    sock = _connect(path) if hasattr(socket, 'AF_UNIX') else None
+    if sock is None:
+        return False
+    with DaemonClient(sock) as client:
+        try:
+            client.call('shutdown')
+        except DaemonError:
+            # 常驻进程已在退出过程中
+            pass
+    deadline = time.monotonic() + timeout
+    while os.path.exists(path) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return True
+
+
+def serve(manager, path: Optional[str] = None):
+    """在 Unix 套接字上提供 manager 的方法调用，直到收到 shutdown 请求或 Ctrl+C
+
+    每个连接由一个线程处理。读操作并发执行 (TaskManager 本身是线程安全的)，
+    写操作持有同一把锁串行执行。
+
+    Args:
+        manager: 已打开的 TaskManager，由调用方负责关闭
+        path: 套接字路径，默认为 get_socket_path()
+    """
+    import logging
+    import socketserver
+    import threading
+
+    logger = logging.getLogger(__name__)
+    path = path or get_socket_path(manager.data_dir)
+    write_lock = threading.Lock()
+
+    def dispatch(request: Dict) -> Any:
+        method = request.get('method')
+        if method == 'shutdown':
+            # shutdown() 会等待 serve_forever 退出，不能在处理请求的线程中直接调用
+            threading.Thread(target=server.shutdown, daemon=True).start()
+            return None
+        if method not in METHODS:
+            raise ValueError(f"不支持的方法: {method}")
+        args = list(request.get('args') or [])
+        kwargs = request.get('kwargs') or {}
+        if method in _INT_KEY_METHODS and args and isinstance(args[0], dict):
+            args[0] = _int_keys(args[0])
+        func = getattr(manager, method)
+        if METHODS[method]:
+            with write_lock:
+                return func(*args, **kwargs)
+        return func(*args, **kwargs)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                try:
+                    response = {'result': dispatch(json.loads(line))}
+                except Exception as e:
+                    logger.error(f"处理请求失败: {str(e)}")
+                    response = {'error': str(e)}
+                self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+
+    # 套接字文件残留 (上次异常退出) 时先确认没有常驻进程在运行
+    if os.path.exists(path):
+        sock = _connect(path)
+        if sock is not None:
+            sock.close()
+            raise DaemonError(f"常驻进程已在运行: {path}")
+        os.unlink(path)
+
+    # 套接字只允许当前用户访问
+    old_umask = os.umask(0o077)
+    try:
+        server = socketserver.ThreadingUnixStreamServer(path, Handler)
+    except OSError as e:
+        # 最常见的原因是路径超过 Unix 套接字地址的长度上限 (Linux 为 107 字节)
+        raise DaemonError(
+            f"无法在 {path} 上监听: {str(e)}，数据目录路径过长时请换用较短的路径") from e
+    finally:
+        os.umask(old_umask)
+    server.daemon_threads = True
+
+    logger.info(f"常驻进程已启动: {path}")
+    try:
+        server.serve_forever(poll_interval=0.1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+        logger.info("常驻进程已退出")
@@ -0,0 +1,29 @@
+# todo_app/cli/events.py
+from typing import Dict, List
+
+
+class TaskEvent:
+    """任务变更事件，由 TaskManager 在写操作成功后发送给订阅者
+
+    同时携带变更前后的任务，订阅者可以据此增量调整计数、分类列表等派生数据，
+    而不必重新查询全部任务。
+    """
+
+    def __init__(self, action: str, tasks: Dict[int, Dict], previous: Dict[int, Dict]):
+        """
+        Args:
+            action: 变更类型 ('add'、'update' 或 'delete')
+            tasks: 变更后的任务 (ID -> 任务字典)，删除事件为空
+            previous: 变更前的任务 (ID -> 任务字典)，添加事件为空
+        """
+        self.action = action
+        self.tasks = tasks
+        self.previous = previous
+
+    @property
+    def ids(self) -> List[int]:
+        """受影响的任务ID"""
+        return sorted(self.tasks.keys() | self.previous.keys())
+
+    def __repr__(self) -> str:
+        return f"TaskEvent({self.action!r}, ids={self.ids})"
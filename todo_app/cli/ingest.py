@@ -0,0 +1,165 @@
+# todo_app/cli/ingest.py
+"""多进程解析大文件，供 TaskManager.import_file 使用
+
+文件按字节范围切成若干块 (边界对齐到行首)，各块在进程池中独立读取、解析和校验，
+主进程按文件顺序取回规范化后的任务行，交给唯一的写入者 (TaskManager) 写入存储。
+解析和校验是 CPU 密集的，可以随核数扩展；写入仍然只有一个连接，不会出现并发写。
+
+按行切分要求一条记录只占一行。CSV 引号字段中包含换行时，块边界可能落在字段中间，
+两侧的块都会解析错；各块统计引号个数，边界之前的引号数为奇数说明边界在引号字段内，
+此时丢弃该块的结果，从该块起在主进程中逐条解析剩余部分。
+"""
+import io
+import os
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .transfer import normalize_records, read_records
+
+# 每块的字节数，块越大进程间通信的次数越少，但占用的内存越多
+CHUNK_BYTES = 4 * 1024 * 1024
+
+
+def split_file(path: str, chunk_bytes: int = CHUNK_BYTES, start: int = 0) -> List[Tuple[int, int]]:
+    """把文件从 start 开始切成约 chunk_bytes 大小的字节范围，每个范围都从行首开始
+
+    Returns:
+        [(起始位置, 结束位置)]，结束位置不包含
+    """
+    size = os.path.getsize(path)
+    ranges = []
+    with open(path, 'rb') as f:
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            # 从预定边界读到行尾，下一块从新的一行开始
+            f.readline()
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _read_header(path: str) -> Tuple[List[str], int]:
+    """读取 CSV 表头，返回 (字段名, 表头之后的字节位置)"""
+    import csv
+
+    with open(path, 'rb') as f:
+        line = f.readline()
+        end = f.tell()
+    fieldnames = next(csv.reader([line.decode('utf-8-sig')]), [])
+    return fieldnames, end
+
+
+def _parse_chunk(path: str, fmt: str, start: int, end: int, fieldnames: Optional[List[str]], today: str
+                 ) -> Tuple[int, List[Tuple], List[Tuple[int, str]], int]:
+    """在子进程中解析一个字节范围
+
+    Returns:
+        (记录数, 有效任务行, [(块内记录序号, 失败原因)], 块内的引号个数)
+    """
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    # 第一块可能以 BOM 开头
+    text = data.decode('utf-8-sig' if start == 0 else 'utf-8')
+
+    count = 0
+    rows = []
+    errors = []
+    records = read_records(io.StringIO(text, newline=''), fmt, fieldnames=fieldnames)
+    for number, row, error in normalize_records(records, today):
+        count = number
+        if row is None:
+            errors.append((number, error))
+        else:
+            rows.append(row)
+    # 转义的引号 ("") 成对出现，不影响奇偶
+    quotes = data.count(b'"') if fmt == 'csv' else 0
+    return count, rows, errors, quotes
+
+
+def _parse_from(path: str, fmt: str, start: int, fieldnames: Optional[List[str]], today: str
+                ) -> Iterator[Tuple[int, Optional[Tuple], Optional[str]]]:
+    """在本进程中从 start 逐条解析到文件末尾，产生同 normalize_records"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        text = io.TextIOWrapper(f, encoding='utf-8-sig' if start == 0 else 'utf-8', newline='')
+        yield from normalize_records(read_records(text, fmt, fieldnames=fieldnames), today)
+
+
+def parse_file(path: str, fmt: str, workers: int, summary: Dict, max_errors: int,
+               chunk_bytes: int = CHUNK_BYTES) -> Iterator[Tuple]:
+    """多进程解析文件，按文件顺序逐条产生规范化后的任务行
+
+    文件不存在等错误在调用时立即抛出；解析在迭代时进行。同时提交的块数不超过
+    进程数的两倍，写入慢于解析时已解析的数据不会在内存中无限堆积。
+
+    Args:
+        path: 文件路径
+        fmt: 'csv' 或 'ndjson'
+        workers: 进程数
+        summary: 导入结果，跳过的记录数和失败原因 (全局记录序号) 写入其中
+        max_errors: summary['errors'] 最多保留的条数
+        chunk_bytes: 每块的字节数
+
+    Yields:
+        (名称, 日期, 分类, 是否完成)
+    """
+    from datetime import date
+
+    fieldnames, start = _read_header(path) if fmt == 'csv' else (None, 0)
+    ranges = split_file(path, chunk_bytes, start)
+    today = date.today().isoformat()
+
+    def results():
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = ProcessPoolExecutor(max_workers=workers)
+        pending = deque()
+        remaining = iter(ranges)
+        try:
+            while True:
+                while len(pending) < workers * 2:
+                    chunk = next(remaining, None)
+                    if chunk is None:
+                        break
+                    pending.append(executor.submit(_parse_chunk, path, fmt, *chunk, fieldnames, today))
+                if not pending:
+                    return
+                yield pending.popleft().result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def rows():
+        # 记录序号在块内从1开始，加上之前各块的记录数即为全局序号
+        offset = 0
+        quotes = 0
+        chunks = results()
+
+        def skip(number, error):
+            summary['skipped'] += 1
+            if len(summary['errors']) < max_errors:
+                summary['errors'].append((offset + number, error))
+
+        try:
+            for (chunk_start, _), (count, chunk_rows, errors, chunk_quotes) in zip(ranges, chunks):
+                quotes += chunk_quotes
+                if quotes % 2:
+                    # 块在引号字段中间结束，本块和之后的块都不可信
+                    break
+                for number, error in errors:
+                    skip(number, error)
+                offset += count
+                yield from chunk_rows
+            else:
+                return
+        finally:
+            chunks.close()
+
+        for number, row, error in _parse_from(path, fmt, chunk_start, fieldnames, today):
+            if row is None:
+                skip(number, error)
+            else:
+                yield row
+
+    return rows()
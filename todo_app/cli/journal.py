@@ -0,0 +1,393 @@
+# todo_app/cli/journal.py
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows 下没有 fcntl，退化为仅进程内加锁
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class TaskJournal:
+    """追加写入的 JSON Lines 任务日志
+
+    每次修改只向日志末尾追加一条紧凑记录，当前状态通过重放日志得到。
+    日志中的废弃记录过多时，在后台线程中压缩为快照。
+
+    记录格式 (每行一条):
+        {"op":"put","task":{...}}          新增或整体覆盖任务
+        {"op":"set","id":1,"fields":{...}} 更新任务的部分字段
+        {"op":"del","id":1}                删除任务
+        {"op":"meta","next_id":5}          快照头，记录下一个可用ID
+
+    所有记录都是幂等的状态赋值，重复重放同一条记录不会改变结果。
+    """
+
+    def __init__(self, path: Path, compact_threshold: int = 1024 * 1024, sync: bool = True):
+        """初始化任务日志
+
+        Args:
+            path: 日志文件路径
+            compact_threshold: 触发后台压缩的日志大小 (字节)
+            sync: 每次追加后是否 fsync，保证断电后记录不丢失
+        """
+        self.path = Path(path)
+        self.compact_threshold = compact_threshold
+        self.sync = sync
+        self.lock_path = self.path.with_name(self.path.name + '.lock')
+
+        self._lock = threading.RLock()
+        self._tasks: Dict[int, Dict] = {}
+        self._next_id = 1
+        self._records = 0
+        self._offset = 0
+        self._inode = None
+        self._handle = None
+        self._version = 0
+        self._compactor: Optional[threading.Thread] = None
+
+        with self._lock:
+            self._refresh()
+
+    # ------------------------------------------------------------------
+    # 公共接口
+    # ------------------------------------------------------------------
+
+    def tasks(self) -> List[Dict]:
+        """返回当前所有任务的副本"""
+        with self._lock:
+            self._refresh()
+            return [dict(t) for t in self._tasks.values()]
+
+    def version(self) -> int:
+        """返回状态版本号，每应用一条记录加一，重新加载时也会变化"""
+        with self._lock:
+            self._refresh()
+            return self._version
+
+    def snapshot(self) -> Tuple[int, List[Dict]]:
+        """原子地返回状态版本号和所有任务的副本"""
+        with self._lock:
+            self._refresh()
+            return self._version, [dict(t) for t in self._tasks.values()]
+
+    def get(self, task_id: int) -> Optional[Dict]:
+        """根据ID返回任务副本，找不到返回None"""
+        with self._lock:
+            self._refresh()
+            task = self._tasks.get(task_id)
+            return dict(task) if task else None
+
+    def add(self, task: Dict) -> Dict:
+        """追加新任务，自动分配ID
+
+        Args:
+            task: 不含ID的任务字典
+
+        Returns:
+            带有ID的新任务字典
+        """
+        return self.add_many([task])[0]
+
+    def update(self, task_id: int, fields: Dict) -> bool:
+        """更新任务的部分字段
+
+        Returns:
+            任务存在并已更新返回True
+        """
+        return self.update_many({task_id: fields})[task_id]
+
+    def delete(self, task_id: int) -> bool:
+        """删除任务
+
+        Returns:
+            任务存在并已删除返回True
+        """
+        return self.delete_many([task_id])[task_id]
+
+    def add_many(self, tasks: List[Dict]) -> List[Dict]:
+        """批量追加新任务，所有记录一次写入、一次 fsync
+
+        Returns:
+            带有ID的新任务字典列表，顺序与输入一致
+        """
+        with self._mutation():
+            added = []
+            for task in tasks:
+                added.append(dict(task, id=self._next_id + len(added)))
+            if added:
+                self._append([{'op': 'put', 'task': task} for task in added])
+            return [dict(task) for task in added]
+
+    def update_many(self, updates: Dict[int, Dict]) -> Dict[int, bool]:
+        """批量更新任务的部分字段
+
+        Args:
+            updates: 任务ID -> 更新字段
+
+        Returns:
+            任务ID -> 是否更新成功
+        """
+        with self._mutation():
+            results = {task_id: task_id in self._tasks for task_id in updates}
+            records = [{'op': 'set', 'id': task_id, 'fields': fields}
+                       for task_id, fields in updates.items() if results[task_id]]
+            if records:
+                self._append(records)
+            return results
+
+    def delete_many(self, task_ids: List[int]) -> Dict[int, bool]:
+        """批量删除任务
+
+        Returns:
+            任务ID -> 是否删除成功
+        """
+        with self._mutation():
+            results = {task_id: task_id in self._tasks for task_id in task_ids}
+            records = [{'op': 'del', 'id': task_id} for task_id, found in results.items() if found]
+            if records:
+                self._append(records)
+            return results
+
+    def compact(self, wait: bool = True):
+        """在后台线程中压缩日志
+
+        Args:
+            wait: 是否等待压缩完成
+        """
+        with self._lock:
+            if self._compactor is None or not self._compactor.is_alive():
+                self._compactor = threading.Thread(
+                    target=self._compact, name='todo-journal-compact', daemon=True)
+                self._compactor.start()
+            compactor = self._compactor
+        if wait:
+            compactor.join()
+
+    def close(self):
+        """等待正在进行的压缩结束并关闭读取句柄"""
+        compactor = self._compactor
+        if compactor is not None and compactor is not threading.current_thread():
+            compactor.join()
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+    # ------------------------------------------------------------------
+    # 日志读写 (内部方法)
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _file_lock(self):
+        """跨进程的写锁，保证同一时刻只有一个写者追加或替换日志"""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _mutation(self):
+        """写操作的临界区：加锁、追上其他进程的写入、修复残缺尾行"""
+        with self._lock, self._file_lock():
+            self._refresh(repair=True)
+            yield
+        self._maybe_compact()
+
+    def _append(self, records: List[Dict]):
+        """将记录追加到日志末尾并应用到内存状态 (需持有锁)"""
+        data = ''.join(
+            json.dumps(r, ensure_ascii=False, separators=(',', ':')) + '\n'
+            for r in records
+        ).encode('utf-8')
+
+        with open(self.path, 'ab') as f:
+            f.write(data)
+            f.flush()
+            if self.sync:
+                os.fsync(f.fileno())
+            size = os.fstat(f.fileno()).st_size
+            inode = os.fstat(f.fileno()).st_ino
+
+        for record in records:
+            self._apply(record)
+        self._records += len(records)
+        # 文件大小恰好等于预期时才前移偏移量；否则下次刷新时从旧偏移量重放
+        # (记录幂等，重放自己写入的记录是安全的)
+        if inode == self._inode and size == self._offset + len(data):
+            self._offset = size
+        elif self._inode is None:
+            # 本次写入创建了日志文件 (持有文件锁，路径不会被替换)
+            self._handle = open(self.path, 'rb')
+            self._inode = inode
+            self._offset = size if size == len(data) else 0
+
+    def _refresh(self, repair: bool = False):
+        """读取日志中尚未应用的记录 (需持有锁)
+
+        日志被其他进程压缩替换时重新完整加载。
+
+        Args:
+            repair: 是否截断崩溃遗留的残缺尾行 (需持有文件锁)
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            if self._inode is not None:
+                self._reset()
+            return
+
+        if self._handle is None or stat.st_ino != self._inode or stat.st_size < self._offset:
+            # 路径已被压缩替换 (或首次读取)：打开新文件并一直持有，
+            # 持有期间其 inode 号不会被新文件复用，上面的比较才可靠
+            self._reset()
+            try:
+                self._handle = open(self.path, 'rb')
+            except FileNotFoundError:
+                return
+            self._inode = os.fstat(self._handle.fileno()).st_ino
+
+        size = os.fstat(self._handle.fileno()).st_size
+        if size == self._offset:
+            return
+
+        self._handle.seek(self._offset)
+        data = self._handle.read()
+
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                self._apply(json.loads(line))
+                self._records += 1
+            except (ValueError, KeyError, TypeError) as e:
+                logger.error(f"跳过损坏的日志记录: {str(e)}")
+        self._offset += end
+
+        if end < len(data) and repair:
+            # 持有文件锁时不会有其他写者，剩余部分只能是崩溃留下的残缺记录
+            logger.warning("截断日志末尾的残缺记录")
+            with open(self.path, 'r+b') as f:
+                f.truncate(self._offset)
+
+    def _reset(self):
+        """清空内存状态并关闭读取句柄，准备完整重放"""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        self._tasks = {}
+        self._next_id = 1
+        self._records = 0
+        self._offset = 0
+        self._inode = None
+        self._version += 1
+
+    def _apply(self, record: Dict):
+        """将一条记录应用到内存状态"""
+        op = record['op']
+        self._version += 1
+        if op == 'put':
+            task = record['task']
+            self._tasks[task['id']] = task
+            self._next_id = max(self._next_id, task['id'] + 1)
+        elif op == 'set':
+            task = self._tasks.get(record['id'])
+            if task is not None:
+                task.update(record['fields'])
+        elif op == 'del':
+            self._tasks.pop(record['id'], None)
+        elif op == 'meta':
+            self._next_id = max(self._next_id, record['next_id'])
+        else:
+            raise ValueError(f"未知的日志操作: {op}")
+
+    # ------------------------------------------------------------------
+    # 压缩 (内部方法)
+    # ------------------------------------------------------------------
+
+    def _maybe_compact(self):
+        """日志足够大且超过一半是废弃记录时启动后台压缩"""
+        if self._offset >= self.compact_threshold and self._records > 2 * max(len(self._tasks), 1):
+            self.compact(wait=False)
+
+    def _compact(self):
+        """将当前状态写成快照并原子替换日志
+
+        快照写入同目录下独占创建的临时文件，GUI、CLI 和守护进程同时压缩时互不覆盖；
+        只有持有文件锁且日志未被其他进程替换时才执行重命名。
+        """
+        tmp_path = None
+        try:
+            # 1. 持锁拍下快照，序列化在锁外进行，不阻塞写操作
+            with self._lock:
+                self._refresh()
+                snapshot = [dict(t) for t in self._tasks.values()]
+                next_id = self._next_id
+                snapshot_offset = self._offset
+                snapshot_inode = self._inode
+
+            fd, name = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name + '.', suffix='.compact')
+            tmp_path = Path(name)
+            with os.fdopen(fd, 'wb') as f:
+                header = {'op': 'meta', 'next_id': next_id}
+                f.write((json.dumps(header, separators=(',', ':')) + '\n').encode('utf-8'))
+                for task in snapshot:
+                    record = {'op': 'put', 'task': task}
+                    f.write((json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+
+            # 2. 持锁补齐快照之后追加的记录，然后原子替换
+            with self._lock, self._file_lock():
+                stat = os.stat(self.path)
+                if stat.st_ino != snapshot_inode:
+                    # 其他进程已完成压缩
+                    tmp_path.unlink()
+                    return
+
+                tail = 0
+                with open(self.path, 'rb') as src, open(tmp_path, 'ab') as dst:
+                    src.seek(snapshot_offset)
+                    data = src.read()
+                    data = data[:data.rfind(b'\n') + 1]
+                    tail = data.count(b'\n')
+                    dst.write(data)
+                    dst.flush()
+                    os.fsync(dst.fileno())
+
+                # mkstemp 创建的文件权限为 0600，保留原日志的权限
+                os.chmod(tmp_path, stat.st_mode & 0o777)
+                # 先关闭读取句柄 (Windows 不能替换仍被打开的文件)，替换后完整重放
+                self._reset()
+                os.replace(tmp_path, self.path)
+                self._fsync_dir()
+                self._refresh()
+                logger.info(f"任务日志已压缩: {len(self._tasks)} 个任务, {tail} 条增量记录")
+        except Exception as e:
+            logger.error(f"压缩任务日志失败: {str(e)}")
+            if tmp_path is not None and tmp_path.exists():
+                tmp_path.unlink()
+
+    def _fsync_dir(self):
+        """同步目录项，保证重命名在崩溃后仍然生效"""
+        if os.name != 'posix':
+            return
+        fd = os.open(self.path.parent, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
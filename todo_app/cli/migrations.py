@@ -0,0 +1,159 @@
+# todo_app/cli/migrations.py
+import sqlite3
+from typing import Callable, List, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _create_tasks_table(conn: sqlite3.Connection):
+    """任务表及最初的单列索引"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            date TEXT NOT NULL,
+            category TEXT NOT NULL,
+            done INTEGER DEFAULT 0,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_category ON tasks(category)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_done ON tasks(done)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_date ON tasks(date)")
+
+
+# 新任务写入全文索引的触发器。批量导入时在事务中临时删除，整块插入后一次性写入索引
+FTS_INSERT_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+        INSERT INTO tasks_fts(rowid, name) VALUES (new.id, new.name);
+    END
+"""
+
+
+def _create_fts(conn: sqlite3.Connection):
+    """任务名称的 FTS5 全文索引，由触发器与 tasks 表保持同步
+
+    使用 trigram 分词，中英文任意子串 (3个字符以上) 都能走索引。
+    当前 SQLite 不支持时跳过，搜索退化为逐行扫描。
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts'"
+    ).fetchone()
+    try:
+        conn.execute("SAVEPOINT fts")
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+                name, content='tasks', content_rowid='id', tokenize='trigram'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        conn.execute("ROLLBACK TO fts")
+        conn.execute("RELEASE fts")
+        logger.warning(f"当前SQLite不支持FTS5 trigram，搜索将逐行扫描: {str(e)}")
+        return
+    conn.execute("RELEASE fts")
+
+    conn.execute(FTS_INSERT_TRIGGER)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, name) VALUES ('delete', old.id, old.name);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF name ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, name) VALUES ('delete', old.id, old.name);
+            INSERT INTO tasks_fts(rowid, name) VALUES (new.id, new.name);
+        END
+    """)
+    if not exists:
+        # 为已有任务补建索引
+        conn.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+
+
+def _create_query_indexes(conn: sqlite3.Connection):
+    """与 get_tasks 实际查询形态匹配的组合索引
+
+    所有列表查询都按 (date, created_at, id) 排序，每种筛选组合都有一个
+    以等值条件开头、以排序列结尾的索引，避免临时 B 树排序。
+    单列索引都是这些组合索引的前缀，予以删除以减少写放大。
+    """
+    # 无筛选/日期范围：覆盖索引，列表查询无需回表
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_tasks_order
+        ON tasks(date, created_at, id, done, category, name)
+    """)
+    # 按完成状态筛选
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_done_order ON tasks(done, date, created_at, id)")
+    # 按分类筛选，同时服务于分类列表 (SELECT DISTINCT category)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_category_order ON tasks(category, date, created_at, id)")
+    # 分类 + 完成状态
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_tasks_category_done_order
+        ON tasks(category, done, date, created_at, id)
+    """)
+
+    conn.execute("DROP INDEX IF EXISTS idx_category")
+    conn.execute("DROP INDEX IF EXISTS idx_done")
+    conn.execute("DROP INDEX IF EXISTS idx_date")
+
+
+def _add_name_lower(conn: sqlite3.Connection):
+    """小写任务名称列，供少于3个字符的关键词做子串匹配
+
+    SQLite 的 lower() 和 LIKE 只忽略 ASCII 字母的大小写，与内存后端使用的 str.lower() 不一致
+    (如 "Ü"、全角字母)。写入时由程序按 str.lower() 计算，查询用 instr() 匹配。
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}
+    if 'name_lower' not in columns:
+        conn.execute("ALTER TABLE tasks ADD COLUMN name_lower TEXT")
+    rows = conn.execute("SELECT id, name FROM tasks").fetchall()
+    conn.executemany(
+        "UPDATE tasks SET name_lower = ? WHERE id = ?",
+        [(name.lower(), task_id) for task_id, name in rows])
+
+
+# (版本号, 说明, 迁移函数)，版本号记录在 PRAGMA user_version 中。
+# 只能在末尾追加新的迁移，已发布的迁移不可修改。
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, '创建任务表', _create_tasks_table),
+    (2, '任务名称全文索引', _create_fts),
+    (3, '查询组合索引', _create_query_indexes),
+    (4, '小写任务名称列', _add_name_lower),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """读取数据库当前的结构版本"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """将数据库升级到最新结构版本
+
+    每个迁移与版本号的更新在同一个事务中提交，中途失败不会留下半完成的结构。
+    迁移语句都是幂等的，已有表的旧数据库 (user_version 为 0) 也能直接升级。
+
+    Returns:
+        升级后的结构版本
+    """
+    version = get_schema_version(conn)
+    if version > SCHEMA_VERSION:
+        raise RuntimeError(f"数据库结构版本 {version} 高于当前程序支持的版本 {SCHEMA_VERSION}")
+
+    for target, description, migration in MIGRATIONS:
+        if target <= version:
+            continue
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # 加锁后重新检查，其他进程可能已完成迁移
+            if get_schema_version(conn) >= target:
+                continue
+            migration(conn)
+            conn.execute(f"PRAGMA user_version = {target}")
+        logger.info(f"数据库结构已升级到版本 {target}: {description}")
+        version = target
+    return version
@@ -0,0 +1,120 @@
+# todo_app/cli/search.py
+import math
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+# BM25 参数
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def bigrams(text: str) -> List[str]:
+    """将文本切分为相邻字符二元组
+
+    中文任务名称没有空格分词，按字符 n-gram 切分后任意子串都能命中，
+    对英文同样适用，与 SQLite 模式下 trigram 分词的子串语义保持一致。
+    """
+    text = text.lower()
+    return [text[i:i + 2] for i in range(len(text) - 1)]
+
+
+def split_terms(query: str) -> List[str]:
+    """将搜索语句按空白拆分为关键词 (小写、去重、保持顺序)"""
+    return list(dict.fromkeys(term.lower() for term in query.split()))
+
+
+class NgramIndex:
+    """任务名称的内存倒排索引 (二元组 -> 任务ID集合)
+
+    查询时取关键词所有二元组倒排表的交集作为候选，再校验子串，
+    结果与线性扫描完全一致，但只需检查极少数任务。
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Set[int]] = {}
+        self._total_length = 0
+        self._count = 0
+
+    def add(self, task_id: int, name: str):
+        """索引任务名称"""
+        grams = bigrams(name)
+        for gram in set(grams):
+            self.postings.setdefault(gram, set()).add(task_id)
+        self._total_length += len(grams)
+        self._count += 1
+
+    def remove(self, task_id: int, name: str):
+        """移除任务名称的索引"""
+        grams = bigrams(name)
+        for gram in set(grams):
+            posting = self.postings.get(gram)
+            if posting is not None:
+                posting.discard(task_id)
+                if not posting:
+                    del self.postings[gram]
+        self._total_length -= len(grams)
+        self._count -= 1
+
+    def candidates(self, term: str) -> Optional[Set[int]]:
+        """返回可能包含关键词的任务ID集合
+
+        Returns:
+            候选ID集合；关键词少于两个字符无法使用索引时返回None
+        """
+        grams = set(bigrams(term))
+        if not grams:
+            return None
+
+        result = None
+        for gram in sorted(grams, key=lambda g: len(self.postings.get(g, ()))):
+            posting = self.postings.get(gram)
+            if not posting:
+                return set()
+            result = set(posting) if result is None else result & posting
+            if not result:
+                break
+        return result
+
+    def score(self, name: str, terms: Iterable[str]) -> float:
+        """按 BM25 计算任务名称与关键词的相关度"""
+        return self.scorer(terms)(name)
+
+    def scorer(self, terms: Iterable[str]) -> Callable[[str], float]:
+        """返回按 BM25 计算名称相关度的函数
+
+        各二元组的 idf 和长度归一化参数只在这里计算一次，
+        对大量命中结果逐个打分时每个名称只需统计查询二元组的出现次数。
+        """
+        if not self._count:
+            return lambda name: 0.0
+        avg_length = max(self._total_length / self._count, 1)
+        norm_base = BM25_K1 * (1 - BM25_B)
+        norm_length = BM25_K1 * BM25_B / avg_length
+
+        weights = []
+        for term in terms:
+            for gram in set(bigrams(term)):
+                df = len(self.postings.get(gram, ()))
+                weights.append((gram, math.log(1 + (self._count - df + 0.5) / (df + 0.5))))
+
+        def score(name: str) -> float:
+            text = name.lower()
+            norm = norm_base + norm_length * max(len(name) - 1, 1)
+            total = 0.0
+            for gram, idf in weights:
+                # 两个字符不同的二元组不会重叠出现，str.count 即为出现次数
+                tf = text.count(gram) if gram[0] != gram[1] else _occurrences(text, gram)
+                if tf:
+                    total += idf * tf * (BM25_K1 + 1) / (tf + norm)
+            return total
+
+        return score
+
+
+def _occurrences(text: str, gram: str) -> int:
+    """统计二元组在文本中的出现次数，含重叠出现 (如 "aaa" 中的 "aa" 出现两次)，与 bigrams 切分的计数一致"""
+    count = 0
+    i = text.find(gram)
+    while i >= 0:
+        count += 1
+        i = text.find(gram, i + 1)
+    return count
@@ -0,0 +1,105 @@
+# todo_app/cli/sqlite_profile.py
+import sqlite3
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+
+class SQLiteProfile:
+    """SQLite 连接的性能配置
+
+    为 None 的项保持 SQLite 默认值不变。
+    """
+
+    def __init__(
+            self,
+            journal_mode: Optional[str] = 'WAL',
+            synchronous: Optional[str] = 'NORMAL',
+            mmap_size: Optional[int] = 256 * 1024 * 1024,
+            cache_size: Optional[int] = -64 * 1024,
+            temp_store: Optional[str] = 'MEMORY',
+            busy_timeout: float = 5.0,
+            cached_statements: int = 256
+    ):
+        """
+        Args:
+            journal_mode: 日志模式，WAL 模式下读写互不阻塞
+            synchronous: 同步级别，WAL 模式下 NORMAL 已能保证数据库不损坏
+            mmap_size: 内存映射读取的字节数
+            cache_size: 页缓存大小，负数表示 KiB
+            temp_store: 临时表和排序使用的存储位置
+            busy_timeout: 等待其他进程释放锁的秒数
+            cached_statements: 每个连接缓存的预编译语句数
+        """
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.mmap_size = mmap_size
+        self.cache_size = cache_size
+        self.temp_store = temp_store
+        self.busy_timeout = busy_timeout
+        self.cached_statements = cached_statements
+
+    def connect(self, path: Union[str, Path], readonly: bool = False) -> sqlite3.Connection:
+        """按配置打开数据库连接
+
+        Args:
+            path: 数据库文件路径
+            readonly: 是否以只读方式打开。只读连接处于自动提交模式，
+                查询不会开启事务；允许在创建它的线程之外关闭
+
+        Returns:
+            配置好的数据库连接
+        """
+        if readonly:
+            conn = sqlite3.connect(
+                Path(path).resolve().as_uri() + '?mode=ro',
+                uri=True,
+                timeout=self.busy_timeout,
+                isolation_level=None,
+                check_same_thread=False,
+                cached_statements=self.cached_statements
+            )
+        else:
+            conn = sqlite3.connect(
+                path,
+                timeout=self.busy_timeout,
+                cached_statements=self.cached_statements
+            )
+
+        pragmas = {
+            'mmap_size': self.mmap_size,
+            'cache_size': self.cache_size,
+            'temp_store': self.temp_store,
+        }
+        if not readonly:
+            # 日志模式保存在数据库文件中，只需由写连接设置
+            pragmas['journal_mode'] = self.journal_mode
+            pragmas['synchronous'] = self.synchronous
+
+        for name, value in pragmas.items():
+            if value is not None:
+                conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+
+# 预置配置
+SQLITE_PROFILES: Dict[str, SQLiteProfile] = {
+    # SQLite 默认行为：回滚日志、synchronous=FULL、不使用 mmap
+    'default': SQLiteProfile(
+        journal_mode=None,
+        synchronous=None,
+        mmap_size=None,
+        cache_size=None,
+        temp_store=None
+    ),
+    'performance': SQLiteProfile(),
+}
+
+
+def get_sqlite_profile(profile: Union[str, SQLiteProfile]) -> SQLiteProfile:
+    """按名称查找预置配置，传入配置对象时原样返回"""
+    if isinstance(profile, SQLiteProfile):
+        return profile
+    try:
+        return SQLITE_PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"未知的SQLite配置: {profile}") from None
@@ -0,0 +1,305 @@
+# todo_app/cli/store.py
+import heapq
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .search import NgramIndex, split_terms
+
+SortKey = Tuple[str, str, int]
+
+# put_many 改为追加后整体排序的任务数，少于此数时逐个插入更快
+_BULK_PUT = 32
+
+
+def sort_key(task: Dict) -> SortKey:
+    """任务的排序键 (日期, 创建时间, ID)，与 SQLite 模式的 ORDER BY 保持一致"""
+    return task['date'], task.get('created_at') or '', task['id']
+
+
+class TaskStore:
+    """进程内的任务索引
+
+    一次加载全部任务并维护二级索引，读操作变为索引查找：
+        - by_id:        ID -> 任务 的哈希表
+        - by_category:  分类 -> ID集合 的分桶
+        - 完成状态位图:  按ID存储的 bytearray 位图
+        - 排序键数组:    按 (日期, 创建时间, ID) 有序，日期范围通过 bisect 定位
+        - 名称倒排索引:  首次搜索时建立的二元组倒排表，用于子串搜索
+        - 统计计数:      按分类、按日期维护的 [总数, 已完成数]，统计无需遍历任务
+
+    token 记录索引对应的数据源版本 (文件 mtime 或写入代数)，
+    由 TaskManager 比对后决定是否重建。
+    """
+
+    def __init__(self, tasks: Iterable[Dict] = (), token: Any = None):
+        self.token = token
+        self.by_id: Dict[int, Dict] = {}
+        self.by_category: Dict[str, Set[int]] = {}
+        self._done = bytearray()
+        self._done_count = 0
+        self._keys: List[SortKey] = []
+        self._search: Optional[NgramIndex] = None
+        self.category_counts: Dict[str, List[int]] = {}
+        self.date_counts: Dict[str, List[int]] = {}
+
+        for task in tasks:
+            self._link(task)
+        self._keys.sort()
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def get(self, task_id: int) -> Optional[Dict]:
+        """根据ID返回任务副本，找不到返回None"""
+        task = self.by_id.get(task_id)
+        return dict(task) if task else None
+
+    def all(self) -> List[Dict]:
+        """按排序键返回全部任务副本"""
+        return [dict(self.by_id[key[2]]) for key in self._keys]
+
+    def categories(self) -> List[str]:
+        """返回排序后的分类列表"""
+        return sorted(self.by_category)
+
+    def put(self, task: Dict):
+        """新增任务或替换同ID的任务"""
+        old = self.by_id.get(task['id'])
+        if old is not None:
+            self._unlink(old)
+        self._link(task, keep_sorted=True)
+
+    def put_many(self, tasks: List[Dict]):
+        """批量新增或替换任务
+
+        任务较多时先全部追加再对排序键数组整体排序一次，避免逐个插入有序数组的 O(n) 移动。
+        """
+        if len(tasks) < _BULK_PUT:
+            for task in tasks:
+                self.put(task)
+            return
+        # 先移除全部旧任务：_unlink 在有序的排序键数组上二分查找
+        for task in tasks:
+            old = self.by_id.get(task['id'])
+            if old is not None:
+                self._unlink(old)
+        for task in tasks:
+            self._link(task)
+        self._keys.sort()
+
+    def remove(self, task_id: int) -> Optional[Dict]:
+        """移除任务，返回被移除的任务"""
+        task = self.by_id.get(task_id)
+        if task is not None:
+            self._unlink(task)
+        return task
+
+    def search_index(self) -> NgramIndex:
+        """返回名称倒排索引，首次调用时建立，之后随写入增量维护"""
+        if self._search is None:
+            index = NgramIndex()
+            for task_id, task in self.by_id.items():
+                index.add(task_id, task['name'])
+            self._search = index
+        return self._search
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Dict]:
+        """按相关度搜索任务名称
+
+        Args:
+            query: 以空白分隔的关键词，任务名称须包含全部关键词
+            limit: 最多返回的任务数
+
+        Returns:
+            按 BM25 相关度降序排列的任务副本
+        """
+        terms = split_terms(query)
+        if not terms:
+            return []
+
+        index = self.search_index()
+        candidates = None
+        for term in terms:
+            matched = index.candidates(term)
+            if matched is not None:
+                candidates = matched if candidates is None else candidates & matched
+
+        if candidates is None:
+            # 全是单字符关键词，无法使用倒排索引
+            pool, verify = self.by_id.values(), terms
+        else:
+            # 两个字符的关键词只有一个二元组，倒排表交集已是精确结果，无需再校验子串
+            pool = (self.by_id[task_id] for task_id in candidates)
+            verify = [term for term in terms if len(term) != 2]
+        if verify:
+            pool = (task for task in pool if all(term in task['name'].lower() for term in verify))
+
+        score = index.scorer(terms)
+
+        def rank(task):
+            return -score(task['name']), sort_key(task)
+
+        if limit is None:
+            hits = sorted(pool, key=rank)
+        else:
+            # 只需前 limit 个结果时用堆选出，避免对全部命中结果排序
+            hits = heapq.nsmallest(limit, pool, key=rank)
+        return [dict(task) for task in hits]
+
+    def is_done(self, task_id: int) -> bool:
+        """查询完成状态位图"""
+        byte = task_id >> 3
+        return byte < len(self._done) and bool(self._done[byte] & (1 << (task_id & 7)))
+
+    def query(
+            self,
+            filter_done: Optional[bool] = None,
+            category: Optional[str] = None,
+            search_query: Optional[str] = None,
+            start_date: Optional[str] = None,
+            end_date: Optional[str] = None,
+            after: Optional[SortKey] = None
+    ) -> Iterator[Dict]:
+        """按排序键顺序惰性返回符合条件的任务副本
+
+        Args:
+            filter_done/category/search_query/start_date/end_date: 与 TaskManager.get_tasks 相同
+            after: 只返回排序键大于该值的任务，用于游标分页
+        """
+        for task_id in self._query_ids(filter_done, category, search_query, start_date, end_date, after):
+            yield dict(self.by_id[task_id])
+
+    def count(
+            self,
+            filter_done: Optional[bool] = None,
+            category: Optional[str] = None,
+            search_query: Optional[str] = None,
+            start_date: Optional[str] = None,
+            end_date: Optional[str] = None
+    ) -> int:
+        """统计符合条件的任务数，不复制任务字典"""
+        if not (category or search_query or start_date or end_date):
+            if filter_done is None:
+                return len(self.by_id)
+            return self._done_count if filter_done else len(self.by_id) - self._done_count
+        return sum(1 for _ in self._query_ids(filter_done, category, search_query, start_date, end_date))
+
+    def _query_ids(
+            self,
+            filter_done: Optional[bool],
+            category: Optional[str],
+            search_query: Optional[str],
+            start_date: Optional[str],
+            end_date: Optional[str],
+            after: Optional[SortKey] = None
+    ) -> Iterator[int]:
+        """按排序键顺序返回符合条件的任务ID"""
+        lo = bisect_left(self._keys, (start_date,)) if start_date else 0
+        if after is not None:
+            lo = max(lo, bisect_right(self._keys, tuple(after)))
+        hi = bisect_left(self._keys, (end_date + '\x00',)) if end_date else len(self._keys)
+        if lo >= hi:
+            return
+
+        # 候选ID集合：分类桶与名称倒排索引的交集，None 表示不限制
+        candidates = None
+        if category:
+            candidates = self.by_category.get(category)
+            if not candidates:
+                return
+
+        search_lower = search_query.lower() if search_query else None
+        if search_lower:
+            matched = self.search_index().candidates(search_lower)
+            if matched is not None:
+                candidates = matched if candidates is None else candidates & matched
+                if not candidates:
+                    return
+
+        if candidates is not None and len(candidates) < hi - lo:
+            # 候选集比日期区间小时，直接遍历候选集再排序
+            keys = sorted(sort_key(self.by_id[i]) for i in candidates)
+            if start_date:
+                keys = keys[bisect_left(keys, (start_date,)):]
+            if end_date:
+                keys = keys[:bisect_left(keys, (end_date + '\x00',))]
+            if after is not None:
+                keys = keys[bisect_right(keys, tuple(after)):]
+            candidates = None
+        else:
+            keys = self._range(lo, hi)
+
+        for key in keys:
+            task_id = key[2]
+            if candidates is not None and task_id not in candidates:
+                continue
+            if filter_done is not None and self.is_done(task_id) != filter_done:
+                continue
+            if search_lower and search_lower not in self.by_id[task_id]['name'].lower():
+                continue
+            yield task_id
+
+    def _range(self, lo: int, hi: int) -> Iterator[SortKey]:
+        """遍历排序键数组的区间，避免切片复制"""
+        keys = self._keys
+        for i in range(lo, hi):
+            yield keys[i]
+
+    def _link(self, task: Dict, keep_sorted: bool = False):
+        """将任务加入各个索引"""
+        task_id = task['id']
+        self.by_id[task_id] = task
+        self.by_category.setdefault(task['category'], set()).add(task_id)
+        self._set_done(task_id, bool(task.get('done')))
+        if self._search is not None:
+            self._search.add(task_id, task['name'])
+        self._count(task, 1)
+        if keep_sorted:
+            insort(self._keys, sort_key(task))
+        else:
+            self._keys.append(sort_key(task))
+
+    def _unlink(self, task: Dict):
+        """将任务从各个索引中移除"""
+        task_id = task['id']
+        del self.by_id[task_id]
+        bucket = self.by_category.get(task['category'])
+        if bucket is not None:
+            bucket.discard(task_id)
+            if not bucket:
+                del self.by_category[task['category']]
+        self._set_done(task_id, False)
+        if self._search is not None:
+            self._search.remove(task_id, task['name'])
+        self._count(task, -1)
+        key = sort_key(task)
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+
+    def _count(self, task: Dict, delta: int):
+        """调整任务所在分类和日期的计数，计数归零时删除"""
+        done = delta if task.get('done') else 0
+        for counts, key in ((self.category_counts, task['category']), (self.date_counts, task['date'])):
+            entry = counts.setdefault(key, [0, 0])
+            entry[0] += delta
+            entry[1] += done
+            if not entry[0]:
+                del counts[key]
+
+    def _set_done(self, task_id: int, done: bool):
+        """设置完成状态位图中的一位，并维护已完成任务数"""
+        byte = task_id >> 3
+        if byte >= len(self._done):
+            if not done:
+                return
+            self._done.extend(bytes(byte - len(self._done) + 1))
+        bit = 1 << (task_id & 7)
+        if bool(self._done[byte] & bit) == done:
+            return
+        if done:
+            self._done[byte] |= bit
+            self._done_count += 1
+        else:
+            self._done[byte] &= ~bit & 0xFF
+            self._done_count -= 1
@@ -0,0 +1,154 @@
+# todo_app/cli/transfer.py
+"""任务的批量导入导出：CSV / NDJSON 的读写与逐条校验
+
+各步骤都是生成器，数据逐条流过：读文件 -> 校验规范化 -> 分块 -> 写入存储，
+导出时从存储逐块读出直接写入文件，内存占用与文件大小无关。
+"""
+import csv
+import json
+from datetime import date, datetime
+from functools import lru_cache
+from itertools import islice
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# 支持的文件格式
+FORMATS = ('csv', 'ndjson')
+# 导出的字段，也是 CSV 文件的表头
+EXPORT_FIELDS = ('id', 'name', 'date', 'category', 'done', 'created_at')
+DEFAULT_CATEGORY = '未分类'
+
+# 可以识别的日期格式，统一转换为 YYYY-MM-DD
+_DATE_FORMATS = ('%Y-%m-%d', '%Y/%m/%d', '%Y.%m.%d', '%Y%m%d')
+_TRUE_VALUES = {'1', 'true', 'yes', 'y', 'done', '是', '✓'}
+_FALSE_VALUES = {'', '0', 'false', 'no', 'n', 'pending', '否', '◻'}
+
+
+def guess_format(path: str) -> Optional[str]:
+    """按扩展名判断文件格式，无法判断时返回 None"""
+    suffix = path.rsplit('.', 1)[-1].lower() if '.' in path else ''
+    if suffix == 'csv':
+        return 'csv'
+    if suffix in ('ndjson', 'jsonl'):
+        return 'ndjson'
+    return None
+
+
+def read_records(file: IO[str], fmt: str, fieldnames: Optional[List[str]] = None) -> Iterator[Dict]:
+    """逐条读取文件中的任务记录
+
+    Args:
+        file: 文本文件对象，CSV 文件应以 newline='' 打开
+        fmt: 'csv' (第一行为表头) 或 'ndjson' (每行一个 JSON 对象)
+        fieldnames: CSV 的字段名，指定时 file 中没有表头 (读取文件的一部分时使用)
+
+    Yields:
+        原始记录字典，尚未校验；NDJSON 中无法解析的行产生空字典，由校验步骤报告
+    """
+    if fmt == 'csv':
+        yield from csv.DictReader(file, fieldnames=fieldnames)
+        return
+    for line in file:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = {}
+        yield record if isinstance(record, dict) else {}
+
+
+@lru_cache(maxsize=4096)
+def normalize_date(value: str) -> str:
+    """将日期转换为 YYYY-MM-DD，格式无法识别时抛出 ValueError
+
+    同一批数据中的日期大量重复，解析结果缓存后每个不同的日期只解析一次。
+    """
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    raise ValueError(f"无法识别的日期: {value}")
+
+
+def normalize_category(value) -> str:
+    """去掉分类首尾空白并合并连续空白，空分类归入默认分类"""
+    category = ' '.join(str(value).split()) if value is not None else ''
+    return category or DEFAULT_CATEGORY
+
+
+def normalize_done(value) -> bool:
+    """将完成状态转换为布尔值，无法识别时抛出 ValueError"""
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower() if value is not None else ''
+    if text in _TRUE_VALUES:
+        return True
+    if text in _FALSE_VALUES:
+        return False
+    raise ValueError(f"无法识别的完成状态: {value}")
+
+
+def normalize_records(records: Iterable[Dict], today: Optional[str] = None
+                      ) -> Iterator[Tuple[int, Optional[Tuple[str, str, str, bool]], Optional[str]]]:
+    """逐条校验并规范化任务记录
+
+    Args:
+        records: 原始记录，可包含 name/date/category/done，其他字段被忽略
+        today: 没有日期时使用的日期，默认为今天
+
+    Yields:
+        (记录序号 (从1开始), (名称, 日期, 分类, 是否完成), None)，
+        校验失败时为 (记录序号, None, 失败原因)
+    """
+    today = today or date.today().isoformat()
+    for number, record in enumerate(records, 1):
+        name = str(record.get('name') or '').strip()
+        if not name:
+            yield number, None, "任务名称不能为空"
+            continue
+        try:
+            raw_date = str(record.get('date') or '').strip()
+            task_date = normalize_date(raw_date) if raw_date else today
+            done = normalize_done(record.get('done'))
+        except ValueError as e:
+            yield number, None, str(e)
+            continue
+        yield number, (name, task_date, normalize_category(record.get('category')), done), None
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    """将可迭代对象按 size 分块"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def write_records(tasks: Iterable[Dict], file: IO[str], fmt: str) -> int:
+    """将任务逐条写入文件
+
+    Args:
+        tasks: 任务字典，只写出 EXPORT_FIELDS 中的字段
+        file: 文本文件对象，CSV 文件应以 newline='' 打开
+        fmt: 'csv' 或 'ndjson'
+
+    Returns:
+        写出的任务数
+    """
+    count = 0
+    if fmt == 'csv':
+        writer = csv.writer(file)
+        writer.writerow(EXPORT_FIELDS)
+        for task in tasks:
+            writer.writerow([task.get(field, '') for field in EXPORT_FIELDS])
+            count += 1
+        return count
+
+    for task in tasks:
+        file.write(json.dumps({field: task.get(field) for field in EXPORT_FIELDS}, ensure_ascii=False))
+        file.write('\n')
+        count += 1
+    return count
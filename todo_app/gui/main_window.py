@@ -2,13 +2,15 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from tkcalendar import DateEntry
+from bisect import insort
 from typing import Optional, Dict
 from ..cli.core import TaskManager
+from ..cli.events import TaskEvent
+from .virtual_list import VIRTUAL_THRESHOLD, VirtualTaskList
+from .worker import DataWorker
 import logging
 import datetime
 
-# 配置日志
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -24,6 +26,19 @@ class TodoApp:
 
         # 初始化核心管理器
         self.manager = TaskManager(storage_type='sqlite')
+        # 查询在后台线程执行，界面线程不会因 I/O 或数据库锁而卡住
+        self.worker = DataWorker(self.root)
+        self.worker.on_busy_change = self._on_busy_change
+        self._categories: list[str] = []
+        # 每次任务分类变化加一，后台统计分类任务数期间分类又有变化时据此重新统计
+        self._category_version = 0
+        self._status_text = "就绪 | 总任务: 0"
+        # 当前列表对应的筛选条件 (显示搜索结果时为None) 及其中的任务数、已完成数
+        self._filters: Optional[Dict] = None
+        self._total_tasks = 0
+        self._done_tasks = 0
+        # 写操作后按变更事件增量更新界面，不再重新加载整个列表
+        self.manager.subscribe(self._on_task_event)
 
         # 初始化UI
         self._setup_ui()
@@ -32,6 +47,13 @@ class TodoApp:
         # 窗口设置
         self._center_window(1000, 700)
         self.root.minsize(800, 600)
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+
+    def _on_close(self):
+        """关闭窗口前释放存储资源"""
+        self.worker.shutdown()
+        self.manager.close()
+        self.root.destroy()
 
     def _setup_styles(self):
         """设置应用程序样式"""
@@ -202,7 +224,7 @@ class TodoApp:
         self.category_combo = ttk.Combobox(
             filter_frame,
             textvariable=self.category_var,
-            values=["全部"] + self.manager.get_categories(),
+            values=["全部"],
             state="readonly",
             width=15
         )
@@ -265,10 +287,10 @@ class TodoApp:
             self.tree.heading(col_id, text=heading, anchor=tk.W)
             self.tree.column(col_id, width=width, stretch=False)
 
-        # 垂直滚动条
-        vsb = ttk.Scrollbar(list_frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=vsb.set)
+        # 垂直滚动条，由虚拟列表接管，任务很多时只插入可见行
+        vsb = ttk.Scrollbar(list_frame, orient="vertical")
         vsb.pack(side=tk.RIGHT, fill=tk.Y)
+        self.task_list = VirtualTaskList(self.tree, vsb, self.worker)
 
         # 水平滚动条
         hsb = ttk.Scrollbar(list_frame, orient="horizontal", command=self.tree.xview)
@@ -295,7 +317,7 @@ class TodoApp:
     def _setup_status_bar(self):
         """设置状态栏"""
         self.status_var = tk.StringVar()
-        self.status_var.set("就绪 | 总任务: 0")
+        self.status_var.set(self._status_text)
 
         status_bar = ttk.Frame(self.main_frame, height=20, style='Status.TFrame')
         status_bar.pack(fill=tk.X, pady=(10, 0))
@@ -336,87 +358,213 @@ class TodoApp:
 
         self.tree.bind("<Button-3>", self._show_context_menu)
 
-    def _load_tasks(self):
-        """加载任务列表"""
-        try:
-            # 获取筛选条件
-            category = None if self.category_var.get() == "全部" else self.category_var.get()
-
-            # 处理状态筛选
-            status = self.status_combo.get()
-            # print(status)
-            filter_done = None
-            if status == "已完成":
-                filter_done = True
-            elif status == "未完成":
-                filter_done = False
-
-            # 处理日期筛选
-            date_range = self.date_var.get()
-            start_date = None
-            end_date = None
-
-            if date_range != "全部":
-                today = datetime.date.today()
-                if date_range == "今天":
-                    start_date = today.strftime("%Y-%m-%d")
-                    end_date = start_date
-                elif date_range == "本周":
-                    start_date = (today - datetime.timedelta(days=today.weekday())).strftime("%Y-%m-%d")
-                    end_date = (today + datetime.timedelta(days=6 - today.weekday())).strftime("%Y-%m-%d")
-                elif date_range == "本月":
-                    start_date = today.replace(day=1).strftime("%Y-%m-%d")
-                    next_month = today.replace(day=28) + datetime.timedelta(days=4)
-                    end_date = (next_month - datetime.timedelta(days=next_month.day)).strftime("%Y-%m-%d")
-
-            # 获取任务数据
-            tasks = self.manager.get_tasks(
-                filter_done=filter_done,
-                category=category,
-                start_date=start_date,
-                end_date=end_date
-            )
+    def _load_tasks(self, on_loaded=None):
+        """在后台线程加载任务列表，完成后刷新界面
 
-            # 更新UI
-            self._update_task_list(tasks)
+        Args:
+            on_loaded: 界面刷新完成后调用的无参函数
+        """
+        # 筛选条件在主线程读取，后台线程不能访问 Tk 控件
+        filters = self._get_filters()
+        manager = self.manager
+
+        def load():
+            # 任务很多时只读取第一页，其余在滚动时按需读取
+            total = manager.count_tasks(**filters)
+            cursor = None
+            if total <= VIRTUAL_THRESHOLD:
+                tasks = manager.get_tasks(**filters)
+            else:
+                tasks, cursor = manager.get_tasks_page(page_size=self.task_list.page_size, **filters)
+            # 已完成数由存储层统计，不遍历任务列表
+            if filters['filter_done'] is None:
+                done = manager.count_tasks(**dict(filters, filter_done=True))
+            else:
+                done = total if filters['filter_done'] else 0
+            return total, done, tasks, cursor, manager.get_categories()
 
-            # 更新状态栏
-            total_tasks = len(tasks)
-            done_tasks = sum(1 for t in tasks if t['done'])
-            self.status_var.set(
-                f"就绪 | 总任务: {total_tasks} | 已完成: {done_tasks} | "
-                f"未完成: {total_tasks - done_tasks}"
-            )
+        def on_done(result):
+            total, done, tasks, cursor, categories = result
+            if total <= VIRTUAL_THRESHOLD:
+                self.task_list.set_tasks(tasks)
+            else:
+                # 按游标分页，顺序滚动时不再让 SQLite 逐行跳过 OFFSET
+                self.task_list.set_source(
+                    total,
+                    lambda after, skip, limit: manager.get_tasks_page(
+                        page_size=limit, cursor=after, offset=skip, **filters),
+                    tasks,
+                    cursor
+                )
+            self._filters = filters
+            self._apply_loaded_tasks(total, done, categories)
+            if on_loaded:
+                on_loaded()
+
+        self.worker.submit('load', load, on_done, self._on_load_error)
+
+    def _get_filters(self) -> Dict:
+        """读取筛选栏的当前条件"""
+        # 获取筛选条件
+        category = None if self.category_var.get() == "全部" else self.category_var.get()
+
+        # 处理状态筛选
+        status = self.status_combo.get()
+        filter_done = None
+        if status == "已完成":
+            filter_done = True
+        elif status == "未完成":
+            filter_done = False
+
+        # 处理日期筛选
+        date_range = self.date_var.get()
+        start_date = None
+        end_date = None
+
+        if date_range != "全部":
+            today = datetime.date.today()
+            if date_range == "今天":
+                start_date = today.strftime("%Y-%m-%d")
+                end_date = start_date
+            elif date_range == "本周":
+                start_date = (today - datetime.timedelta(days=today.weekday())).strftime("%Y-%m-%d")
+                end_date = (today + datetime.timedelta(days=6 - today.weekday())).strftime("%Y-%m-%d")
+            elif date_range == "本月":
+                start_date = today.replace(day=1).strftime("%Y-%m-%d")
+                next_month = today.replace(day=28) + datetime.timedelta(days=4)
+                end_date = (next_month - datetime.timedelta(days=next_month.day)).strftime("%Y-%m-%d")
+
+        return {
+            'filter_done': filter_done,
+            'category': category,
+            'start_date': start_date,
+            'end_date': end_date
+        }
+
+    def _apply_loaded_tasks(self, total_tasks: int, done_tasks: int, categories: list[str]):
+        """用后台加载的结果刷新状态栏和分类下拉框"""
+        # 更新状态栏
+        self._total_tasks = total_tasks
+        self._done_tasks = done_tasks
+        self._show_counts()
+
+        # 更新分类下拉框
+        self._categories = categories
+        current_category = self.category_var.get()
+        self.category_combo['values'] = ["全部"] + categories
+        if current_category in self.category_combo['values']:
+            self.category_combo.set(current_category)
+        else:
+            self.category_combo.set("全部")
 
-            # 更新分类下拉框
-            current_category = self.category_var.get()
-            self.category_combo['values'] = ["全部"] + self.manager.get_categories()
-            if current_category in self.category_combo['values']:
-                self.category_combo.set(current_category)
+    def _show_counts(self):
+        """在状态栏显示当前列表的任务数"""
+        self._set_status(
+            f"就绪 | 总任务: {self._total_tasks} | 已完成: {self._done_tasks} | "
+            f"未完成: {self._total_tasks - self._done_tasks}"
+        )
+
+    def _matches_filters(self, task: Dict) -> bool:
+        """任务是否属于当前筛选条件下的列表"""
+        filters = self._filters
+        if filters['filter_done'] is not None and bool(task['done']) != filters['filter_done']:
+            return False
+        if filters['category'] and task['category'] != filters['category']:
+            return False
+        if filters['start_date'] and task['date'] < filters['start_date']:
+            return False
+        if filters['end_date'] and task['date'] > filters['end_date']:
+            return False
+        return True
+
+    def _on_task_event(self, event: TaskEvent):
+        """根据任务变更事件增量更新列表、计数和分类，每个任务的开销与列表长度无关"""
+        for task_id in event.ids:
+            before = event.previous.get(task_id)
+            after = event.tasks.get(task_id)
+
+            if self._filters is None:
+                # 搜索结果只更新或移除已显示的行
+                if after is not None and before is not None:
+                    self.task_list.update_task(after)
+                elif before is not None:
+                    self.task_list.remove_task(before)
             else:
-                self.category_combo.set("全部")
+                was_shown = before is not None and self._matches_filters(before)
+                shown = after is not None and self._matches_filters(after)
+                if was_shown and shown and before['date'] == after['date']:
+                    self.task_list.update_task(after)
+                else:
+                    if was_shown:
+                        self.task_list.remove_task(before)
+                    if shown:
+                        self.task_list.insert_task(after)
+
+                self._total_tasks += shown - was_shown
+                self._done_tasks += (shown and bool(after['done'])) - (was_shown and bool(before['done']))
+
+            self._update_category(before, after)
+
+        if self._filters is not None:
+            self._show_counts()
+
+    def _update_category(self, before: Optional[Dict], after: Optional[Dict]):
+        """任务分类变化后更新分类列表"""
+        old = before['category'] if before else None
+        new = after['category'] if after else None
+        if old == new:
+            return
+
+        self._category_version += 1
+        if new is not None and new not in self._categories:
+            insort(self._categories, new)
+            self.category_combo['values'] = ["全部"] + self._categories
+        # 原分类可能已没有任务，在后台借助分类索引只统计该分类
+        if old is not None and old in self._categories:
+            self._check_empty_category(old)
+
+    def _check_empty_category(self, category: str):
+        """在后台统计分类的任务数，已没有任务时从分类列表中移除"""
+        manager = self.manager
+        version = self._category_version
+
+        def on_done(count):
+            if count or category not in self._categories:
+                return
+            if version != self._category_version:
+                # 统计期间又有任务改变了分类，结果可能已过期，重新统计
+                self._check_empty_category(category)
+                return
+            self._categories.remove(category)
+            self.category_combo['values'] = ["全部"] + self._categories
 
-        except Exception as e:
-            logger.error(f"加载任务失败: {str(e)}")
-            messagebox.showerror("错误", f"加载任务失败: {str(e)}")
+        self.worker.submit(f'category:{category}', lambda: manager.count_tasks(category=category), on_done)
+
+    def _on_load_error(self, error: Exception):
+        """后台加载失败"""
+        logger.error(f"加载任务失败: {str(error)}")
+        messagebox.showerror("错误", f"加载任务失败: {str(error)}")
+
+    def _set_status(self, text: str):
+        """设置状态栏文字，加载中时保留加载提示"""
+        self._status_text = text
+        self._on_busy_change(self.worker.busy)
+
+    def _on_busy_change(self, busy: bool):
+        """在状态栏显示或清除加载提示"""
+        if busy:
+            self.status_var.set(f"⏳ 加载中… | {self._status_text}")
+        else:
+            self.status_var.set(self._status_text)
 
     def _update_task_list(self, tasks: list[Dict]):
         """更新任务列表显示"""
-        self.tree.delete(*self.tree.get_children())
-
-        for task in tasks:
-            status = '✅' if task['done'] else '◻️'
-            self.tree.insert(
-                '', tk.END,
-                values=(
-                    task['id'],
-                    status,
-                    task['name'],
-                    task['date'],
-                    task['category']
-                ),
-                tags=('done' if task['done'] else 'pending')
-            )
+        self.task_list.set_tasks(tasks)
+
+    def _show_search_results(self, tasks: list[Dict]):
+        """显示搜索结果"""
+        self._filters = None
+        self._update_task_list(tasks)
 
     def _apply_filters(self, event=None):
         """应用筛选条件"""
@@ -424,8 +572,7 @@ class TodoApp:
 
     def _reload_tasks(self):
         """重新加载任务"""
-        self._load_tasks()
-        messagebox.showinfo("刷新", "任务列表已刷新")
+        self._load_tasks(on_loaded=lambda: messagebox.showinfo("刷新", "任务列表已刷新"))
 
     def _show_add_dialog(self):
         """显示添加任务对话框"""
@@ -445,10 +592,10 @@ class TodoApp:
         name_entry.focus_set()
 
         ttk.Label(dialog, text="任务分类:").grid(row=1, column=0, padx=10, pady=10, sticky=tk.E)
-        category_combo = ttk.Combobox(dialog, values=self.manager.get_categories(), width=28)
+        category_combo = ttk.Combobox(dialog, values=self._categories, width=28)
         category_combo.grid(row=1, column=1, padx=10, pady=10, sticky=tk.W)
-        if self.manager.get_categories():
-            category_combo.set(self.manager.get_categories()[0])
+        if self._categories:
+            category_combo.set(self._categories[0])
 
         ttk.Label(dialog, text="任务日期:").grid(row=2, column=0, padx=10, pady=10, sticky=tk.E)
         date_entry = DateEntry(dialog, width=27, date_pattern="yyyy-mm-dd")
@@ -471,7 +618,6 @@ class TodoApp:
             )
 
             if task:
-                self._load_tasks()
                 dialog.destroy()
             else:
                 messagebox.showerror("错误", "添加任务失败！")
@@ -497,8 +643,14 @@ class TodoApp:
             if not keyword:
                 return
 
-            tasks = self.manager.get_tasks(search_query=keyword)
-            self._update_task_list(tasks)
+            # 多个关键词以空格分隔，结果按相关度排序
+            manager = self.manager
+            self.worker.submit(
+                'load',
+                lambda: manager.search_tasks(keyword),
+                self._show_search_results,
+                self._on_load_error
+            )
             dialog.destroy()
 
         ttk.Button(dialog, text="搜索", command=on_search).pack(pady=10)
@@ -524,7 +676,7 @@ class TodoApp:
         name_entry.focus_set()
 
         ttk.Label(dialog, text="任务分类:").grid(row=1, column=0, padx=10, pady=10, sticky=tk.E)
-        category_combo = ttk.Combobox(dialog, values=self.manager.get_categories(), width=28)
+        category_combo = ttk.Combobox(dialog, values=self._categories, width=28)
         category_combo.grid(row=1, column=1, padx=10, pady=10, sticky=tk.W)
         category_combo.set(selected['category'])
 
@@ -555,7 +707,6 @@ class TodoApp:
             }
 
             if self.manager.update_task(selected['id'], updates):
-                self._load_tasks()
                 dialog.destroy()
             else:
                 messagebox.showerror("错误", "更新任务失败！")
@@ -569,13 +720,16 @@ class TodoApp:
         if not selected_tasks:
             return
 
-        for task in selected_tasks:
-            success = self.manager.update_task(task['id'], {'done': not task['done']})
-            if not success:
-                messagebox.showerror("错误", f"更新任务 {task['name']} 失败！")
-                break
-
-        self._load_tasks()
+        # 所有选中任务在一次批量操作中完成
+        results = self.manager.update_tasks(
+            {task['id']: {'done': not task['done']} for task in selected_tasks}
+        )
+        failed_updates = [task['name'] for task in selected_tasks if not results.get(task['id'])]
+        if failed_updates:
+            messagebox.showerror(
+                "错误",
+                f"以下任务更新失败:\n{', '.join(failed_updates)}"
+            )
 
     def _delete_selected_tasks(self):
         """删除选中任务"""
@@ -590,10 +744,8 @@ class TodoApp:
         ):
             return
 
-        failed_deletes = []
-        for task in selected_tasks:
-            if not self.manager.delete_task(task['id']):
-                failed_deletes.append(task['name'])
+        results = self.manager.delete_tasks([task['id'] for task in selected_tasks])
+        failed_deletes = [task['name'] for task in selected_tasks if not results.get(task['id'])]
 
         if failed_deletes:
             messagebox.showerror(
@@ -603,8 +755,6 @@ class TodoApp:
         else:
             messagebox.showinfo("成功", f"已删除 {len(selected_tasks)} 个任务")
 
-        self._load_tasks()
-
     def _copy_task_name(self):
         """复制选中任务名称到剪贴板"""
         selected = self._get_selected_task()
@@ -615,23 +765,24 @@ class TodoApp:
 
     def _show_stats(self):
         """显示任务统计信息"""
-        tasks = self.manager.get_tasks()
-        if not tasks:
+        manager = self.manager
+        # 聚合在存储层完成，开销与分类数、月份数成正比
+        self.worker.submit(
+            'stats',
+            lambda: manager.get_stats(date_bucket='month'),
+            self._show_stats_dialog,
+            self._on_load_error
+        )
+
+    def _show_stats_dialog(self, data: Dict):
+        """显示统计结果"""
+        total = data['total']
+        if not total:
             messagebox.showinfo("统计", "当前没有任务")
             return
 
-        total = len(tasks)
-        done = sum(1 for t in tasks if t['done'])
-        pending = total - done
-
-        # 按分类统计
-        categories = {}
-        for t in tasks:
-            if t['category'] not in categories:
-                categories[t['category']] = {'total': 0, 'done': 0}
-            categories[t['category']]['total'] += 1
-            if t['done']:
-                categories[t['category']]['done'] += 1
+        done = data['done']
+        pending = data['pending']
 
         # 构建统计信息
         stats = [
@@ -643,12 +794,17 @@ class TodoApp:
             f"\n📂 按分类统计:"
         ]
 
-        for cat, data in categories.items():
+        for cat, counts in data['categories'].items():
             stats.append(
-                f"{cat}: {data['done']}/{data['total']} "
-                f"({data['done'] / data['total']:.0%})"
+                f"{cat}: {counts['done']}/{counts['total']} "
+                f"({counts['done'] / counts['total']:.0%})"
             )
 
+        # 最近六个月
+        stats.append("\n📅 按月统计:")
+        for month, counts in list(data['dates'].items())[-6:]:
+            stats.append(f"{month}: {counts['done']}/{counts['total']}")
+
         messagebox.showinfo("任务统计", "\n".join(stats))
 
     def _show_settings(self):
@@ -670,6 +826,10 @@ class TodoApp:
             dialog, text="JSON文件",
             variable=storage_var, value='json'
         ).pack(anchor=tk.W)
+        ttk.Radiobutton(
+            dialog, text="JSON日志 (追加写入)",
+            variable=storage_var, value='journal'
+        ).pack(anchor=tk.W)
 
         def on_save():
             if storage_var.get() != self.manager.storage_type:
@@ -688,23 +848,20 @@ class TodoApp:
 
     def _get_selected_task(self) -> Optional[Dict]:
         """获取当前选中的单个任务"""
-        selected = self.tree.selection()
+        selected = self.task_list.selected_ids()
         if not selected:
             return None
 
-        item = selected[0]
-        task_id = int(self.tree.item(item, 'values')[0])
-        return self.manager.get_task_by_id(task_id)
+        return self.manager.get_task_by_id(selected[0])
 
     def _get_selected_tasks(self) -> list[Dict]:
         """获取当前选中的所有任务"""
-        selected_items = self.tree.selection()
-        if not selected_items:
+        selected_ids = self.task_list.selected_ids()
+        if not selected_ids:
             return []
 
         tasks = []
-        for item in selected_items:
-            task_id = int(self.tree.item(item, 'values')[0])
+        for task_id in selected_ids:
             task = self.manager.get_task_by_id(task_id)
             if task:
                 tasks.append(task)
@@ -744,6 +901,7 @@ class TodoApp:
 
 def run():
     """运行应用程序"""
+    logging.basicConfig(level=logging.INFO)
     root = tk.Tk()
     app = TodoApp(root)
     root.mainloop()
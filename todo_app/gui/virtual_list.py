@@ -0,0 +1,389 @@
+# todo_app/gui/virtual_list.py
+import tkinter as tk
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from tkinter import ttk
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+# 任务数超过该值时启用虚拟列表，否则一次性插入全部行
+VIRTUAL_THRESHOLD = 1000
+
+# 分页读取函数：(游标, 跳过行数, 行数) -> (任务列表, 下一页游标)
+Fetch = Callable[[Optional[str], int, int], Tuple[List[Dict], Optional[str]]]
+
+
+def _position(task: Dict) -> Tuple[str, int]:
+    """任务在列表中的排序位置
+
+    列表按 (日期, 创建时间, ID) 排序，ID 自增且与创建时间同序，
+    而 SQLite 模式返回的任务不含创建时间，因此用 (日期, ID) 定位。
+    """
+    return task['date'], task['id']
+
+
+def _values(task: Dict) -> tuple:
+    """任务在 Treeview 中各列的值"""
+    return (
+        task['id'],
+        '✅' if task['done'] else '◻️',
+        task['name'],
+        task['date'],
+        task['category']
+    )
+
+
+class VirtualTaskList:
+    """任务列表 Treeview 的虚拟滚动
+
+    任务较少时与普通 Treeview 相同，一次插入全部行。
+    任务很多时只在 Treeview 中保留可见行及上下各 overscan 行，
+    滚动条按总数比例显示；滚动到尚未加载的位置时，由后台线程按页读取，
+    读取完成前以占位行显示。
+
+    Treeview 在已插入的行内自行滚动 (滚轮、方向键)，接近边缘时重新取窗口，
+    因此原生的键盘和滚轮操作都可以使用。行的 iid 为任务ID。
+
+    分页按游标读取：每读取一页都缓存下一页的起始游标，顺序滚动时每页只需一次索引定位；
+    跳转到没有游标的页面时从最近的已知游标开始跳过中间的行。
+    """
+
+    def __init__(
+            self,
+            tree: ttk.Treeview,
+            scrollbar: ttk.Scrollbar,
+            worker,
+            page_size: int = 200,
+            overscan: int = 50,
+            max_pages: int = 50
+    ):
+        """
+        Args:
+            tree: 显示任务的 Treeview，列为 (id, status, name, date, category)
+            scrollbar: 垂直滚动条
+            worker: 后台加载分页使用的 DataWorker
+            page_size: 每次从存储读取的行数
+            overscan: 可见区域上下额外保留的行数
+            max_pages: 最多缓存的页数，超出时丢弃最久未使用的页
+        """
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.worker = worker
+        self.page_size = page_size
+        self.overscan = overscan
+        self.max_pages = max_pages
+
+        self._virtual = False
+        self._total = 0
+        # 完整的任务列表 (已全部在内存中时) 或按页读取的函数 (游标, 跳过行数, 行数) -> (任务列表, 下一页游标)
+        self._rows: Optional[List[Dict]] = None
+        # 与 _rows 一一对应的排序位置，供二分查找 (bisect 的 key 参数需要 Python 3.10)
+        self._keys: Optional[List[Tuple[str, int]]] = None
+        self._fetch: Optional[Fetch] = None
+        self._pages: OrderedDict = OrderedDict()
+        # 页号 -> 该页起始位置的游标，第0页从头读取；页数据被淘汰后游标仍保留
+        self._cursors: Dict[int, Optional[str]] = {0: None}
+        # 数据变化后内容可能过期的页，显示时照常使用，同时在后台重新读取
+        self._stale: Set[int] = set()
+        self._loading: Set[int] = set()
+        self._render_pending = False
+        self._generation = 0
+        # 当前插入 Treeview 的行区间 [start, end) 与首个可见行
+        self._start = 0
+        self._end = 0
+        self._first = 0
+        # 虚拟模式下的选中任务ID，滚出窗口的行也保持选中
+        self._selected: Set[int] = set()
+
+        tree.configure(yscrollcommand=self._on_tree_scroll)
+        scrollbar.configure(command=self._on_scrollbar)
+        tree.bind('<<TreeviewSelect>>', self._on_select, add='+')
+        tree.bind('<Configure>', self._on_resize, add='+')
+
+    @property
+    def total(self) -> int:
+        """当前列表的任务总数"""
+        return self._total
+
+    def set_tasks(self, tasks: List[Dict]):
+        """显示已在内存中的任务列表"""
+        self._reset(len(tasks))
+        self._rows = tasks
+        self._keys = [_position(task) for task in tasks]
+        if len(tasks) <= VIRTUAL_THRESHOLD:
+            self._virtual = False
+            self.tree.delete(*self.tree.get_children())
+            for task in tasks:
+                self._insert(task)
+            return
+        self._virtual = True
+        self._render()
+
+    def set_source(self, total: int, fetch: Fetch, first_page: List[Dict], next_cursor: Optional[str]):
+        """显示按需分页读取的任务列表
+
+        Args:
+            total: 任务总数
+            fetch: 在后台线程调用的分页读取函数 (游标, 跳过行数, 行数) -> (任务列表, 下一页游标)，
+                即 TaskManager.get_tasks_page
+            first_page: 已读取的第一页 (page_size 行)，避免打开时出现占位行
+            next_cursor: 第一页之后的游标
+        """
+        self._reset(total)
+        self._virtual = True
+        self._fetch = fetch
+        self._store_page(0, first_page, next_cursor)
+        self._render()
+
+    def update_task(self, task: Dict):
+        """原位更新一行任务，用于排序位置 (日期) 未改变的修改"""
+        task_id = task['id']
+        if self._rows is not None:
+            index = self._find(task)
+            if index is not None:
+                self._rows[index] = task
+                self._keys[index] = _position(task)
+        else:
+            # 缓存最多 max_pages 页，逐页查找的开销与任务总数无关
+            for rows in self._pages.values():
+                for i, row in enumerate(rows):
+                    if row['id'] == task_id:
+                        rows[i] = task
+
+        iid = str(task_id)
+        if self.tree.exists(iid):
+            self.tree.item(iid, values=_values(task), tags=('done' if task['done'] else 'pending'))
+
+    def insert_task(self, task: Dict):
+        """在排序位置插入一行任务"""
+        self._total += 1
+        if self._rows is not None:
+            key = _position(task)
+            index = bisect_right(self._keys, key)
+            self._rows.insert(index, task)
+            self._keys.insert(index, key)
+            if not self._virtual:
+                self._insert(task, index)
+                return
+        self._invalidate()
+
+    def remove_task(self, task: Dict):
+        """移除一行任务
+
+        Args:
+            task: 变更前的任务，用于定位
+        """
+        self._selected.discard(task['id'])
+        if self._rows is not None:
+            index = self._find(task)
+            if index is None:
+                return
+            del self._rows[index]
+            del self._keys[index]
+            self._total -= 1
+            if not self._virtual:
+                self.tree.delete(str(task['id']))
+                return
+        else:
+            self._total = max(0, self._total - 1)
+        self._invalidate()
+
+    def selected_ids(self) -> List[int]:
+        """返回选中的任务ID"""
+        if self._virtual:
+            return sorted(self._selected)
+        return [int(iid) for iid in self.tree.selection() if iid.isdigit()]
+
+    def _reset(self, total: int):
+        """切换数据源，丢弃缓存和进行中的分页请求"""
+        self._generation += 1
+        self.worker.cancel('page')
+        self._total = total
+        self._rows = None
+        self._keys = None
+        self._fetch = None
+        self._pages.clear()
+        self._cursors = {0: None}
+        self._stale.clear()
+        self._loading.clear()
+        self._selected.clear()
+        self._start = self._end = self._first = 0
+
+    def _insert(self, task: Dict, index=tk.END):
+        """在 Treeview 的指定位置插入一行任务，默认插入末尾"""
+        self.tree.insert(
+            '', index,
+            iid=str(task['id']),
+            values=_values(task),
+            tags=('done' if task['done'] else 'pending')
+        )
+
+    def _find(self, task: Dict) -> Optional[int]:
+        """在内存中的任务列表里查找任务的下标"""
+        rows = self._rows
+        index = bisect_left(self._keys, _position(task))
+        if index < len(rows) and rows[index]['id'] == task['id']:
+            return index
+        # 搜索结果按相关度排序，二分查找不适用时退化为线性查找
+        for index, row in enumerate(rows):
+            if row['id'] == task['id']:
+                return index
+        return None
+
+    def _invalidate(self):
+        """行的位置发生变化后重新读取缓存页，并在空闲时重新渲染"""
+        if self._rows is None:
+            self._generation += 1
+            self._loading.clear()
+            self._stale = set(self._pages)
+            # 行的位置变化后页号与游标不再对应，只保留第0页
+            self._cursors = {0: None}
+        if self._virtual and not self._render_pending:
+            self._render_pending = True
+            self.tree.after_idle(self._render)
+
+    def _row(self, index: int) -> Optional[Dict]:
+        """取第 index 行任务，所在页尚未加载时返回None，页内容过期时仍返回旧内容"""
+        if self._rows is not None:
+            return self._rows[index]
+        page = index // self.page_size
+        rows = self._pages.get(page)
+        if rows is None:
+            return None
+        self._pages.move_to_end(page)
+        offset = index - page * self.page_size
+        return rows[offset] if offset < len(rows) else None
+
+    def _store_page(self, page: int, rows: List[Dict], next_cursor: Optional[str]):
+        """将读取的一页放入缓存，并记录下一页的游标"""
+        self._pages[page] = rows
+        self._pages.move_to_end(page)
+        self._stale.discard(page)
+        if next_cursor is not None:
+            self._cursors[page + 1] = next_cursor
+        while len(self._pages) > self.max_pages:
+            page, _ = self._pages.popitem(last=False)
+            self._stale.discard(page)
+
+    def _visible_rows(self) -> int:
+        """可见区域能显示的行数"""
+        row_height = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        # 扣除表头占用的一行
+        return max(1, self.tree.winfo_height() // row_height - 1)
+
+    def _render(self):
+        """重新插入首个可见行附近的窗口"""
+        self._render_pending = False
+        if not self._virtual:
+            return
+        visible = self._visible_rows()
+        self._first = max(0, min(self._first, self._total - visible))
+        self._start = max(0, self._first - self.overscan)
+        self._end = min(self._total, self._first + visible + self.overscan)
+
+        self.tree.delete(*self.tree.get_children())
+        missing = set()
+        for index in range(self._start, self._end):
+            task = self._row(index)
+            if task is None or index // self.page_size in self._stale:
+                missing.add(index // self.page_size)
+            if task is None:
+                self.tree.insert('', tk.END, iid=f'_row{index}', values=('', '', '加载中…', '', ''))
+            else:
+                self._insert(task)
+
+        selected = [str(i) for i in self._selected if self.tree.exists(str(i))]
+        if selected:
+            self.tree.selection_set(selected)
+        if self._end > self._start:
+            self.tree.yview_moveto((self._first - self._start) / (self._end - self._start))
+        self._update_scrollbar(visible)
+
+        if missing:
+            self._load_pages(sorted(missing))
+
+    def _load_pages(self, pages: List[int]):
+        """在后台读取缺失的页，完成后重新渲染"""
+        pages = [page for page in pages if page not in self._loading]
+        if not pages or self._fetch is None:
+            return
+        first, last = pages[0], pages[-1]
+        # 从不晚于第一页的最近一个游标开始，跳过其间的行
+        base = max(page for page in self._cursors if page <= first)
+        cursor, skip = self._cursors[base], (first - base) * self.page_size
+        fetch, generation, page_size = self._fetch, self._generation, self.page_size
+
+        def load():
+            nonlocal cursor, skip
+            loaded = []
+            for page in range(first, last + 1):
+                rows, cursor = fetch(cursor, skip, page_size)
+                skip = 0
+                loaded.append((page, rows, cursor))
+                if cursor is None:
+                    break
+            return loaded
+
+        def on_done(loaded):
+            self._loading.difference_update(pages)
+            if generation != self._generation:
+                return
+            for page, rows, next_cursor in loaded:
+                self._store_page(page, rows, next_cursor)
+            # 总数在读取期间变少时末尾的页为空，同样记为已加载，避免反复读取
+            for page in pages:
+                self._pages.setdefault(page, [])
+            self._render()
+
+        # 同一 key 的新请求会作废旧请求，快速拖动滚动条时只读取最终位置
+        self._loading = set(pages)
+        self.worker.submit('page', load, on_done)
+
+    def _update_scrollbar(self, visible: int):
+        """按任务总数设置滚动条位置和长度"""
+        if not self._total:
+            self.scrollbar.set(0, 1)
+            return
+        self.scrollbar.set(self._first / self._total, min(1.0, (self._first + visible) / self._total))
+
+    def _on_tree_scroll(self, lo, hi):
+        """Treeview 自身滚动时同步首个可见行，接近窗口边缘时重新取窗口"""
+        if not self._virtual:
+            self.scrollbar.set(lo, hi)
+            return
+        count = self._end - self._start
+        if not count:
+            return
+        self._first = self._start + round(float(lo) * count)
+        visible = self._visible_rows()
+        self._update_scrollbar(visible)
+
+        margin = self.overscan // 2
+        if (self._start > 0 and self._first - self._start < margin) or \
+                (self._end < self._total and self._end - (self._first + visible) < margin):
+            self._render()
+
+    def _on_scrollbar(self, action, value, unit=None):
+        """拖动或点击滚动条"""
+        if not self._virtual:
+            self.tree.yview(action, value, *([unit] if unit else []))
+            return
+        visible = self._visible_rows()
+        if action == 'moveto':
+            self._first = int(float(value) * self._total)
+        elif action == 'scroll':
+            step = visible if unit == 'pages' else 1
+            self._first += int(value) * step
+        self._render()
+
+    def _on_select(self, event=None):
+        """记录虚拟模式下的选中任务"""
+        if not self._virtual:
+            return
+        shown = {int(iid) for iid in self.tree.get_children() if iid.isdigit()}
+        selected = {int(iid) for iid in self.tree.selection() if iid.isdigit()}
+        self._selected = (self._selected - shown) | selected
+
+    def _on_resize(self, event=None):
+        """窗口大小变化时可见行数随之变化"""
+        if self._virtual:
+            self._render()
@@ -0,0 +1,118 @@
+# todo_app/gui/worker.py
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DataWorker:
+    """在后台线程执行数据查询，结果交回 Tk 主线程处理
+
+    Tk 控件只能在主线程访问，因此后台线程只把结果放入队列，
+    由主线程通过 root.after 定时取出并调用回调。
+
+    同一个 key 的请求只保留最新一次：提交新请求时取消尚未开始的旧请求，
+    已经在执行的旧请求完成后结果直接丢弃，快速切换筛选条件时不会出现旧数据覆盖新数据。
+    """
+
+    def __init__(self, root, max_workers: int = 2, poll_interval: int = 30):
+        """
+        Args:
+            root: Tkinter根窗口
+            max_workers: 后台线程数
+            poll_interval: 轮询结果队列的间隔 (毫秒)
+        """
+        self.root = root
+        self.poll_interval = poll_interval
+        # 忙碌状态变化时回调 (参数为是否有未完成的请求)，用于显示加载提示
+        self.on_busy_change: Optional[Callable[[bool], None]] = None
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='todo-data')
+        self._results: queue.Queue = queue.Queue()
+        self._generations: Dict[str, int] = {}
+        self._futures: Dict[str, Future] = {}
+        self._pending = 0
+        self._after_id = None
+
+    @property
+    def busy(self) -> bool:
+        """是否有未完成的请求"""
+        return self._pending > 0
+
+    def submit(
+            self,
+            key: str,
+            func: Callable[[], Any],
+            on_done: Callable[[Any], None],
+            on_error: Optional[Callable[[Exception], None]] = None
+    ):
+        """在后台线程执行 func，完成后在主线程调用 on_done(结果)
+
+        Args:
+            key: 请求类别，同类请求只有最新一次的结果会被处理
+            func: 在后台线程执行的无参函数，不能访问 Tk 控件
+            on_done: 成功时在主线程调用
+            on_error: 失败时在主线程调用，默认只记录日志
+        """
+        self.cancel(key)
+        generation = self._generations[key]
+
+        future = self._executor.submit(func)
+        self._futures[key] = future
+        self._set_pending(self._pending + 1)
+        future.add_done_callback(
+            lambda f: self._results.put((key, generation, f, on_done, on_error)))
+
+        if self._after_id is None:
+            self._after_id = self.root.after(self.poll_interval, self._poll)
+
+    def cancel(self, key: str):
+        """作废某类请求，尚未开始的直接取消，正在执行的结果将被丢弃"""
+        self._generations[key] = self._generations.get(key, 0) + 1
+        future = self._futures.pop(key, None)
+        if future is not None:
+            future.cancel()
+
+    def shutdown(self):
+        """停止轮询并关闭线程池，不等待正在执行的请求"""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _poll(self):
+        """在主线程中处理已完成的请求"""
+        self._after_id = None
+        while True:
+            try:
+                key, generation, future, on_done, on_error = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            self._set_pending(self._pending - 1)
+            if future.cancelled() or generation != self._generations.get(key):
+                continue
+            self._futures.pop(key, None)
+
+            error = future.exception()
+            try:
+                if error is None:
+                    on_done(future.result())
+                elif on_error is not None:
+                    on_error(error)
+                else:
+                    logger.error(f"后台任务失败: {str(error)}")
+            except Exception as e:
+                logger.error(f"处理后台任务结果失败: {str(e)}")
+
+        if self._pending > 0:
+            self._after_id = self.root.after(self.poll_interval, self._poll)
+
+    def _set_pending(self, pending: int):
+        """更新未完成请求数，并在忙碌状态变化时通知"""
+        was_busy = self._pending > 0
+        self._pending = pending
+        if was_busy != (pending > 0) and self.on_busy_change is not None:
+            self.on_busy_change(pending > 0)
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'taskmanager.settings')
+# ASGI 下任务列表、详情、切换和统计页面使用异步视图，等待数据库时不占用线程
+os.environ.setdefault('TODO_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -45,6 +46,8 @@ LOGIN_REDIRECT_URL = 'task-list'
 LOGOUT_REDIRECT_URL = 'login'
 
 MIDDLEWARE = [
+    # 请求性能记录放在最前，总耗时包含其他中间件
+    'todo.profiling.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -92,6 +95,37 @@ DATABASES = {
     }
 }
 
+# 设置 TODO_SQLITE_PATH 改用 SQLite 数据库文件，不需要 MySQL 服务即可运行测试和本地开发
+if os.environ.get('TODO_SQLITE_PATH'):
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ['TODO_SQLITE_PATH'],
+        }
+    }
+
+
+# Cache
+# 默认使用进程内存，不需要外部服务。多进程部署时各进程的缓存互不可见，
+# 设置 TODO_CACHE_DIR 改用文件缓存，同一主机上的进程共享缓存和失效版本号
+
+if os.environ.get('TODO_CACHE_DIR'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ['TODO_CACHE_DIR'],
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'todo',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -138,4 +172,10 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # 在文件末尾添加以下配置
 LOGIN_URL = 'login'  # 告诉Django登录页面的URL名称是'login'
 LOGIN_REDIRECT_URL = 'task-list'  # 登录后重定向到任务列表
-LOGOUT_REDIRECT_URL = 'login'  # 登出后重定向到登录页面
\ No newline at end of file
+LOGOUT_REDIRECT_URL = 'login'  # 登出后重定向到登录页面
+
+# 是否使用 todo.async_views 中的异步视图，由 asgi.py 在 ASGI 下开启
+TODO_ASYNC_VIEWS = os.environ.get('TODO_ASYNC_VIEWS') == '1'
+
+# 是否记录每个请求中每条查询的 SQL 和参数，用于发现重复查询；默认只记查询数和耗时
+TODO_PROFILE_QUERIES = os.environ.get('TODO_PROFILE_QUERIES') == '1'
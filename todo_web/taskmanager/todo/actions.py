@@ -0,0 +1,89 @@
+"""任务完成状态的修改，同步视图和异步视图共用
+
+状态切换和批量标记都只执行一条带用户条件的 UPDATE，新值由数据库根据当前值计算，
+不先把任务读入 Python 再整行保存：连续点击或多个页面同时操作时不会互相覆盖。
+QuerySet.update() 不发送信号，也不会更新 auto_now 字段，这里手动更新时间并使缓存失效。
+"""
+from django.db import transaction
+from django.db.models import BooleanField, Case, Value, When
+from django.utils import timezone
+
+from .caching import invalidate_user_cache
+from .models import Task
+
+# 单次批量标记最多处理的任务数
+MAX_MARK_SIZE = 1000
+
+# SET done = NOT done，用 CASE 表达以兼容 MySQL/SQLite/PostgreSQL 的布尔类型
+_TOGGLED_DONE = Case(
+    When(done=True, then=Value(False)),
+    default=Value(True),
+    output_field=BooleanField(),
+)
+
+
+def toggle_task(user, pk):
+    """切换任务的完成状态
+
+    在一个事务中先执行 UPDATE，再按主键读取新状态。UPDATE 持有行锁直到事务结束，
+    读到的一定是本次切换的结果。
+
+    Args:
+        user: 任务所属用户，不属于该用户的任务视为不存在
+        pk: 任务ID
+
+    Returns:
+        切换后的完成状态，任务不存在时返回 None
+    """
+    queryset = Task.objects.filter(pk=pk, user=user)
+    with transaction.atomic(using=queryset.db):
+        if not queryset.update(done=_TOGGLED_DONE, updated_at=timezone.now()):
+            return None
+        done = queryset.values_list('done', flat=True).get()
+    invalidate_user_cache(user.pk)
+    return done
+
+
+def mark_tasks(user, ids, done):
+    """把多个任务标记为已完成或未完成
+
+    已经是目标状态的任务不会被修改，其更新时间保持不变。
+
+    Args:
+        user: 任务所属用户，不属于该用户的ID被忽略
+        ids: 任务ID列表
+        done: 目标完成状态
+
+    Returns:
+        实际修改的任务数
+    """
+    updated = Task.objects.filter(user=user, id__in=ids).exclude(done=done).update(
+        done=done, updated_at=timezone.now())
+    if updated:
+        invalidate_user_cache(user.pk)
+    return updated
+
+
+def read_mark_request(data):
+    """从表单数据中读取批量标记的参数
+
+    Args:
+        data: request.POST，包含多个 ids 和 done ('1' 或 '0')
+
+    Returns:
+        (任务ID列表, 目标完成状态)
+
+    Raises:
+        ValueError: 参数无效
+    """
+    try:
+        ids = [int(i) for i in data.getlist('ids')]
+    except ValueError:
+        raise ValueError("任务ID必须是整数") from None
+    if not ids:
+        raise ValueError("请先选择任务")
+    if len(ids) > MAX_MARK_SIZE:
+        raise ValueError(f"单次最多标记 {MAX_MARK_SIZE} 个任务")
+    if data.get('done') not in ('0', '1'):
+        raise ValueError("done 只能是 1 或 0")
+    return ids, data.get('done') == '1'
@@ -0,0 +1,239 @@
+import hashlib
+import json
+from functools import wraps
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, Max
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views.decorators.http import condition, require_http_methods
+
+from .caching import invalidate_user_cache
+from .forms import TaskForm
+from .listing import filter_tasks, get_sort, paginate_tasks
+from .models import Task
+
+# 单次请求最多处理的任务数
+MAX_BATCH_SIZE = 1000
+# 列表接口每页任务数的默认值和上限
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+# 允许通过接口修改的字段
+UPDATABLE_FIELDS = ('name', 'description', 'date', 'priority', 'done')
+
+
+class ApiError(Exception):
+    """请求无效，转换为 400 响应"""
+
+    def __init__(self, message, status=400, **extra):
+        super().__init__(message)
+        self.status = status
+        self.extra = extra
+
+
+def api_view(view):
+    """JSON 接口的公共处理：未登录返回 401，ApiError 转换为错误响应
+
+    接口使用会话认证，写请求需要在 X-CSRFToken 头中携带 csrftoken Cookie 的值。
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': '未登录'}, status=401)
+        try:
+            return view(request, *args, **kwargs)
+        except ApiError as e:
+            return JsonResponse({'error': str(e), **e.extra}, status=e.status)
+    return wrapper
+
+
+def serialize_task(task):
+    """任务的 JSON 表示"""
+    return {
+        'id': task.pk,
+        'name': task.name,
+        'description': task.description,
+        'date': task.date.isoformat(),
+        'priority': task.priority,
+        'done': task.done,
+        'created_at': task.created_at.isoformat() if task.created_at else None,
+        'updated_at': task.updated_at.isoformat() if task.updated_at else None,
+    }
+
+
+def _read_json(request):
+    try:
+        return json.loads(request.body or b'null')
+    except ValueError:
+        raise ApiError('请求体不是有效的 JSON')
+
+
+def _read_ids(data):
+    """读取 {"ids": [...]} 中的任务ID列表"""
+    ids = data.get('ids') if isinstance(data, dict) else None
+    if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+        raise ApiError('ids 必须是整数列表')
+    if len(ids) > MAX_BATCH_SIZE:
+        raise ApiError(f'单次最多处理 {MAX_BATCH_SIZE} 个任务')
+    return ids
+
+
+def _clean_fields(values, task=None):
+    """校验要修改的字段，返回 {字段: 转换后的值}"""
+    if not isinstance(values, dict) or not values:
+        raise ApiError('缺少要修改的字段')
+    unknown = set(values) - set(UPDATABLE_FIELDS)
+    if unknown:
+        raise ApiError(f"不支持修改的字段: {', '.join(sorted(unknown))}")
+
+    cleaned = {}
+    errors = {}
+    for name, value in values.items():
+        field = Task._meta.get_field(name)
+        try:
+            cleaned[name] = field.clean(value, task)
+        except ValidationError as e:
+            errors[name] = e.messages
+    if errors:
+        raise ApiError('字段校验失败', errors=errors)
+    return cleaned
+
+
+def _list_etag(request):
+    """列表的 ETag：用户任务数、最后修改时间与查询参数共同决定
+
+    只需一次走 (user, ...) 索引的聚合查询，内容未变化时直接返回 304，
+    不再查询和序列化任务列表。批量修改接口会同时更新 updated_at。
+    """
+    state = Task.objects.filter(user=request.user).aggregate(count=Count('id'), last=Max('updated_at'))
+    key = f"{state['count']}:{state['last']}:{request.GET.urlencode()}"
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+@condition(etag_func=_list_etag)
+def _list_tasks(request):
+    """分页列表，参数与任务列表页面相同，另支持 limit"""
+    try:
+        page_size = min(int(request.GET.get('limit', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+    except ValueError:
+        raise ApiError('limit 必须是整数')
+    if page_size < 1:
+        raise ApiError('limit 必须大于 0')
+
+    queryset = filter_tasks(Task.objects.filter(user=request.user), request.GET)
+    try:
+        tasks, next_cursor = paginate_tasks(
+            queryset, get_sort(request.GET), request.GET.get('cursor'), page_size)
+    except ValueError:
+        raise ApiError('无效的分页游标')
+    return JsonResponse({
+        'results': [serialize_task(task) for task in tasks],
+        'next_cursor': next_cursor,
+    })
+
+
+def _create_tasks(request):
+    """批量创建：{"tasks": [{name, date, priority, description, done}, ...]}
+
+    逐个用 TaskForm 校验，全部有效时在一个事务中 bulk_create，任一无效则都不创建。
+    MySQL 的 bulk_create 不返回自增ID，此时结果中的 id 为 null。
+    """
+    data = _read_json(request)
+    items = data.get('tasks') if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        raise ApiError('tasks 必须是非空列表')
+    if len(items) > MAX_BATCH_SIZE:
+        raise ApiError(f'单次最多创建 {MAX_BATCH_SIZE} 个任务')
+
+    tasks = []
+    errors = {}
+    for index, item in enumerate(items):
+        form = TaskForm(data=item if isinstance(item, dict) else {})
+        if form.is_valid():
+            task = form.save(commit=False)
+            task.user = request.user
+            tasks.append(task)
+        else:
+            errors[index] = form.errors.get_json_data()
+    if errors:
+        raise ApiError('任务校验失败', errors=errors)
+
+    # bulk_create 不会调用 auto_now/auto_now_add 以外的 save() 逻辑，也不发送信号
+    with transaction.atomic():
+        created = Task.objects.bulk_create(tasks, batch_size=MAX_BATCH_SIZE)
+    invalidate_user_cache(request.user.pk)
+    return JsonResponse({'results': [serialize_task(task) for task in created]}, status=201)
+
+
+def _update_tasks(request):
+    """批量部分更新，两种形式：
+
+    {"ids": [...], "set": {"done": true}}: 所有任务改为相同的值，一条 UPDATE 完成
+    {"tasks": [{"id": 1, "name": ...}, ...]}: 每个任务各自的修改，一次 bulk_update 完成
+
+    返回实际更新的任务ID，不属于当前用户或不存在的ID被忽略。
+    """
+    data = _read_json(request)
+    now = timezone.now()
+
+    if isinstance(data, dict) and 'ids' in data:
+        ids = _read_ids(data)
+        fields = _clean_fields(data.get('set'))
+        queryset = Task.objects.filter(user=request.user, id__in=ids)
+        with transaction.atomic():
+            updated = list(queryset.values_list('id', flat=True))
+            # QuerySet.update() 不会自动更新 auto_now 字段
+            queryset.update(**fields, updated_at=now)
+    else:
+        items = data.get('tasks') if isinstance(data, dict) else None
+        if not isinstance(items, list) or not items:
+            raise ApiError('需要 ids + set 或 tasks 列表')
+        if len(items) > MAX_BATCH_SIZE:
+            raise ApiError(f'单次最多更新 {MAX_BATCH_SIZE} 个任务')
+        if not all(isinstance(item, dict) and isinstance(item.get('id'), int) for item in items):
+            raise ApiError('tasks 中每一项都需要整数 id')
+
+        with transaction.atomic():
+            existing = Task.objects.select_for_update().filter(
+                user=request.user, id__in=[item['id'] for item in items]).in_bulk()
+            changed = {}
+            columns = {'updated_at'}
+            for item in items:
+                task = existing.get(item['id'])
+                if task is None:
+                    continue
+                values = {name: value for name, value in item.items() if name != 'id'}
+                for name, value in _clean_fields(values, task).items():
+                    setattr(task, name, value)
+                    columns.add(name)
+                task.updated_at = now
+                changed[task.pk] = task
+            if changed:
+                Task.objects.bulk_update(changed.values(), sorted(columns), batch_size=MAX_BATCH_SIZE)
+        updated = list(changed)
+
+    invalidate_user_cache(request.user.pk)
+    return JsonResponse({'updated': sorted(updated)})
+
+
+def _delete_tasks(request):
+    """批量删除：{"ids": [...]}，返回实际删除的任务数"""
+    ids = _read_ids(_read_json(request))
+    with transaction.atomic():
+        deleted, _ = Task.objects.filter(user=request.user, id__in=ids).delete()
+    invalidate_user_cache(request.user.pk)
+    return JsonResponse({'deleted': deleted})
+
+
+@api_view
+@require_http_methods(['GET', 'HEAD', 'POST', 'PATCH', 'DELETE'])
+def tasks_api(request):
+    """/api/tasks/：GET 列表，POST 批量创建，PATCH 批量更新，DELETE 批量删除"""
+    if request.method in ('GET', 'HEAD'):
+        return _list_tasks(request)
+    if request.method == 'POST':
+        return _create_tasks(request)
+    if request.method == 'PATCH':
+        return _update_tasks(request)
+    return _delete_tasks(request)
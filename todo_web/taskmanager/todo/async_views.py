@@ -0,0 +1,101 @@
+"""任务列表、详情、状态切换和统计页面的异步视图
+
+在 ASGI 下运行时 (见 taskmanager/asgi.py) 代替同名的同步视图：数据库访问使用
+Django 的异步 ORM，等待查询时不占用线程，每个工作进程可以同时处理更多请求。
+页面上下文与同步视图共用同一套构建函数，两者渲染结果一致。
+返回 TemplateResponse，模板在视图返回后由 Django 在线程中渲染。
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.http import Http404, HttpResponseBadRequest, HttpResponseNotAllowed
+from django.template.response import TemplateResponse
+
+from .actions import mark_tasks, read_mark_request, toggle_task
+from .caching import cache_user_page
+from .listing import apaginate_tasks, filter_tasks, get_sort
+from .models import Task
+from .stats import STATS_CACHE_TIMEOUT, aget_user_stats
+from .views import build_list_context, build_stats_context, mark_response, toggle_response
+
+
+def _load_user(request):
+    """在线程中读取会话和用户，之后模板和视图访问 request.user 不再查询数据库"""
+    return request.user if request.user.is_authenticated else None
+
+
+def async_login_required(view):
+    """异步视图的登录检查，未登录时重定向到登录页"""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await sync_to_async(_load_user)(request)
+        if user is None:
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+async def _get_task(request, pk):
+    task = await Task.objects.filter(pk=pk, user=request.user).afirst()
+    if task is None:
+        raise Http404("任务不存在")
+    return task
+
+
+# 任务列表
+@async_login_required
+@cache_user_page()
+async def task_list(request):
+    queryset = filter_tasks(Task.objects.filter(user=request.user), request.GET)
+    sort = get_sort(request.GET)
+    try:
+        tasks, next_cursor = await apaginate_tasks(queryset, sort, request.GET.get('cursor'))
+    except ValueError:
+        raise Http404("无效的分页游标")
+
+    context = build_list_context(request, sort, next_cursor, await aget_user_stats(request.user))
+    context['tasks'] = tasks
+    # 页面脚本通过 fetch 请求时只返回任务列表片段
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        return TemplateResponse(request, 'todo/task_list_page.html', context)
+    return TemplateResponse(request, 'todo/task_list.html', context)
+
+
+# 任务详情
+@async_login_required
+@cache_user_page()
+async def task_detail(request, pk):
+    task = await _get_task(request, pk)
+    return TemplateResponse(request, 'todo/task_detail.html', {'task': task})
+
+
+# 切换任务完成状态
+# Django 4.2 的 require_POST 不支持异步视图，请求方法在视图中检查
+@async_login_required
+async def toggle_task_status(request, pk):
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    # 更新和读取新状态需要在同一个事务中，整体放到线程中执行
+    return toggle_response(request, pk, await sync_to_async(toggle_task)(request.user, pk))
+
+
+# 批量标记任务完成状态
+@async_login_required
+async def mark_tasks_status(request):
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    try:
+        ids, done = read_mark_request(request.POST)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    return mark_response(request, ids, done, await sync_to_async(mark_tasks)(request.user, ids, done))
+
+
+# 统计信息
+@async_login_required
+@cache_user_page(STATS_CACHE_TIMEOUT)
+async def task_stats(request):
+    stats = await aget_user_stats(request.user)
+    recent_tasks = [task async for task in Task.objects.filter(user=request.user).order_by('-created_at')[:5]]
+    return TemplateResponse(request, 'todo/task_stats.html', build_stats_context(stats, recent_tasks))
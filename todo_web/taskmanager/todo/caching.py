@@ -0,0 +1,150 @@
+"""按用户划分的页面和数据缓存
+
+每个用户有一个缓存版本号，所有缓存键都包含它。任务增删改时只需把版本号加一
+(invalidate_user_cache)，该用户之前缓存的页面和统计随即全部失效，旧条目不再被读取，
+由过期时间或缓存淘汰清理，不需要逐个查找删除。
+
+页面缓存保存渲染后的完整响应，命中时既不查询数据库也不渲染模板。
+"""
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+# 页面缓存时间（秒），任务变化时通过版本号立即失效
+PAGE_CACHE_TIMEOUT = 300
+
+
+def _version_key(user_id):
+    return f'todo:version:{user_id}'
+
+
+def _new_version():
+    # 版本号被缓存淘汰后重新生成，取当前时间可保证不会与淘汰前用过的版本号重复
+    return time.time_ns()
+
+
+def get_cache_version(user_id):
+    """获取用户当前的缓存版本号，不存在时初始化"""
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = _new_version()
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+async def aget_cache_version(user_id):
+    """get_cache_version 的异步版本，供异步视图使用"""
+    key = _version_key(user_id)
+    version = await cache.aget(key)
+    if version is None:
+        version = _new_version()
+        if not await cache.aadd(key, version, None):
+            version = await cache.aget(key, version)
+    return version
+
+
+def user_cache_key(user_id, version, name):
+    """用户在某个版本下的缓存键"""
+    return f'todo:{user_id}:{version}:{name}'
+
+
+def invalidate_user_cache(user_id):
+    """任务变化后使用户的全部缓存失效
+
+    post_save/post_delete 信号会自动调用；QuerySet.update()、bulk_create()
+    等批量操作不发送信号，需要在操作后手动调用。
+    """
+    key = _version_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), None)
+
+
+def _page_name(request):
+    """页面缓存键中与请求相关的部分
+
+    页面表单中的 CSRF 令牌由 csrftoken Cookie 生成，Cookie 不同时不能共用缓存；
+    页面脚本请求的列表片段与完整页面地址相同，也需要区分。
+    """
+    parts = (
+        request.get_full_path(),
+        request.headers.get('x-requested-with', ''),
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+    )
+    return 'page:' + hashlib.md5('|'.join(parts).encode()).hexdigest()
+
+
+def _cacheable_request(request):
+    """只缓存已登录用户的 GET 请求
+
+    还没有 csrftoken Cookie 的请求在渲染时会生成新令牌；有待显示消息的页面
+    只显示一次，这两种情况都不读写缓存。
+    """
+    return (
+        request.method in ('GET', 'HEAD')
+        and request.user.is_authenticated
+        and settings.CSRF_COOKIE_NAME in request.COOKIES
+        and not len(get_messages(request))
+    )
+
+
+def _cacheable_response(response):
+    return response.status_code == 200 and not response.streaming and not response.cookies
+
+
+def _store(response, store):
+    """保存响应，TemplateResponse 要等渲染完成后再保存"""
+    # 页面内容因用户而异，不允许共享缓存保存
+    patch_cache_control(response, private=True)
+    patch_vary_headers(response, ('Cookie',))
+    if hasattr(response, 'render') and not response.is_rendered:
+        response.add_post_render_callback(store)
+    else:
+        store(response)
+
+
+def cache_user_page(timeout=PAGE_CACHE_TIMEOUT):
+    """按用户缓存视图的响应，同步和异步视图都可使用
+
+    Args:
+        timeout: 缓存时间（秒），页面内容随时间变化时应设置得更短
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if not _cacheable_request(request):
+                    return await view(request, *args, **kwargs)
+                version = await aget_cache_version(request.user.pk)
+                key = user_cache_key(request.user.pk, version, _page_name(request))
+                response = await cache.aget(key)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                    if _cacheable_response(response):
+                        # 渲染后的回调可能在线程中执行，这里使用同步接口
+                        _store(response, lambda r: cache.set(key, r, timeout))
+                return response
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not _cacheable_request(request):
+                return view(request, *args, **kwargs)
+            key = user_cache_key(request.user.pk, get_cache_version(request.user.pk), _page_name(request))
+            response = cache.get(key)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if _cacheable_response(response):
+                    _store(response, lambda r: cache.set(key, r, timeout))
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,140 @@
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import PRIORITY_RANK
+
+# 排序方式 -> [(字段, 是否降序)]，最后一个字段必须唯一，保证游标分页的顺序是全序
+SORT_ORDERS = {
+    'recent': [('created_at', True), ('id', True)],
+    'due_date': [('date', False), ('id', False)],
+    'priority': [('priority_rank', False), ('created_at', True), ('id', True)],
+}
+DEFAULT_SORT = 'recent'
+
+# 游标中各字段的解析函数
+_FIELD_PARSERS = {
+    'created_at': parse_datetime,
+    'date': parse_date,
+    'priority_rank': int,
+    'id': int,
+}
+
+
+def filter_tasks(queryset, params):
+    """按查询参数筛选任务
+
+    支持的参数：
+        status: all / pending / completed
+        priority: all / High / Medium / Low
+        date_from, date_to: 截止日期范围 (YYYY-MM-DD)，格式错误时忽略
+    """
+    status = params.get('status')
+    if status == 'pending':
+        queryset = queryset.filter(done=False)
+    elif status == 'completed':
+        queryset = queryset.filter(done=True)
+
+    priority = params.get('priority')
+    if priority in PRIORITY_RANK:
+        # 按排序值筛选，与优先级排序共用 (user, priority_rank, -created_at, -id) 索引
+        queryset = queryset.filter(priority_rank=PRIORITY_RANK[priority])
+
+    date_from = parse_date(params.get('date_from') or '')
+    if date_from:
+        queryset = queryset.filter(date__gte=date_from)
+    date_to = parse_date(params.get('date_to') or '')
+    if date_to:
+        queryset = queryset.filter(date__lte=date_to)
+    return queryset
+
+
+def get_sort(params):
+    """从查询参数中取排序方式，未知值使用默认排序"""
+    sort = params.get('sort')
+    return sort if sort in SORT_ORDERS else DEFAULT_SORT
+
+
+def sort_tasks(queryset, sort):
+    """按排序方式排序"""
+    return queryset.order_by(*[f"-{field}" if desc else field for field, desc in SORT_ORDERS[sort]])
+
+
+def encode_cursor(task, sort):
+    """将任务在排序中的位置编码为不透明的分页游标"""
+    values = []
+    for field, _ in SORT_ORDERS[sort]:
+        value = getattr(task, field)
+        values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(',', ':')).encode()).decode()
+
+
+def decode_cursor(cursor, sort):
+    """解析分页游标，格式错误时抛出 ValueError"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        fields = SORT_ORDERS[sort]
+        if len(values) != len(fields):
+            raise ValueError
+        parsed = [_FIELD_PARSERS[field](value) for (field, _), value in zip(fields, values)]
+    except Exception:
+        raise ValueError(f"无效的分页游标: {cursor}") from None
+    if any(value is None for value in parsed):
+        raise ValueError(f"无效的分页游标: {cursor}")
+    return parsed
+
+
+def _after(sort, values):
+    """排序位置在游标之后的条件：(a, b, c) > (x, y, z) 展开为逐字段比较"""
+    condition = Q()
+    equal = {}
+    for (field, desc), value in zip(SORT_ORDERS[sort], values):
+        condition |= Q(**equal, **{f"{field}__{'lt' if desc else 'gt'}": value})
+        equal[field] = value
+    return condition
+
+
+def paginate_tasks(queryset, sort, cursor=None, page_size=20):
+    """按游标分页
+
+    每一页都从游标位置通过索引定位，不使用 OFFSET，翻到任意深度的开销相同。
+
+    Args:
+        queryset: 已筛选的任务查询集
+        sort: SORT_ORDERS 中的排序方式
+        cursor: 上一页返回的游标，None 表示第一页
+        page_size: 每页任务数
+
+    Returns:
+        (任务列表, 下一页游标)，没有下一页时游标为 None
+
+    Raises:
+        ValueError: 游标无效
+    """
+    # 多取一条判断是否还有下一页
+    tasks = list(_page_queryset(queryset, sort, cursor, page_size))
+    return _split_page(tasks, sort, page_size)
+
+
+async def apaginate_tasks(queryset, sort, cursor=None, page_size=20):
+    """paginate_tasks 的异步版本，供异步视图使用"""
+    tasks = [task async for task in _page_queryset(queryset, sort, cursor, page_size)]
+    return _split_page(tasks, sort, page_size)
+
+
+def _page_queryset(queryset, sort, cursor, page_size):
+    """一页的查询：排序、从游标位置开始、多取一条"""
+    queryset = sort_tasks(queryset, sort)
+    if cursor:
+        queryset = queryset.filter(_after(sort, decode_cursor(cursor, sort)))
+    return queryset[:page_size + 1]
+
+
+def _split_page(tasks, sort, page_size):
+    """去掉多取的一条，返回 (任务列表, 下一页游标)"""
+    if len(tasks) > page_size:
+        tasks = tasks[:page_size]
+        return tasks, encode_cursor(tasks[-1], sort)
+    return tasks, None
@@ -0,0 +1,130 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from todo.caching import invalidate_user_cache
+from todo.listing import filter_tasks, paginate_tasks
+from todo.models import Task
+from todo.seeding import get_test_user, seed_tasks
+from todo.stats import get_user_stats
+
+
+def _page(user, sort, **params):
+    return lambda: paginate_tasks(filter_tasks(Task.objects.filter(user=user), params), sort)
+
+
+def _deep_page(user, sort, pages):
+    """连续翻 pages 页，计时最后一页"""
+    def run():
+        cursor = None
+        for _ in range(pages):
+            _, cursor = paginate_tasks(Task.objects.filter(user=user), sort, cursor)
+        return cursor
+    return run
+
+
+def _stats(user):
+    def run():
+        invalidate_user_cache(user.pk)
+        return get_user_stats(user)
+    return run
+
+
+class Command(BaseCommand):
+    help = '生成大量测试任务，测量任务列表和统计页面各种查询形态的耗时'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=50000, help='测试用户的任务数（默认 50000）')
+        parser.add_argument('--username', default='benchmark', help='测试用户名（默认 benchmark）')
+        parser.add_argument('--repeat', type=int, default=5, help='每种查询的执行次数，取中位数（默认 5）')
+        parser.add_argument(
+            '--compare', action='store_true',
+            help='先删除任务表的组合索引测量一次，再重建索引测量一次，需同时指定 --allow-index-changes')
+        parser.add_argument(
+            '--allow-index-changes', action='store_true',
+            help='允许 --compare 在当前数据库上删除并重建索引，测量期间其他请求的查询会变慢')
+        parser.add_argument('--cleanup', action='store_true', help='结束后删除测试用户及其任务')
+
+    def handle(self, *args, **options):
+        if options['compare'] and not options['allow_index_changes']:
+            raise CommandError('--compare 会删除并重建任务表的索引，确认不是生产数据库后请同时指定 --allow-index-changes')
+        # 结束时可能删除测试用户及其全部任务，真实用户的账号拒绝使用
+        try:
+            user = get_test_user(options['username'])
+        except ValueError as e:
+            raise CommandError(f"{e}，请用 --username 指定其他用户名")
+        existing = Task.objects.filter(user=user).count()
+        if existing < options['tasks']:
+            self.stdout.write(f"生成 {options['tasks'] - existing} 个任务…")
+            started = time.perf_counter()
+            seed_tasks(user, options['tasks'] - existing, seed=0)
+            self.stdout.write(f"生成完成，用时 {time.perf_counter() - started:.1f} 秒")
+
+        queries = {
+            '列表 最近创建': _page(user, 'recent'),
+            '列表 未完成': _page(user, 'recent', status='pending'),
+            '列表 高优先级': _page(user, 'recent', priority='High'),
+            '列表 按优先级排序': _page(user, 'priority'),
+            '列表 按截止日期排序': _page(user, 'due_date'),
+            '列表 第 50 页': _deep_page(user, 'recent', 50),
+            '统计 聚合查询': _stats(user),
+        }
+
+        try:
+            if options['compare']:
+                # 不回退迁移：较早的迁移没有 priority_rank 列，当前代码的查询无法执行
+                self.set_indexes(False)
+                try:
+                    before = self.measure(queries, options['repeat'])
+                finally:
+                    self.set_indexes(True)
+                after = self.measure(queries, options['repeat'])
+                self.report(queries, before, after)
+            else:
+                self.report(queries, self.measure(queries, options['repeat']))
+        finally:
+            if options['cleanup']:
+                Task.objects.filter(user=user).delete()
+                user.delete()
+
+    def set_indexes(self, enabled):
+        """删除或重建 Task.Meta.indexes 中的组合索引"""
+        with connection.schema_editor() as editor:
+            for index in Task._meta.indexes:
+                if enabled:
+                    editor.add_index(Task, index)
+                else:
+                    editor.remove_index(Task, index)
+
+    def measure(self, queries, repeat):
+        """执行每种查询 repeat 次，返回 {名称: (耗时中位数毫秒, SQL 语句数)}"""
+        results = {}
+        for name, run in queries.items():
+            run()  # 预热，排除首次连接和缓存加载
+            timings = []
+            for _ in range(repeat):
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    run()
+                    timings.append((time.perf_counter() - started) * 1000)
+            results[name] = (statistics.median(timings), len(captured))
+        return results
+
+    def report(self, queries, results, compared=None):
+        """输出耗时表，compared 为升级后的结果"""
+        if compared is None:
+            self.stdout.write(f"{'查询':<16}{'耗时(ms)':>12}{'SQL数':>8}")
+            for name in queries:
+                elapsed, count = results[name]
+                self.stdout.write(f"{name:<16}{elapsed:>12.2f}{count:>8}")
+            return
+
+        self.stdout.write(f"{'查询':<16}{'无索引(ms)':>12}{'组合索引(ms)':>14}{'加速':>8}")
+        for name in queries:
+            before, _ = results[name]
+            after, _ = compared[name]
+            speedup = before / after if after else float('inf')
+            self.stdout.write(f"{name:<16}{before:>12.2f}{after:>14.2f}{speedup:>7.1f}x")
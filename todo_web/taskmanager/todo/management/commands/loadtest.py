@@ -0,0 +1,261 @@
+import json
+import platform
+import random
+import re
+import statistics
+import subprocess
+import threading
+import time
+from datetime import timedelta
+
+from django import get_version
+from django.contrib.auth.models import Permission
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from todo.caching import invalidate_user_cache
+from todo.models import Task
+from todo.profiling import PERCENTILES, _percentile
+from todo.seeding import get_test_user, seed_tasks
+
+# 只读场景在前，toggle/create 会修改数据
+SCENARIOS = ('list', 'stats', 'admin', 'toggle', 'create')
+# toggle 场景轮流切换的任务数
+TOGGLE_TASKS = 1000
+
+_SERVER_TIMING_DB = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+
+def _request(scenario, client, rng, task_ids):
+    """发出一个场景请求，返回 (响应, 是否成功)"""
+    if scenario == 'list':
+        response = client.get(reverse('task-list'))
+        return response, response.status_code == 200
+    if scenario == 'stats':
+        response = client.get(reverse('task-stats'))
+        return response, response.status_code == 200
+    if scenario == 'admin':
+        response = client.get(reverse('admin:todo_task_changelist'))
+        return response, response.status_code == 200
+    if scenario == 'toggle':
+        response = client.post(
+            reverse('task-toggle', args=[rng.choice(task_ids)]), HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        return response, response.status_code == 200
+    response = client.post(reverse('task-create'), {
+        'name': f'压测任务 {rng.randrange(10 ** 6)}',
+        'description': '',
+        'date': (timezone.now().date() + timedelta(days=rng.randint(0, 30))).isoformat(),
+        'priority': rng.choice(['High', 'Medium', 'Low']),
+    })
+    # 创建成功后重定向到列表，表单校验失败时返回 200
+    return response, response.status_code == 302
+
+
+class Command(BaseCommand):
+    help = ('在进程内用 Django 测试客户端压测任务列表、统计、状态切换、创建和后台列表页面，'
+            '分别在不同任务数下测量吞吐量和延迟，结果写入 JSON 文件以便在不同提交之间比较')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,100000,1000000',
+                            help='测试用户的任务数，逗号分隔（默认 1000,100000,1000000）')
+        parser.add_argument('--requests', type=int, default=200, help='每个场景的请求数（默认 200）')
+        parser.add_argument('--concurrency', type=int, default=1, help='并发线程数，每个线程一个客户端（默认 1）')
+        parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                            help=f"要运行的场景，逗号分隔（默认 {','.join(SCENARIOS)}）")
+        parser.add_argument('--no-cache', action='store_true',
+                            help='每个请求前使用户缓存失效，测量不命中页面缓存时的性能')
+        parser.add_argument('--username', default='loadtest', help='测试用户名（默认 loadtest）')
+        parser.add_argument('--output', help='结果文件（默认 loadtest-<提交>.json）')
+        parser.add_argument('--baseline', help='之前的结果文件，输出延迟和吞吐量的变化')
+        parser.add_argument('--keep', action='store_true',
+                            help='结束后保留测试用户及其任务，下次运行时复用（默认删除）')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted(int(size) for size in options['sizes'].split(','))
+        except ValueError:
+            raise CommandError('--sizes 必须是逗号分隔的整数')
+        scenarios = [name for name in options['scenarios'].split(',') if name]
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"未知场景: {', '.join(sorted(unknown))}")
+        if options['requests'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--requests 和 --concurrency 必须大于 0')
+
+        # 测试用户是没有密码的普通用户；后台列表场景另用一个只能查看任务的管理员账号
+        users = [self.get_user(options['username'])]
+        admin = self.get_user(f"{options['username']}-admin", staff=True) if 'admin' in scenarios else None
+        if admin:
+            users.append(admin)
+        user = users[0]
+
+        commit = self.get_commit()
+        report = {
+            'meta': {
+                'commit': commit,
+                'timestamp': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': get_version(),
+                'database': connection.vendor,
+                'requests': options['requests'],
+                'concurrency': options['concurrency'],
+                'cache': not options['no_cache'],
+            },
+            'results': {},
+        }
+        try:
+            for size in sizes:
+                self.prepare(user, size)
+                task_ids = list(Task.objects.filter(user=user).values_list('id', flat=True)[:TOGGLE_TASKS])
+                results = {}
+                for scenario in scenarios:
+                    results[scenario] = self.measure(
+                        scenario, user, admin if scenario == 'admin' else user, task_ids,
+                        options['requests'], options['concurrency'], options['no_cache'])
+                report['results'][str(size)] = results
+                self.report(size, results)
+        finally:
+            if not options['keep']:
+                for account in users:
+                    Task.objects.filter(user=account).delete()
+                    account.delete()
+
+        output = options['output'] or f"loadtest-{(commit or 'local')[:8]}.json"
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"结果已写入 {output}"))
+
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as f:
+                self.compare(json.load(f), report)
+
+    def get_user(self, username, staff=False):
+        """获取或创建压测账号
+
+        压测结束后默认会删除账号及其全部任务，真实用户的账号拒绝使用 (见 get_test_user)。
+
+        Args:
+            username: 用户名
+            staff: 是否为后台列表场景的管理员账号，只授予查看任务的权限
+        """
+        try:
+            user = get_test_user(username)
+        except ValueError as e:
+            raise CommandError(f"{e}，请用 --username 指定其他用户名")
+        if staff:
+            if not user.is_staff:
+                user.is_staff = True
+                user.save(update_fields=['is_staff'])
+            user.user_permissions.add(Permission.objects.get(content_type__app_label='todo', codename='view_task'))
+        return user
+
+    def get_commit(self):
+        """当前 git 提交，不在仓库中时返回 None"""
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def prepare(self, user, size):
+        """使测试用户正好有 size 个任务"""
+        existing = Task.objects.filter(user=user).count()
+        if existing > size:
+            Task.objects.filter(user=user).delete()
+            existing = 0
+        if existing < size:
+            self.stdout.write(f"生成 {size - existing} 个任务…")
+            started = time.perf_counter()
+            seed_tasks(user, size - existing, seed=size)
+            self.stdout.write(f"生成完成，用时 {time.perf_counter() - started:.1f} 秒")
+
+    def measure(self, scenario, user, client_user, task_ids, requests, concurrency, no_cache):
+        """用 concurrency 个线程共发出 requests 个请求，返回吞吐量和延迟分位数
+
+        client_user 为发出请求的账号，user 为任务所属的测试用户，--no-cache 时使其缓存失效。
+        """
+        latencies = []
+        db_times = []
+        query_counts = []
+        errors = []
+        lock = threading.Lock()
+
+        def worker(index, count):
+            client = Client(HTTP_HOST='localhost', raise_request_exception=False)
+            client.force_login(client_user)
+            rng = random.Random(index)
+            # 预热：建立数据库连接、加载模板
+            _request(scenario, client, rng, task_ids)
+            try:
+                for _ in range(count):
+                    if no_cache:
+                        invalidate_user_cache(user.pk)
+                    started = time.perf_counter()
+                    response, ok = _request(scenario, client, rng, task_ids)
+                    elapsed = (time.perf_counter() - started) * 1000
+                    timing = _SERVER_TIMING_DB.search(response.get('Server-Timing', ''))
+                    with lock:
+                        latencies.append(elapsed)
+                        if timing:
+                            db_times.append(float(timing.group(1)))
+                            query_counts.append(int(timing.group(2)))
+                        if not ok:
+                            errors.append(response.status_code)
+            finally:
+                connections.close_all()
+
+        counts = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+        threads = [threading.Thread(target=worker, args=(i, count)) for i, count in enumerate(counts) if count]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        result = {
+            'requests': len(latencies),
+            'errors': len(errors),
+            'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed > 0 else None,
+            'latency_ms': {
+                'mean': round(statistics.mean(latencies), 2),
+                **{f'p{percent}': round(_percentile(latencies, percent), 2) for percent in PERCENTILES},
+                'max': round(latencies[-1], 2),
+            },
+        }
+        if db_times:
+            result['db_ms_median'] = round(statistics.median(db_times), 2)
+            result['queries_median'] = statistics.median(query_counts)
+        if errors:
+            result['error_statuses'] = sorted(set(errors))
+        return result
+
+    def report(self, size, results):
+        self.stdout.write(f"\n任务数 {size}")
+        self.stdout.write(f"{'场景':<8}{'请求/秒':>10}{'p50(ms)':>10}{'p90(ms)':>10}{'p99(ms)':>10}"
+                          f"{'SQL数':>8}{'失败':>6}")
+        for scenario, result in results.items():
+            latency = result['latency_ms']
+            self.stdout.write(
+                f"{scenario:<8}{result['throughput_rps']:>10.1f}{latency['p50']:>10.2f}{latency['p90']:>10.2f}"
+                f"{latency['p99']:>10.2f}{result.get('queries_median', '-'):>8}{result['errors']:>6}")
+
+    def compare(self, baseline, current):
+        """与之前的结果比较，只比较两次都运行过的任务数和场景"""
+        self.stdout.write(f"\n与 {baseline['meta'].get('commit') or '基线'} 比较 (当前/基线)")
+        self.stdout.write(f"{'任务数':<10}{'场景':<8}{'p50':>10}{'p99':>10}{'请求/秒':>10}")
+        for size, results in current['results'].items():
+            for scenario, result in results.items():
+                before = baseline['results'].get(size, {}).get(scenario)
+                if not before:
+                    continue
+                ratios = [
+                    result['latency_ms']['p50'] / before['latency_ms']['p50'] if before['latency_ms']['p50'] else 0,
+                    result['latency_ms']['p99'] / before['latency_ms']['p99'] if before['latency_ms']['p99'] else 0,
+                    result['throughput_rps'] / before['throughput_rps'] if before['throughput_rps'] else 0,
+                ]
+                self.stdout.write(f"{size:<10}{scenario:<8}" + ''.join(f"{ratio:>9.2f}x" for ratio in ratios))
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from todo.seeding import seed_users
+
+
+class Command(BaseCommand):
+    help = '批量生成 N 个测试用户，每个用户 M 个任务，用于基准测试和压力测试'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10, help='用户数（默认 10）')
+        parser.add_argument('--tasks', type=int, default=1000, help='每个用户的任务数（默认 1000）')
+        parser.add_argument('--prefix', default='user', help='用户名前缀，用户名为前缀加序号（默认 user）')
+        parser.add_argument('--password', help='用户密码，不指定时用户不能登录')
+        parser.add_argument('--seed', type=int, help='随机数种子，相同种子生成相同的数据')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        results = seed_users(
+            options['users'], options['tasks'], prefix=options['prefix'],
+            password=options['password'], seed=options['seed'])
+        elapsed = time.perf_counter() - started
+
+        created = sum(count for _, count in results)
+        rate = created / elapsed if elapsed > 0 else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(results)} 个用户，新生成 {created} 个任务，用时 {elapsed:.1f} 秒 ({rate:.0f} 个/秒)"))
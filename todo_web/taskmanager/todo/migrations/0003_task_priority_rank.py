@@ -0,0 +1,42 @@
+from django.db import migrations, models
+
+# 与 todo.models.PRIORITY_RANK 相同，迁移中不引用模型模块的当前代码
+PRIORITY_RANK = {'High': 0, 'Medium': 1, 'Low': 2}
+
+
+def fill_priority_rank(apps, schema_editor):
+    """按优先级写入已有任务的排序值，每个优先级一条 UPDATE"""
+    Task = apps.get_model('todo', 'Task')
+    for priority, rank in PRIORITY_RANK.items():
+        Task.objects.filter(priority=priority).update(priority_rank=rank)
+    Task.objects.exclude(priority__in=PRIORITY_RANK).update(priority_rank=len(PRIORITY_RANK))
+
+
+class Migration(migrations.Migration):
+    """优先级排序值保存为列
+
+    按优先级排序原先在查询时用 CASE 计算排序值，无法使用 (user, priority, -created_at) 索引，
+    每次都要对用户的全部任务排序。改为保存 priority_rank 列并按它建索引，
+    排序和按优先级筛选都走同一个索引，原来的 priority 索引随之删除。
+    """
+
+    dependencies = [
+        ('todo', '0002_task_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='priority_rank',
+            field=models.PositiveSmallIntegerField(default=1, editable=False, verbose_name='优先级排序值'),
+        ),
+        migrations.RunPython(fill_priority_rank, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='todo_task_user_priority_idx',
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'priority_rank', '-created_at', '-id'], name='todo_task_user_prio_rank_idx'),
+        ),
+    ]
@@ -2,9 +2,59 @@ from django.db import models
 
 # Create your models here.
 from django.db import models
+from django.db.models.lookups import Exact
 from django.contrib.auth.models import User
 from django.utils import timezone
 
+# 优先级排序值，数值越小越靠前
+PRIORITY_RANK = {'High': 0, 'Medium': 1, 'Low': 2}
+
+
+def priority_rank(priority):
+    """优先级的排序值，未知优先级排在最后"""
+    return PRIORITY_RANK.get(priority, len(PRIORITY_RANK))
+
+
+def priority_rank_expression(priority):
+    """UPDATE 中与 priority 的新值对应的排序值
+
+    priority 是字符串时直接计算；是 F()、Case 等表达式时生成按其结果取值的 CASE。
+    """
+    if isinstance(priority, str):
+        return priority_rank(priority)
+    return models.Case(
+        *[models.When(Exact(priority, name), then=models.Value(rank)) for name, rank in PRIORITY_RANK.items()],
+        default=models.Value(len(PRIORITY_RANK)),
+        output_field=models.PositiveSmallIntegerField(),
+    )
+
+
+class TaskQuerySet(models.QuerySet):
+    """批量写入时同步 priority_rank 的 QuerySet
+
+    bulk_create、bulk_update 和 update() 不调用 Task.save()，在这里根据 priority 写入排序值。
+    管理后台、API、测试数据生成以及 user.tasks 等关联管理器的批量写入都经过这些方法。
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.priority_rank = priority_rank(obj.priority)
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        if 'priority' in fields:
+            objs = list(objs)
+            for obj in objs:
+                obj.priority_rank = priority_rank(obj.priority)
+            fields = {*fields, 'priority_rank'}
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update(self, **kwargs):
+        if 'priority' in kwargs:
+            kwargs['priority_rank'] = priority_rank_expression(kwargs['priority'])
+        return super().update(**kwargs)
+
 
 class Task(models.Model):
     PRIORITY_CHOICES = [
@@ -17,15 +67,41 @@ class Task(models.Model):
     description = models.TextField(blank=True, null=True, verbose_name="任务描述")
     date = models.DateField(verbose_name="截止日期")
     priority = models.CharField(max_length=10, choices=PRIORITY_CHOICES, default='Medium', verbose_name="优先级")
+    # 按优先级排序时使用的排序值，由 save() 和 TaskQuerySet 的批量写入方法根据 priority 写入；
+    # 保存为列而不是查询时用 CASE 计算，排序才能走 (user, priority_rank, -created_at, -id) 索引
+    priority_rank = models.PositiveSmallIntegerField(
+        default=PRIORITY_RANK['Medium'], editable=False, verbose_name="优先级排序值")
     done = models.BooleanField(default=False, verbose_name="是否完成")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="创建时间")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="更新时间")
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tasks', verbose_name="用户")
 
+    objects = TaskQuerySet.as_manager()
+
     class Meta:
         verbose_name = "任务"
         verbose_name_plural = "任务"
         ordering = ['-created_at']
+        # 所有查询都先按用户筛选，组合索引以 user 开头，
+        # 后续列与筛选/排序一致，避免对用户的全部任务做 filesort
+        indexes = [
+            # 默认列表：按创建时间倒序；一周前统计 created_at__lte
+            models.Index(fields=['user', '-created_at'], name='todo_task_user_created_idx'),
+            # 按完成状态筛选、计数
+            models.Index(fields=['user', 'done', '-created_at'], name='todo_task_user_done_idx'),
+            # 按优先级筛选 (priority_rank 与 priority 一一对应)、排序
+            models.Index(fields=['user', 'priority_rank', '-created_at', '-id'], name='todo_task_user_prio_rank_idx'),
+            # 按截止日期排序、范围筛选
+            models.Index(fields=['user', 'date'], name='todo_task_user_date_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # bulk_create、bulk_update 和 QuerySet.update() 不调用 save()，由 TaskQuerySet 写入 priority_rank
+        self.priority_rank = priority_rank(self.priority)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'priority' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'priority_rank'}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.name
@@ -0,0 +1,241 @@
+"""请求性能记录：每个视图的总耗时、SQL 查询数量和耗时、模板渲染耗时、响应大小
+
+PerformanceMiddleware 为每个请求创建一份 RequestProfile：
+    - SQL：在每个数据库连接上安装 execute_wrapper，通过 ContextVar 找到当前请求，
+      异步视图在线程中执行的查询也能记入 (sync_to_async 会复制上下文)
+    - 模板：把 TemplateResponse 的模板换成计时的包装，只计加载和渲染模板的时间，
+      不含页面缓存等渲染后回调
+    - 默认只记查询数和总耗时；设置 TODO_PROFILE_QUERIES 后还记下每条查询的 SQL 和参数
+      (截断，每个请求有条数上限)，相同 SQL 和参数执行多次时视为重复查询，记录警告日志
+
+结果写入响应的 Server-Timing 头 (浏览器开发者工具可直接查看)，并按视图汇总到
+profile_store，管理员可通过 performance_stats 视图查看各项指标的分位数。
+汇总数据保存在进程内存中，多进程部署时每个进程各自统计。
+"""
+import logging
+import reprlib
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+# 每个视图保留的最近请求数，分位数基于这些样本计算
+MAX_SAMPLES = 1000
+# 汇总中给出的分位数
+PERCENTILES = (50, 90, 99)
+# 开启 TODO_PROFILE_QUERIES 时每个请求最多记录的查询数，以及 SQL 保留的长度
+MAX_RECORDED_QUERIES = 500
+MAX_SQL_LENGTH = 1000
+
+# 参数的字符串表示：长字符串和长列表截断，耗时和长度不随参数大小增长
+_params_repr = reprlib.Repr()
+_params_repr.maxstring = 100
+_params_repr.maxother = 100
+_params_repr.maxlist = _params_repr.maxtuple = 20
+
+_current_profile = ContextVar('todo_request_profile', default=None)
+
+
+class RequestProfile:
+    """一次请求的性能数据，耗时单位均为秒"""
+
+    def __init__(self, record_queries=False):
+        """
+        Args:
+            record_queries: 是否记录每条查询的 SQL 和参数，用于发现重复查询
+        """
+        self.start = time.perf_counter()
+        self.total = 0.0
+        self.query_count = 0
+        self.db = 0.0
+        # [(截断的 SQL, 参数的字符串表示)]，不记录时为 None
+        self.queries = [] if record_queries else None
+        self.template = 0.0
+        self.size = None
+
+    def duplicate_queries(self):
+        """重复执行的查询：{SQL: 多执行的次数}，没有记录查询时为空"""
+        counts = Counter(self.queries or ())
+        duplicates = Counter()
+        for (sql, _), count in counts.items():
+            if count > 1:
+                duplicates[sql] += count - 1
+        return duplicates
+
+    def server_timing(self):
+        """Server-Timing 头的值，耗时单位为毫秒"""
+        return ', '.join([
+            f'total;dur={self.total * 1000:.1f}',
+            f'db;dur={self.db * 1000:.1f};desc="{self.query_count} queries"',
+            f'tpl;dur={self.template * 1000:.1f}',
+        ])
+
+
+def _record_query(execute, sql, params, many, context):
+    """数据库连接的 execute_wrapper：当前请求在记录时计时，否则直接执行
+
+    executemany 的参数是整批数据，不记录 SQL 和参数，只计入查询数和耗时。
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.query_count += 1
+        profile.db += time.perf_counter() - start
+        queries = profile.queries
+        if queries is not None and not many and len(queries) < MAX_RECORDED_QUERIES:
+            queries.append((sql[:MAX_SQL_LENGTH], _params_repr.repr(params)))
+
+
+def _install_wrapper(connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def _percentile(values, percent):
+    """最近秩法计算分位数，values 已排序"""
+    index = max(0, -(-len(values) * percent // 100) - 1)
+    return values[index]
+
+
+class ProfileStore:
+    """按视图保存最近的请求性能数据，线程安全"""
+
+    def __init__(self, max_samples=MAX_SAMPLES):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=max_samples))
+
+    def add(self, view_name, profile):
+        sample = {
+            'total_ms': profile.total * 1000,
+            'db_ms': profile.db * 1000,
+            'queries': profile.query_count,
+            # 没有记录查询时不统计重复查询
+            'duplicate_queries': None if profile.queries is None else sum(profile.duplicate_queries().values()),
+            'template_ms': profile.template * 1000,
+            'size': profile.size,
+        }
+        with self._lock:
+            self._samples[view_name].append(sample)
+
+    def summary(self):
+        """各视图的请求数和各项指标的分位数
+
+        Returns:
+            {视图名: {'requests': n, 'total_ms': {'p50': ..., 'p90': ..., 'p99': ..., 'max': ...}, ...}}
+        """
+        with self._lock:
+            samples = {name: list(values) for name, values in self._samples.items()}
+
+        summary = {}
+        for name, values in sorted(samples.items()):
+            view = {'requests': len(values)}
+            for metric in ('total_ms', 'db_ms', 'queries', 'duplicate_queries', 'template_ms', 'size'):
+                # 流式响应没有大小，没有记录查询时没有重复查询数
+                data = sorted(value[metric] for value in values if value[metric] is not None)
+                if not data:
+                    continue
+                view[metric] = {f'p{percent}': round(_percentile(data, percent), 2) for percent in PERCENTILES}
+                view[metric]['max'] = round(data[-1], 2)
+            summary[name] = view
+        return summary
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+
+profile_store = ProfileStore()
+
+
+class PerformanceMiddleware:
+    """记录每个请求的性能数据，同时支持同步和异步请求
+
+    应放在 MIDDLEWARE 的第一位，使总耗时包含其他中间件的处理时间。
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        # 之后新建的连接在创建时安装，已存在的连接在这里安装
+        connection_created.connect(_install_wrapper, dispatch_uid='todo_profiling')
+        for connection in connections.all():
+            _install_wrapper(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        profile = RequestProfile(settings.TODO_PROFILE_QUERIES)
+        token = _current_profile.set(profile)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+        self._finish(request, response, profile)
+        return response
+
+    async def __acall__(self, request):
+        profile = RequestProfile(settings.TODO_PROFILE_QUERIES)
+        token = _current_profile.set(profile)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+        self._finish(request, response, profile)
+        return response
+
+    def process_template_response(self, request, response):
+        """加载模板并换成计时的包装；从缓存取出的响应已渲染，不再计时
+
+        渲染后回调 (如保存页面缓存) 在模板渲染之后执行，不计入模板耗时。
+        """
+        profile = _current_profile.get()
+        if profile is not None and not response.is_rendered:
+            start = time.perf_counter()
+            template = response.resolve_template(response.template_name)
+            profile.template += time.perf_counter() - start
+            response.template_name = _TimedTemplate(template, profile)
+        return response
+
+    def _finish(self, request, response, profile):
+        profile.total = time.perf_counter() - profile.start
+        if not response.streaming:
+            profile.size = len(response.content)
+        response['Server-Timing'] = profile.server_timing()
+
+        match = request.resolver_match
+        view_name = match.view_name if match else 'unresolved'
+        for sql, count in profile.duplicate_queries().items():
+            logger.warning(f"{view_name} 重复执行查询 {count} 次: {sql}")
+        profile_store.add(view_name, profile)
+
+
+class _TimedTemplate:
+    """包装已加载的模板，渲染耗时计入请求的模板耗时
+
+    TemplateResponse 的 template_name 可以是模板对象，渲染时直接调用其 render()。
+    """
+
+    def __init__(self, template, profile):
+        self.template = template
+        self.profile = profile
+
+    def render(self, context=None, request=None):
+        start = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            self.profile.template += time.perf_counter() - start
@@ -0,0 +1,118 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db.models import Max
+from django.utils import timezone
+
+from .caching import invalidate_user_cache
+from .models import Task
+
+_VERBS = ['整理', '撰写', '检查', '更新', '准备', '回复', '修复', '评审', '安排', '提交']
+_OBJECTS = ['周报', '会议纪要', '预算表', '客户邮件', '测试用例', '发布说明', '需求文档', '代码', '报销单', '演示文稿']
+
+
+def _random_task(rng, user, number, today, days):
+    """随机任务：中优先级最多；已过截止日期的任务大多已完成，未到期的大多未完成"""
+    date = today + timedelta(days=rng.randint(-days // 2, days // 2))
+    name = f"{rng.choice(_VERBS)}{rng.choice(_OBJECTS)} #{number}"
+    priority = rng.choices(['High', 'Medium', 'Low'], weights=[2, 5, 3])[0]
+    return Task(
+        user=user,
+        name=name,
+        date=date,
+        priority=priority,
+        done=rng.random() < (0.75 if date < today else 0.15),
+    )
+
+
+def seed_tasks(user, count, batch_size=1000, days=365, seed=None):
+    """为用户批量生成测试任务，用于基准测试和压力测试
+
+    任务名称、截止日期、优先级和完成状态随机生成 (见 _random_task)；创建时间按批次分布在
+    过去 days 天内，使“最近创建”排序和一周前统计都有真实的数据分布。
+    bulk_create 不发送 post_save 信号，完成后手动使用户缓存失效。
+
+    Args:
+        user: 任务所属用户
+        count: 生成的任务数
+        batch_size: 每次 bulk_create 插入的行数
+        days: 截止日期和创建时间的分布范围（天）
+        seed: 随机数种子，相同种子生成相同的数据
+
+    Returns:
+        实际生成的任务数
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    today = now.date()
+    batches = max(1, -(-count // batch_size))
+    created = 0
+
+    for batch in range(batches):
+        size = min(batch_size, count - created)
+        if size <= 0:
+            break
+        last_id = Task.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+        Task.objects.bulk_create(
+            [_random_task(rng, user, created + i + 1, today, days) for i in range(size)],
+            batch_size=batch_size)
+
+        # auto_now_add 总是写入当前时间，插入后把本批任务的创建时间改到过去
+        created_at = now - timedelta(days=days) * (batches - batch) / batches
+        Task.objects.filter(user=user, id__gt=last_id).update(created_at=created_at)
+        created += size
+
+    invalidate_user_cache(user.pk)
+    return created
+
+
+def get_test_user(username):
+    """获取或创建基准测试和压测使用的账号
+
+    新建的账号密码不可用，不能登录。测试结束后账号及其任务可能被删除，
+    有可用密码或超级用户权限的已有账号视为真实用户，拒绝使用。
+
+    Args:
+        username: 用户名
+
+    Raises:
+        ValueError: 同名的真实用户已存在
+    """
+    user, created = User.objects.get_or_create(username=username, defaults={'password': make_password(None)})
+    if not created and (user.has_usable_password() or user.is_superuser):
+        raise ValueError(f"用户 {username} 已存在且不是测试账号")
+    return user
+
+
+def seed_users(count, tasks_per_user, prefix='user', password=None, seed=None):
+    """批量创建测试用户，并为每个用户生成任务
+
+    用户名为 prefix 加序号；已存在的用户直接复用，只补足不够的任务数。
+    所有用户共用同一个密码哈希，避免逐个计算哈希的开销。
+
+    Args:
+        count: 用户数
+        tasks_per_user: 每个用户的任务数
+        prefix: 用户名前缀
+        password: 用户密码，None 表示不可登录
+        seed: 随机数种子，每个用户在此基础上加序号
+
+    Returns:
+        [(用户, 新生成的任务数)]
+    """
+    usernames = [f"{prefix}{i + 1}" for i in range(count)]
+    existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+    hashed = make_password(password)
+    User.objects.bulk_create(
+        [User(username=name, password=hashed) for name in usernames if name not in existing],
+        batch_size=1000)
+
+    results = []
+    users = User.objects.filter(username__in=usernames).order_by('id')
+    for index, user in enumerate(users):
+        missing = tasks_per_user - Task.objects.filter(user=user).count()
+        created = seed_tasks(user, missing, seed=None if seed is None else seed + index) if missing > 0 else 0
+        results.append((user, created))
+    return results
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import invalidate_user_cache
+from .models import Task
+
+
+# 任务增删改后使所属用户的页面和统计缓存失效
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def task_changed(sender, instance, **kwargs):
+    invalidate_user_cache(instance.user_id)
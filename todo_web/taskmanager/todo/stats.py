@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .caching import aget_cache_version, get_cache_version, user_cache_key
+from .models import Task
+
+# 统计结果的缓存时间（秒）。任务变化时通过用户缓存版本号立即失效，
+# 过期时间只用于让“一周前”这类随时间推移的统计保持新鲜
+STATS_CACHE_TIMEOUT = 60
+
+
+def _stats_aggregates():
+    """统计所需的全部条件计数，在一次聚合查询中完成"""
+    one_week_ago = timezone.now() - timedelta(days=7)
+    return {
+        'total': Count('id'),
+        'completed': Count('id', filter=Q(done=True)),
+        'high': Count('id', filter=Q(priority='High')),
+        'medium': Count('id', filter=Q(priority='Medium')),
+        'low': Count('id', filter=Q(priority='Low')),
+        'last_week_total': Count('id', filter=Q(created_at__lte=one_week_ago)),
+        'last_week_completed': Count('id', filter=Q(created_at__lte=one_week_ago, done=True)),
+    }
+
+
+def _build_stats(counts):
+    return {
+        'total': counts['total'],
+        'completed': counts['completed'],
+        'pending': counts['total'] - counts['completed'],
+        'priority': {
+            'High': counts['high'],
+            'Medium': counts['medium'],
+            'Low': counts['low'],
+        },
+        'last_week_total': counts['last_week_total'],
+        'last_week_completed': counts['last_week_completed'],
+    }
+
+
+def get_user_stats(user):
+    """获取用户的任务统计，一次条件聚合查询算出全部计数并缓存
+
+    返回的字典包含：
+        total / completed / pending: 任务总数、已完成数、未完成数
+        priority: {'High': n, 'Medium': n, 'Low': n}
+        last_week_total / last_week_completed: 一周前已存在的任务数及其中已完成数
+    """
+    key = user_cache_key(user.pk, get_cache_version(user.pk), 'stats')
+    stats = cache.get(key)
+    if stats is not None:
+        return stats
+
+    stats = _build_stats(Task.objects.filter(user=user).aggregate(**_stats_aggregates()))
+    cache.set(key, stats, STATS_CACHE_TIMEOUT)
+    return stats
+
+
+async def aget_user_stats(user):
+    """get_user_stats 的异步版本，供异步视图使用"""
+    key = user_cache_key(user.pk, await aget_cache_version(user.pk), 'stats')
+    stats = await cache.aget(key)
+    if stats is not None:
+        return stats
+
+    stats = _build_stats(await Task.objects.filter(user=user).aaggregate(**_stats_aggregates()))
+    await cache.aset(key, stats, STATS_CACHE_TIMEOUT)
+    return stats
+
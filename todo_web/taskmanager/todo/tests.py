@@ -1,3 +1,936 @@
-from django.test import TestCase
+import csv
+import importlib
+import io
+import json
+import re
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Case, Q, Value, When
+from django.core.management import CommandError, call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, resolve, reverse
+from django.utils import timezone
+
+from . import async_views, urls
+from .actions import MAX_MARK_SIZE, mark_tasks, toggle_task
+from .api import MAX_BATCH_SIZE
+from .caching import get_cache_version
+from .export import EXPORT_FIELDS
+from .listing import (
+    SORT_ORDERS, _after, decode_cursor, encode_cursor, filter_tasks, paginate_tasks, sort_tasks)
+from .models import PRIORITY_RANK, Task
+from .profiling import RequestProfile, _current_profile, _install_wrapper, profile_store
+from .stats import aget_user_stats, get_user_stats
+
+# 合法的 csrftoken Cookie 值 (32 个字母数字)，有该 Cookie 的请求才会使用页面缓存
+CSRF_COOKIE = 'a' * 32
+# 页面脚本发出的请求头
+XHR = {'X-Requested-With': 'XMLHttpRequest'}
+
+
+def create_task(user, name='任务', **fields):
+    fields.setdefault('date', date(2025, 3, 1))
+    return Task.objects.create(user=user, name=name, **fields)
+
+
+def task_queries(captured):
+    """捕获的查询中访问任务表的语句"""
+    return [query['sql'] for query in captured.captured_queries if 'todo_task' in query['sql']]
+
+
+class TaskTestCase(TestCase):
+    """已登录用户的测试基类 (同步和异步客户端)，每个测试前清空缓存"""
+
+    def setUp(self):
+        cache.clear()
+        # 测试数据库连接在中间件加载之前就已创建，不会再触发 connection_created；异步客户端
+        # 在事件循环线程中加载中间件，也不会为本线程 (sync_to_async 执行查询的线程) 的连接安装
+        _install_wrapper(connection)
+        self.user = User.objects.create_user('alice', password='secret')
+        self.other = User.objects.create_user('bob', password='secret')
+        for client in (self.client, self.async_client):
+            client.force_login(self.user)
+            client.cookies['csrftoken'] = CSRF_COOKIE
+
+    def json(self, method, url, data=None, **extra):
+        """发送 JSON 请求体"""
+        return getattr(self.client, method)(
+            url, json.dumps(data), content_type='application/json', **extra)
+
+
+class PageCacheTests(TaskTestCase):
+
+    def get_list(self, client=None, **extra):
+        client = client or self.client
+        with CaptureQueriesContext(connection) as captured:
+            response = client.get(reverse('task-list'), **extra)
+        self.assertEqual(response.status_code, 200)
+        return response, task_queries(captured)
+
+    def test_second_request_is_served_from_cache(self):
+        create_task(self.user, '写周报')
+        first, queries = self.get_list()
+        self.assertTrue(queries)
+        self.assertIn('private', first['Cache-Control'])
+        self.assertIn('Cookie', first['Vary'])
+
+        second, queries = self.get_list()
+        self.assertEqual(queries, [])
+        self.assertEqual(second.content, first.content)
+
+    def test_request_without_csrf_cookie_is_not_cached(self):
+        self.client.cookies.pop('csrftoken')
+        self.get_list()
+        self.client.cookies.pop('csrftoken', None)
+        _, queries = self.get_list()
+        self.assertTrue(queries)
+
+    def test_signals_bump_version(self):
+        version = get_cache_version(self.user.pk)
+        task = create_task(self.user)
+        self.assertNotEqual(get_cache_version(self.user.pk), version)
+
+        version = get_cache_version(self.user.pk)
+        task.delete()
+        self.assertNotEqual(get_cache_version(self.user.pk), version)
+
+    def test_other_users_tasks_do_not_bump_version(self):
+        version = get_cache_version(self.user.pk)
+        create_task(self.other)
+        self.assertEqual(get_cache_version(self.user.pk), version)
+
+    def test_saved_task_appears_on_cached_page(self):
+        self.get_list()
+        create_task(self.user, '新任务')
+        response, queries = self.get_list()
+        self.assertTrue(queries)
+        self.assertContains(response, '新任务')
+
+    def assert_invalidates(self, change):
+        """change 之后用户缓存版本号变化，缓存的列表页面重新查询"""
+        self.get_list()
+        version = get_cache_version(self.user.pk)
+        change()
+        self.assertNotEqual(get_cache_version(self.user.pk), version)
+        _, queries = self.get_list()
+        self.assertTrue(queries)
+
+    def test_toggle_invalidates(self):
+        task = create_task(self.user)
+        self.assert_invalidates(lambda: toggle_task(self.user, task.pk))
+
+    def test_mark_invalidates(self):
+        task = create_task(self.user)
+        self.assert_invalidates(lambda: mark_tasks(self.user, [task.pk], True))
+
+    def test_api_bulk_update_invalidates(self):
+        task = create_task(self.user)
+        url = reverse('api-tasks')
+        self.assert_invalidates(lambda: self.json('patch', url, {'ids': [task.pk], 'set': {'done': True}}))
+        self.assert_invalidates(lambda: self.json('patch', url, {'tasks': [{'id': task.pk, 'name': '改名'}]}))
+
+    def test_api_bulk_create_and_delete_invalidate(self):
+        url = reverse('api-tasks')
+        task = {'name': 'a', 'date': '2025-03-01', 'priority': 'Low'}
+        self.assert_invalidates(lambda: self.json('post', url, {'tasks': [task]}))
+        ids = list(Task.objects.filter(user=self.user).values_list('id', flat=True))
+        self.assert_invalidates(lambda: self.json('delete', url, {'ids': ids}))
+
+    def test_users_do_not_share_pages(self):
+        create_task(self.user, '甲的任务')
+        create_task(self.other, '乙的任务')
+        mine, _ = self.get_list()
+
+        other_client = self.client_class()
+        other_client.force_login(self.other)
+        other_client.cookies['csrftoken'] = CSRF_COOKIE
+        theirs, queries = self.get_list(other_client)
+        self.assertTrue(queries)
+        self.assertContains(mine, '甲的任务')
+        self.assertNotContains(mine, '乙的任务')
+        self.assertContains(theirs, '乙的任务')
+        self.assertNotContains(theirs, '甲的任务')
+
+    def test_xhr_fragment_and_full_page_are_cached_separately(self):
+        create_task(self.user, '写周报')
+        page, _ = self.get_list()
+        fragment, queries = self.get_list(HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertTrue(queries)
+        self.assertNotEqual(fragment.content, page.content)
+        self.assertNotIn(b'<html', fragment.content)
+
+        again, queries = self.get_list()
+        self.assertEqual(queries, [])
+        self.assertEqual(again.content, page.content)
+
+
+class ListingTests(TaskTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # 截止日期、优先级和创建时间都有大量相同的值，翻页顺序必须靠最后的 id 区分
+        priorities = list(PRIORITY_RANK)
+        for i in range(30):
+            create_task(self.user, f'任务 {i}', date=date(2025, 3, i % 3 + 1), priority=priorities[i % 3])
+        for i, task_id in enumerate(Task.objects.filter(user=self.user).values_list('id', flat=True)):
+            created_at = datetime(2025, 2, i % 4 + 1, tzinfo=dt_timezone.utc)
+            Task.objects.filter(pk=task_id).update(created_at=created_at)
+        create_task(self.other, '其他用户的任务')
+        self.tasks = Task.objects.filter(user=self.user)
+
+    def walk(self, sort, page_size, queryset=None):
+        """翻完所有页，返回每页的任务ID"""
+        queryset = self.tasks if queryset is None else queryset
+        pages = []
+        cursor = None
+        while True:
+            tasks, cursor = paginate_tasks(queryset, sort, cursor, page_size)
+            pages.append([task.pk for task in tasks])
+            if cursor is None:
+                return pages
+
+    def test_cursor_round_trip(self):
+        for sort, fields in SORT_ORDERS.items():
+            task = sort_tasks(self.tasks, sort)[7]
+            cursor = encode_cursor(task, sort)
+            self.assertNotIn('2025', cursor)
+            self.assertEqual(decode_cursor(cursor, sort), [getattr(task, field) for field, _ in fields])
+
+    def test_invalid_cursors(self):
+        task = self.tasks.first()
+        for cursor, sort in [
+            ('not a cursor!', 'recent'),
+            ('bm90IGpzb24=', 'recent'),  # not json
+            (encode_cursor(task, 'recent'), 'priority'),  # 字段数不同
+            ('WyJ4IiwxXQ==', 'due_date'),  # ["x",1]：日期格式错误
+            ('WyJ4IiwxXQ==', 'recent'),  # 时间格式错误
+        ]:
+            with self.subTest(cursor=cursor, sort=sort), self.assertRaises(ValueError):
+                decode_cursor(cursor, sort)
+
+    def test_after_expands_to_field_by_field_comparison(self):
+        created_at = datetime(2025, 2, 1, tzinfo=dt_timezone.utc)
+        self.assertEqual(
+            _after('recent', [created_at, 5]),
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=5))
+        self.assertEqual(
+            _after('due_date', [date(2025, 3, 1), 5]),
+            Q(date__gt=date(2025, 3, 1)) | Q(date=date(2025, 3, 1), id__gt=5))
+        self.assertEqual(
+            _after('priority', [1, created_at, 5]),
+            Q(priority_rank__gt=1)
+            | Q(priority_rank=1, created_at__lt=created_at)
+            | Q(priority_rank=1, created_at=created_at, id__lt=5))
+
+    def test_pages_cover_every_row_once(self):
+        for sort in SORT_ORDERS:
+            expected = list(sort_tasks(self.tasks, sort).values_list('id', flat=True))
+            for page_size in (1, 4, 30, 50):
+                with self.subTest(sort=sort, page_size=page_size):
+                    pages = self.walk(sort, page_size)
+                    ids = [task_id for page in pages for task_id in page]
+                    self.assertEqual(ids, expected)
+                    self.assertEqual(len(set(ids)), 30)
+                    self.assertTrue(all(len(page) == page_size for page in pages[:-1]))
+
+    def test_pages_cover_filtered_rows_once(self):
+        queryset = filter_tasks(self.tasks, {'priority': 'High', 'status': 'pending'})
+        expected = list(sort_tasks(queryset, 'priority').values_list('id', flat=True))
+        self.assertEqual(len(expected), 10)
+        self.assertEqual([i for page in self.walk('priority', 3, queryset) for i in page], expected)
+
+    def test_priority_sort_uses_stored_rank(self):
+        ranks = [task.priority_rank for task in sort_tasks(self.tasks, 'priority')]
+        self.assertEqual(ranks, sorted(ranks))
+        self.assertEqual(ranks[0], PRIORITY_RANK['High'])
+        self.assertNotIn('CASE', str(sort_tasks(self.tasks, 'priority').query))
+
+    def test_priority_rank_follows_priority(self):
+        task = create_task(self.user, priority='Low')
+        self.assertEqual(task.priority_rank, PRIORITY_RANK['Low'])
+        task.priority = 'High'
+        task.save(update_fields=['priority'])
+        task.refresh_from_db()
+        self.assertEqual(task.priority_rank, PRIORITY_RANK['High'])
+
+        url = reverse('api-tasks')
+        self.json('patch', url, {'ids': [task.pk], 'set': {'priority': 'Medium'}})
+        task.refresh_from_db()
+        self.assertEqual(task.priority_rank, PRIORITY_RANK['Medium'])
+        self.json('patch', url, {'tasks': [{'id': task.pk, 'priority': 'Low'}]})
+        task.refresh_from_db()
+        self.assertEqual(task.priority_rank, PRIORITY_RANK['Low'])
+        self.json('post', url, {'tasks': [{'name': 'a', 'date': '2025-03-01', 'priority': 'High'}]})
+        self.assertEqual(Task.objects.get(user=self.user, name='a').priority_rank, PRIORITY_RANK['High'])
+
+    def assert_ranks_match(self):
+        for priority, rank in Task.objects.values_list('priority', 'priority_rank'):
+            self.assertEqual(rank, PRIORITY_RANK[priority])
+
+    def test_bulk_writes_keep_priority_rank(self):
+        tasks = Task.objects.bulk_create([
+            Task(user=self.user, name=str(i), date=date(2025, 3, 1), priority='High') for i in range(3)])
+        self.assert_ranks_match()
+
+        Task.objects.filter(pk=tasks[0].pk).update(priority='Low')
+        self.user.tasks.filter(pk=tasks[1].pk).update(priority='Medium')
+        self.assert_ranks_match()
+
+        tasks[2].priority = 'Low'
+        Task.objects.bulk_update([tasks[2]], ['priority'])
+        self.assert_ranks_match()
+
+        # 新值是表达式时由数据库按其结果计算排序值
+        mine = Task.objects.filter(pk__in=[task.pk for task in tasks])
+        mine.update(priority=Case(When(name='2', then=Value('High')), default=Value('Low')))
+        self.assertEqual(
+            dict(mine.values_list('name', 'priority_rank')),
+            {'0': PRIORITY_RANK['Low'], '1': PRIORITY_RANK['Low'], '2': PRIORITY_RANK['High']})
+        self.assertEqual([task.name for task in sort_tasks(mine, 'priority')][0], '2')
+
+
+class TaskActionTests(TaskTestCase):
+
+    def test_toggle_returns_json_for_scripts(self):
+        task = create_task(self.user)
+        url = reverse('task-toggle', args=[task.pk])
+        response = self.client.post(url, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(response.json(), {'id': task.pk, 'done': True})
+        response = self.client.post(url, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(response.json(), {'id': task.pk, 'done': False})
+
+        response = self.client.post(url)
+        self.assertRedirects(response, reverse('task-detail', args=[task.pk]), fetch_redirect_response=False)
+        task.refresh_from_db()
+        self.assertTrue(task.done)
+
+    def test_toggle_is_one_update(self):
+        task = create_task(self.user)
+        updated_at = task.updated_at
+        with CaptureQueriesContext(connection) as captured:
+            self.assertTrue(toggle_task(self.user, task.pk))
+        # 新状态由 UPDATE 在数据库中计算，随后在同一个事务中按主键读回
+        self.assertEqual([sql.split()[0] for sql in task_queries(captured)], ['UPDATE', 'SELECT'])
+        task.refresh_from_db()
+        self.assertTrue(task.done)
+        self.assertGreater(task.updated_at, updated_at)
+        self.assertFalse(toggle_task(self.user, task.pk))
+        self.assertIsNone(toggle_task(self.other, task.pk))
+
+    def test_toggle_other_users_task_is_not_found(self):
+        task = create_task(self.other)
+        self.assertIsNone(toggle_task(self.user, task.pk))
+        response = self.client.post(reverse('task-toggle', args=[task.pk]))
+        self.assertEqual(response.status_code, 404)
+        task.refresh_from_db()
+        self.assertFalse(task.done)
+
+    def test_toggle_requires_post(self):
+        task = create_task(self.user)
+        self.assertEqual(self.client.get(reverse('task-toggle', args=[task.pk])).status_code, 405)
+
+    def test_mark_tasks(self):
+        tasks = [create_task(self.user, done=i == 0) for i in range(3)]
+        other = create_task(self.other)
+        ids = [task.pk for task in tasks] + [other.pk]
+
+        response = self.client.post(
+            reverse('task-mark'), {'ids': ids, 'done': '1'}, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        # 已完成的任务和其他用户的任务不计入
+        self.assertEqual(response.json(), {'ids': ids, 'done': True, 'updated': 2})
+        self.assertEqual(Task.objects.filter(user=self.user, done=True).count(), 3)
+        other.refresh_from_db()
+        self.assertFalse(other.done)
+
+        response = self.client.post(reverse('task-mark'), {'ids': ids[:1], 'done': '0'})
+        self.assertRedirects(response, reverse('task-list'), fetch_redirect_response=False)
+        self.assertEqual(mark_tasks(self.user, ids[:1], False), 0)
+
+    def test_mark_rejects_invalid_requests(self):
+        url = reverse('task-mark')
+        for data in [{'done': '1'}, {'ids': ['x'], 'done': '1'}, {'ids': [1], 'done': 'yes'},
+                     {'ids': list(range(MAX_MARK_SIZE + 1)), 'done': '1'}]:
+            with self.subTest(data=data):
+                self.assertEqual(self.client.post(url, data).status_code, 400)
+
+
+class TaskApiTests(TaskTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('api-tasks')
+
+    def test_anonymous_requests_get_401(self):
+        self.client.logout()
+        for method in ('post', 'patch', 'delete'):
+            with self.subTest(method=method):
+                response = self.json(method, self.url, {'ids': []})
+                self.assertEqual(response.status_code, 401)
+                self.assertEqual(response.json(), {'error': '未登录'})
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+
+    def test_list_pages_with_cursor(self):
+        for i in range(5):
+            create_task(self.user, f'任务 {i}')
+        create_task(self.other)
+        response = self.client.get(self.url, {'limit': 3})
+        data = response.json()
+        self.assertEqual(len(data['results']), 3)
+        data = self.client.get(self.url, {'limit': 3, 'cursor': data['next_cursor']}).json()
+        self.assertEqual(len(data['results']), 2)
+        self.assertIsNone(data['next_cursor'])
+
+        self.assertEqual(self.client.get(self.url, {'cursor': 'bad'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'limit': 0}).status_code, 400)
+
+    def test_etag_returns_304_until_tasks_change(self):
+        task = create_task(self.user)
+        response = self.client.get(self.url)
+        etag = response['ETag']
+
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        # 只有计算 ETag 的一次聚合查询
+        self.assertEqual(len(task_queries(captured)), 1)
+
+        # 查询参数不同时 ETag 不同
+        self.assertEqual(self.client.get(self.url, {'status': 'pending'}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        self.json('patch', self.url, {'ids': [task.pk], 'set': {'done': True}})
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_batch_size_limit(self):
+        too_many = MAX_BATCH_SIZE + 1
+        tasks = [{'name': 'a', 'date': '2025-03-01', 'priority': 'Low'}] * too_many
+        for method, data in [
+            ('post', {'tasks': tasks}),
+            ('patch', {'ids': list(range(too_many)), 'set': {'done': True}}),
+            ('patch', {'tasks': [{'id': i, 'done': True} for i in range(too_many)]}),
+            ('delete', {'ids': list(range(too_many))}),
+        ]:
+            with self.subTest(method=method, keys=list(data)):
+                response = self.json(method, self.url, data)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(str(MAX_BATCH_SIZE), response.json()['error'])
+        self.assertFalse(Task.objects.exists())
+
+    def test_bulk_create(self):
+        response = self.json('post', self.url, {'tasks': [
+            {'name': 'a', 'date': '2025-03-01', 'priority': 'High'},
+            {'name': 'b', 'date': '2025-03-02', 'priority': 'Low', 'done': True},
+        ]})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([task['name'] for task in response.json()['results']], ['a', 'b'])
+        self.assertEqual(
+            list(Task.objects.filter(user=self.user).order_by('name').values_list('name', 'done')),
+            [('a', False), ('b', True)])
+
+    def test_bulk_create_is_all_or_nothing(self):
+        response = self.json('post', self.url, {'tasks': [
+            {'name': 'a', 'date': '2025-03-01', 'priority': 'High'},
+            {'name': 'b', 'date': 'not a date', 'priority': 'Low'},
+        ]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.json()['errors']), ['1'])
+        self.assertFalse(Task.objects.exists())
+
+    def test_bulk_update_same_values(self):
+        mine = [create_task(self.user) for _ in range(3)]
+        other = create_task(self.other)
+        response = self.json('patch', self.url, {
+            'ids': [task.pk for task in mine[:2]] + [other.pk, 999999], 'set': {'done': True}})
+        self.assertEqual(response.json(), {'updated': [mine[0].pk, mine[1].pk]})
+        self.assertEqual(
+            list(Task.objects.filter(done=True).order_by('id').values_list('id', flat=True)),
+            [mine[0].pk, mine[1].pk])
+
+    def test_bulk_update_per_task_values(self):
+        a, b = create_task(self.user, 'a'), create_task(self.user, 'b')
+        other = create_task(self.other, 'c')
+        response = self.json('patch', self.url, {'tasks': [
+            {'id': a.pk, 'name': 'a2'}, {'id': b.pk, 'done': True}, {'id': other.pk, 'name': 'x'}]})
+        self.assertEqual(response.json(), {'updated': [a.pk, b.pk]})
+        a.refresh_from_db(), b.refresh_from_db(), other.refresh_from_db()
+        self.assertEqual((a.name, a.done, b.name, b.done, other.name), ('a2', False, 'b', True, 'c'))
+
+    def test_bulk_update_rejects_invalid_fields(self):
+        task = create_task(self.user)
+        for data in [
+            {'ids': [task.pk], 'set': {'user': self.other.pk}},
+            {'ids': [task.pk], 'set': {'priority': 'Urgent'}},
+            {'ids': [task.pk]},
+            {'tasks': [{'name': 'no id'}]},
+        ]:
+            with self.subTest(data=data):
+                self.assertEqual(self.json('patch', self.url, data).status_code, 400)
+        task.refresh_from_db()
+        self.assertEqual((task.user_id, task.priority), (self.user.pk, 'Medium'))
+
+    def test_bulk_delete(self):
+        mine = [create_task(self.user) for _ in range(3)]
+        other = create_task(self.other)
+        response = self.json('delete', self.url, {'ids': [mine[0].pk, mine[1].pk, other.pk]})
+        self.assertEqual(response.json(), {'deleted': 2})
+        self.assertEqual(list(Task.objects.values_list('id', flat=True).order_by('id')), [mine[2].pk, other.pk])
+        self.assertEqual(self.json('delete', self.url, {'ids': ['x']}).status_code, 400)
+
+
+class StatsTests(TaskTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # (优先级, 是否完成, 创建于几天前)
+        fixture = [
+            ('High', True, 30), ('High', False, 10), ('High', False, 1),
+            ('Medium', True, 8), ('Medium', True, 2),
+            ('Low', False, 0), ('Low', True, 0),
+        ]
+        now = timezone.now()
+        for priority, done, days in fixture:
+            task = create_task(self.user, priority=priority, done=done)
+            Task.objects.filter(pk=task.pk).update(created_at=now - timedelta(days=days))
+        create_task(self.other, priority='High', done=True)
+        cache.clear()
+
+    def test_counts_match_fixture(self):
+        with CaptureQueriesContext(connection) as captured:
+            stats = get_user_stats(self.user)
+        self.assertEqual(len(task_queries(captured)), 1)
+        self.assertEqual(stats, {
+            'total': 7,
+            'completed': 4,
+            'pending': 3,
+            'priority': {'High': 3, 'Medium': 2, 'Low': 2},
+            # 一周前已存在：High/30 (已完成)、High/10、Medium/8 (已完成)
+            'last_week_total': 3,
+            'last_week_completed': 2,
+        })
+
+    def test_async_counts_match_sync(self):
+        stats = get_user_stats(self.user)
+        cache.clear()
+        self.assertEqual(async_to_sync(aget_user_stats)(self.user), stats)
+
+    def test_stats_are_cached(self):
+        get_user_stats(self.user)
+        with CaptureQueriesContext(connection) as captured:
+            get_user_stats(self.user)
+        self.assertEqual(task_queries(captured), [])
+
+    def test_save_invalidates_cached_stats(self):
+        self.assertEqual(get_user_stats(self.user)['completed'], 4)
+        task = Task.objects.filter(user=self.user, done=False).first()
+        task.done = True
+        task.save()
+        self.assertEqual(get_user_stats(self.user)['completed'], 5)
+
+        create_task(self.user, priority='Low')
+        self.assertEqual(get_user_stats(self.user)['priority']['Low'], 3)
+        Task.objects.filter(user=self.user, priority='High').first().delete()
+        self.assertEqual(get_user_stats(self.user)['total'], 7)
+
+        # 其他用户的任务变化不影响缓存
+        get_user_stats(self.user)
+        create_task(self.other)
+        with CaptureQueriesContext(connection) as captured:
+            get_user_stats(self.user)
+        self.assertEqual(task_queries(captured), [])
+
+    def test_stats_page(self):
+        response = self.client.get(reverse('task-stats'))
+        self.assertEqual(response.context['completion_rate'], 57)
+        self.assertEqual(response.context['weekly_change']['total_tasks'], 4)
+
+        toggle_task(self.user, Task.objects.filter(user=self.user, done=False).first().pk)
+        response = self.client.get(reverse('task-stats'))
+        self.assertEqual(response.context['completed_tasks'], 5)
+
+
+class ExportTests(TaskTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.ids = [create_task(self.user, f'任务 {i}', done=i % 2 == 0).pk for i in range(10)]
+        create_task(self.other, '其他用户的任务')
+
+    def read_csv(self, content):
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0], list(EXPORT_FIELDS))
+        return [int(row[0]) for row in rows[1:]]
+
+    def test_sync_stream_covers_every_task_once_across_chunks(self):
+        with mock.patch('todo.export.EXPORT_CHUNK_SIZE', 3), CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse('task-export'))
+            self.assertFalse(response.is_async)
+            chunks = [chunk.decode() for chunk in response.streaming_content]
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('tasks.csv', response['Content-Disposition'])
+        # 文件头 + 4 块 (3+3+3+1)，每块一次查询，最后一次查询为空
+        self.assertEqual(len(chunks), 5)
+        self.assertEqual(len([sql for sql in task_queries(captured) if 'todo_task"."id" >' in sql]), 5)
+        self.assertEqual(self.read_csv(''.join(chunks)), self.ids)
+
+    def test_chunk_size_equal_to_task_count(self):
+        with mock.patch('todo.export.EXPORT_CHUNK_SIZE', 5):
+            response = self.client.get(reverse('task-export'), {'format': 'ndjson'})
+            lines = b''.join(response.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([row['id'] for row in rows], self.ids)
+        self.assertEqual(rows[0]['name'], '任务 0')
+        self.assertIs(rows[0]['done'], True)
+
+    def test_dates_match_the_api(self):
+        # 日期和时间与 API 一样使用 ISO 8601 格式，CSV 和 NDJSON 相同
+        expected = self.client.get(reverse('api-tasks'), {'limit': 100}).json()['results']
+        expected = {task['id']: task for task in expected}
+        ndjson = b''.join(self.client.get(reverse('task-export'), {'format': 'ndjson'}).streaming_content)
+        rows = list(csv.DictReader(io.StringIO(b''.join(
+            self.client.get(reverse('task-export')).streaming_content).decode())))
+        for row, line in zip(rows, ndjson.decode().splitlines()):
+            task = expected[int(row['id'])]
+            for field in ('date', 'created_at', 'updated_at'):
+                self.assertEqual(row[field], task[field])
+                self.assertEqual(json.loads(line)[field], task[field])
+            self.assertIn('T', row['created_at'])
+
+    async def test_asgi_stream_covers_every_task_once_across_chunks(self):
+        with mock.patch('todo.export.EXPORT_CHUNK_SIZE', 4):
+            response = await self.async_client.get(reverse('task-export'))
+            self.assertTrue(response.is_async)
+            chunks = [chunk.decode() async for chunk in response.streaming_content]
+        self.assertEqual(len(chunks), 4)
+        self.assertEqual(self.read_csv(''.join(chunks)), self.ids)
+
+        with mock.patch('todo.export.EXPORT_CHUNK_SIZE', 4):
+            response = await self.async_client.get(reverse('task-export'), {'format': 'ndjson'})
+            content = ''.join([chunk.decode() async for chunk in response.streaming_content])
+        self.assertEqual([json.loads(line)['id'] for line in content.splitlines()], self.ids)
+
+    def test_invalid_format(self):
+        self.assertEqual(self.client.get(reverse('task-export'), {'format': 'xml'}).status_code, 400)
+
+
+# Server-Timing 头：total;dur=..., db;dur=...;desc="N queries", tpl;dur=...
+SERVER_TIMING = re.compile(r'^total;dur=[\d.]+, db;dur=[\d.]+;desc="(\d+) queries", tpl;dur=([\d.]+)$')
+
+
+class PerformanceMiddlewareTests(TaskTestCase):
+
+    def setUp(self):
+        super().setUp()
+        profile_store.reset()
+        create_task(self.user)
+
+    def timing(self, response):
+        """响应的 (查询数, 模板渲染耗时)"""
+        match = SERVER_TIMING.match(response['Server-Timing'])
+        self.assertIsNotNone(match, response['Server-Timing'])
+        return int(match.group(1)), float(match.group(2))
+
+    def samples(self, view_name):
+        return profile_store._samples[view_name]
+
+    def test_sync_requests_report_their_own_queries(self):
+        counts = []
+        for _ in range(3):
+            cache.clear()
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.get(reverse('task-stats'))
+            queries, template = self.timing(response)
+            self.assertEqual(queries, len(captured))
+            self.assertGreater(template, 0)
+            counts.append(queries)
+        # 每个请求的计数从零开始，不累加上一个请求的查询
+        self.assertEqual(len(set(counts)), 1)
+        self.assertIsNone(_current_profile.get())
+
+        # 请求之外执行的查询不记入任何请求
+        list(Task.objects.all())
+        self.assertEqual([sample['queries'] for sample in self.samples('task-stats')], counts)
+
+    def test_cached_page_reports_fewer_queries(self):
+        uncached, _ = self.timing(self.client.get(reverse('task-list')))
+        cached, template = self.timing(self.client.get(reverse('task-list')))
+        self.assertLess(cached, uncached)
+        self.assertEqual(template, 0)
+
+    def test_streaming_response_has_header_without_size(self):
+        response = self.client.get(reverse('task-export'))
+        b''.join(response.streaming_content)
+        self.timing(response)
+        self.assertIsNone(self.samples('task-export')[0]['size'])
+
+    async def test_async_requests_report_their_own_queries(self):
+        counts = []
+        for _ in range(3):
+            await cache.aclear()
+            response = await self.async_client.get(reverse('api-tasks'))
+            self.assertEqual(response.status_code, 200)
+            counts.append(self.timing(response)[0])
+        self.assertGreater(counts[0], 0)
+        self.assertEqual(len(set(counts)), 1)
+        self.assertIsNone(_current_profile.get())
+        self.assertEqual([sample['queries'] for sample in self.samples('api-tasks')], counts)
+
+    async def test_streaming_queries_run_after_the_request(self):
+        # 流式响应的内容在中间件返回之后才生成，其中的查询不记入请求
+        response = await self.async_client.get(reverse('task-export'))
+        before = self.timing(response)[0]
+        b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(self.samples('task-export')[0]['queries'], before)
+        self.assertIsNone(_current_profile.get())
+
+    def test_template_time_excludes_page_cache_store(self):
+        original = cache.set
+
+        def slow_set(*args, **kwargs):
+            time.sleep(0.2)
+            return original(*args, **kwargs)
+
+        with mock.patch.object(cache, 'set', slow_set):
+            response = self.client.get(reverse('task-list'))
+        _, template = self.timing(response)
+        self.assertGreater(template, 0)
+        self.assertLess(template, 200)
+        self.assertGreaterEqual(self.samples('task-list')[0]['total_ms'], 200)
+
+    def test_queries_are_only_counted_by_default(self):
+        self.client.get(reverse('task-stats'))
+        sample = self.samples('task-stats')[0]
+        self.assertGreater(sample['queries'], 0)
+        self.assertIsNone(sample['duplicate_queries'])
+        self.assertNotIn('duplicate_queries', profile_store.summary()['task-stats'])
+
+        with override_settings(TODO_PROFILE_QUERIES=True):
+            self.client.get(reverse('task-stats'))
+        self.assertEqual(self.samples('task-stats')[1]['duplicate_queries'], 0)
+
+    def test_recorded_queries_are_bounded(self):
+        profile = RequestProfile(record_queries=True)
+        token = _current_profile.set(profile)
+        try:
+            with mock.patch('todo.profiling.MAX_RECORDED_QUERIES', 3):
+                for _ in range(2):
+                    Task.objects.filter(name='x' * 10000).exists()
+                with connection.cursor() as cursor:
+                    cursor.executemany(
+                        'UPDATE todo_task SET done = %s WHERE id = %s', [(False, i) for i in range(1000)])
+                for _ in range(3):
+                    Task.objects.exists()
+        finally:
+            _current_profile.reset(token)
+
+        self.assertEqual(profile.query_count, 6)
+        self.assertGreater(profile.db, 0)
+        # executemany 只计数，记录的查询不超过上限
+        self.assertEqual(len(profile.queries), 3)
+        self.assertTrue(all(len(params) < 1000 for _, params in profile.queries))
+        self.assertEqual(sum(profile.duplicate_queries().values()), 1)
+
+    def test_performance_stats_requires_staff(self):
+        self.client.get(reverse('task-list'))
+        response = self.client.get(reverse('performance-stats'))
+        self.assertEqual(response.status_code, 302)
+
+        self.user.is_staff = True
+        self.user.save()
+        summary = self.client.get(reverse('performance-stats')).json()
+        self.assertEqual(summary['task-list']['requests'], 1)
+        self.assertIn('p99', summary['task-list']['queries'])
+
+
+@override_settings(ALLOWED_HOSTS=['localhost'])
+class ManagementCommandTests(TransactionTestCase):
+    """管理命令的冒烟测试
+
+    压测命令在工作线程中使用各自的数据库连接，基准测试命令会删除和重建索引，
+    两者都不能在 TestCase 的事务中运行。压测客户端以 localhost 为主机名发出请求。
+    """
+
+    def test_seed_tasks(self):
+        out = io.StringIO()
+        call_command('seed_tasks', users=2, tasks=15, prefix='seed', seed=1, stdout=out)
+        self.assertIn('2 个用户，新生成 30 个任务', out.getvalue())
+        for user in User.objects.filter(username__in=['seed1', 'seed2']):
+            tasks = Task.objects.filter(user=user)
+            self.assertEqual(tasks.count(), 15)
+            self.assertFalse(user.has_usable_password())
+            # bulk_create 写入的排序值与优先级一致
+            for priority, rank in tasks.values_list('priority', 'priority_rank'):
+                self.assertEqual(PRIORITY_RANK[priority], rank)
+
+        # 再次运行只补足不够的任务数
+        call_command('seed_tasks', users=3, tasks=15, prefix='seed', password='secret', stdout=out)
+        self.assertIn('3 个用户，新生成 15 个任务', out.getvalue())
+        self.assertTrue(User.objects.get(username='seed3').check_password('secret'))
+
+    def test_benchmark_queries(self):
+        out = io.StringIO()
+        call_command('benchmark_queries', tasks=40, repeat=1, username='bench', stdout=out)
+        self.assertIn('列表 按优先级排序', out.getvalue())
+        self.assertEqual(Task.objects.filter(user__username='bench').count(), 40)
+
+        out = io.StringIO()
+        call_command(
+            'benchmark_queries', tasks=40, repeat=1, username='bench', compare=True, allow_index_changes=True,
+            cleanup=True, stdout=out)
+        self.assertIn('组合索引(ms)', out.getvalue())
+        self.assertFalse(User.objects.filter(username='bench').exists())
+        # 比较结束后索引已重建
+        with connection.cursor() as cursor:
+            indexes = connection.introspection.get_constraints(cursor, Task._meta.db_table)
+        self.assertTrue({index.name for index in Task._meta.indexes} <= set(indexes))
+
+    def test_benchmark_queries_guards(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark_queries', tasks=1, repeat=1, username='bench', compare=True, stdout=io.StringIO())
+        self.assertFalse(User.objects.filter(username='bench').exists())
+
+        alice = User.objects.create_user('alice', password='secret')
+        Task.objects.create(user=alice, name='a', date=date(2025, 3, 1), priority='Low')
+        with self.assertRaises(CommandError):
+            call_command('benchmark_queries', tasks=1, repeat=1, username='alice', cleanup=True, stdout=io.StringIO())
+        self.assertEqual(Task.objects.filter(user=alice).count(), 1)
+
+    def run_loadtest(self, *args):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = f'{tmp}/result.json'
+            call_command('loadtest', '--sizes=20', '--requests=2', f'--output={output}', *args, stdout=io.StringIO())
+            with open(output, encoding='utf-8') as f:
+                return json.load(f)
+
+    def test_runs_as_ordinary_user_and_cleans_up(self):
+        report = self.run_loadtest()
+        results = report['results']['20']
+        self.assertEqual(list(results), ['list', 'stats', 'admin', 'toggle', 'create'])
+        for scenario, result in results.items():
+            self.assertEqual((scenario, result['errors']), (scenario, 0))
+        self.assertFalse(User.objects.filter(username__startswith='loadtest').exists())
+        self.assertFalse(Task.objects.exists())
+
+    def test_keep_leaves_non_privileged_users(self):
+        self.run_loadtest('--keep', '--scenarios=list,admin')
+        # 保留的账号不能登录，再次运行时仍可使用
+        self.run_loadtest('--keep', '--scenarios=list,admin')
+        user = User.objects.get(username='loadtest')
+        self.assertFalse(user.is_staff or user.is_superuser or user.has_usable_password())
+        self.assertEqual(Task.objects.filter(user=user).count(), 20)
+        admin = User.objects.get(username='loadtest-admin')
+        self.assertTrue(admin.is_staff)
+        self.assertFalse(admin.is_superuser)
+        self.assertEqual(admin.get_all_permissions(), {'todo.view_task'})
+
+    def test_refuses_real_accounts(self):
+        User.objects.create_user('alice', password='secret')
+        with self.assertRaises(CommandError):
+            self.run_loadtest('--username=alice')
+        self.assertTrue(User.objects.filter(username='alice').exists())
+
+
+def reload_urls():
+    """按当前的 TODO_ASYNC_VIEWS 重新加载 URL 配置"""
+    importlib.reload(urls)
+    importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+    clear_url_caches()
+
+
+class AsyncViewTests(TaskTestCase):
+    """TODO_ASYNC_VIEWS 开启时的页面，用 AsyncClient 请求"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # 清理按注册的相反顺序执行：先恢复设置，再重新加载同步视图的 URL 配置
+        cls.addClassCleanup(reload_urls)
+        cls.enterClassContext(override_settings(TODO_ASYNC_VIEWS=True))
+        reload_urls()
+
+    def test_urls_use_async_views(self):
+        self.assertIs(resolve(reverse('task-list')).func, async_views.task_list)
+        self.assertIs(resolve(reverse('task-toggle', args=[1])).func, async_views.toggle_task_status)
+
+    async def test_anonymous_requests_redirect_to_login(self):
+        self.async_client.cookies.clear()
+        for url in [reverse('task-list'), reverse('task-detail', args=[1]), reverse('task-stats'),
+                    reverse('task-toggle', args=[1]), reverse('task-mark'), reverse('task-export')]:
+            with self.subTest(url=url):
+                response = await self.async_client.get(url)
+                self.assertRedirects(
+                    response, f"{reverse('login')}?next={url}", fetch_redirect_response=False)
+
+    async def test_status_changes_require_post(self):
+        for url in [reverse('task-toggle', args=[1]), reverse('task-mark')]:
+            with self.subTest(url=url):
+                response = await self.async_client.get(url)
+                self.assertEqual(response.status_code, 405)
+                self.assertEqual(response['Allow'], 'POST')
+
+    async def test_list_and_detail(self):
+        task = await Task.objects.acreate(user=self.user, name='甲的任务', date=date(2025, 3, 1))
+        other = await Task.objects.acreate(user=self.other, name='乙的任务', date=date(2025, 3, 1))
+
+        response = await self.async_client.get(reverse('task-list'))
+        self.assertContains(response, '甲的任务')
+        self.assertNotContains(response, '乙的任务')
+        response = await self.async_client.get(reverse('task-list'), headers=XHR)
+        self.assertContains(response, '甲的任务')
+        self.assertNotContains(response, '<html')
+        self.assertEqual((await self.async_client.get(reverse('task-list'), {'cursor': 'bad'})).status_code, 404)
+
+        response = await self.async_client.get(reverse('task-detail', args=[task.pk]))
+        self.assertContains(response, '甲的任务')
+        response = await self.async_client.get(reverse('task-detail', args=[other.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_toggle_and_mark(self):
+        task = await Task.objects.acreate(user=self.user, name='a', date=date(2025, 3, 1))
+        other = await Task.objects.acreate(user=self.other, name='b', date=date(2025, 3, 1))
+
+        url = reverse('task-toggle', args=[task.pk])
+        response = await self.async_client.post(url, headers=XHR)
+        self.assertEqual(response.json(), {'id': task.pk, 'done': True})
+        response = await self.async_client.post(url)
+        self.assertRedirects(response, reverse('task-detail', args=[task.pk]), fetch_redirect_response=False)
+        response = await self.async_client.post(reverse('task-toggle', args=[other.pk]))
+        self.assertEqual(response.status_code, 404)
+
+        response = await self.async_client.post(
+            reverse('task-mark'), {'ids': [task.pk, other.pk], 'done': '1'},
+            headers=XHR)
+        self.assertEqual(response.json(), {'ids': [task.pk, other.pk], 'done': True, 'updated': 1})
+        response = await self.async_client.post(reverse('task-mark'), {'done': '1'})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse((await Task.objects.aget(pk=other.pk)).done)
+
+    async def test_async_orm_queries_are_recorded(self):
+        await Task.objects.acreate(user=self.user, name='a', date=date(2025, 3, 1))
+        response = await self.async_client.get(reverse('task-stats'))
+        # 会话、用户、统计聚合和最近任务，都在 sync_to_async 的线程中执行
+        queries = int(SERVER_TIMING.match(response['Server-Timing']).group(1))
+        self.assertGreaterEqual(queries, 4)
+        self.assertIsNone(_current_profile.get())
+
+    async def test_stats(self):
+        for priority, done in [('High', True), ('High', False), ('Low', False)]:
+            await Task.objects.acreate(user=self.user, name='a', date=date(2025, 3, 1), priority=priority, done=done)
+        await Task.objects.acreate(user=self.other, name='b', date=date(2025, 3, 1), done=True)
+
+        response = await self.async_client.get(reverse('task-stats'))
+        self.assertEqual(response.status_code, 200)
+        context = response.context
+        self.assertEqual(
+            (context['total_tasks'], context['completed_tasks'], context['pending_tasks']), (3, 1, 2))
+        self.assertEqual(context['priority_counts'], {'High': 2, 'Medium': 0, 'Low': 1})
@@ -1,15 +1,29 @@
+from django.conf import settings
 from django.urls import path
-from .views import (
-    TaskListView, TaskDetailView, TaskCreateView,
-    TaskUpdateView, TaskDeleteView, toggle_task_status,
-    task_stats
-)
+from . import async_views, views
+from .views import TaskCreateView, TaskUpdateView, TaskDeleteView
+from .api import tasks_api
+from .export import export_tasks
+
+# ASGI 下使用异步视图，WSGI 下使用同步视图，两者的页面和行为相同
+if settings.TODO_ASYNC_VIEWS:
+    task_list = async_views.task_list
+    task_detail = async_views.task_detail
+    toggle_task_status = async_views.toggle_task_status
+    mark_tasks_status = async_views.mark_tasks_status
+    task_stats = async_views.task_stats
+else:
+    task_list = views.TaskListView.as_view()
+    task_detail = views.TaskDetailView.as_view()
+    toggle_task_status = views.toggle_task_status
+    mark_tasks_status = views.mark_tasks_status
+    task_stats = views.task_stats
 
 urlpatterns = [
     # 任务列表
-    path('', TaskListView.as_view(), name='task-list'),
+    path('', task_list, name='task-list'),
     # 任务详情
-    path('task/<int:pk>/', TaskDetailView.as_view(), name='task-detail'),
+    path('task/<int:pk>/', task_detail, name='task-detail'),
     # 创建任务
     path('task/new/', TaskCreateView.as_view(), name='task-create'),
     # 更新任务
@@ -18,6 +32,14 @@ urlpatterns = [
     path('task/<int:pk>/delete/', TaskDeleteView.as_view(), name='task-delete'),
     # 切换任务状态
     path('task/<int:pk>/toggle/', toggle_task_status, name='task-toggle'),
+    # 批量标记完成/未完成
+    path('task/mark/', mark_tasks_status, name='task-mark'),
     # 统计信息
     path('stats/', task_stats, name='task-stats'),
+    # 导出任务 (CSV / NDJSON 流式响应)
+    path('export/', export_tasks, name='task-export'),
+    # JSON 接口：列表、批量创建/更新/删除
+    path('api/tasks/', tasks_api, name='api-tasks'),
+    # 各视图的性能统计 (仅管理员，JSON)
+    path('perf/', views.performance_stats, name='performance-stats'),
 ]
@@ -1,39 +1,84 @@
-from django.shortcuts import render
-
 # Create your views here.
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import redirect
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404, HttpResponseBadRequest, JsonResponse
+from django.template.response import TemplateResponse
 from django.urls import reverse_lazy
-from django.db.models import Count
-from django.utils import timezone
-from datetime import timedelta
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import require_POST
 
+from .actions import mark_tasks, read_mark_request, toggle_task
+from .caching import cache_user_page
 from .models import Task
+from .profiling import profile_store
 from .forms import TaskForm
+from .listing import filter_tasks, get_sort, paginate_tasks
+from .stats import STATS_CACHE_TIMEOUT, get_user_stats
+
 
+def build_list_context(request, sort, next_cursor, stats):
+    """任务列表页面除任务外的上下文：筛选条件、翻页链接和统计，同步和异步视图共用"""
+    params = request.GET.copy()
+    params.pop('cursor', None)
+    context = {
+        'sort': sort,
+        'filters': {
+            'status': request.GET.get('status', 'all'),
+            'priority': request.GET.get('priority', 'all'),
+            'date_from': request.GET.get('date_from', ''),
+            'date_to': request.GET.get('date_to', ''),
+        },
+        'is_first_page': not request.GET.get('cursor'),
+        'first_query': params.urlencode(),
+        'total_tasks': stats['total'],
+        'completed_tasks': stats['completed'],
+        'pending_tasks': stats['pending'],
+    }
+    if next_cursor:
+        params['cursor'] = next_cursor
+        context['next_query'] = params.urlencode()
+    return context
 
-# 任务列表视图
+
+# 任务列表视图，完整页面和脚本请求的列表片段分别缓存
+@method_decorator(cache_user_page(), name='dispatch')
 class TaskListView(LoginRequiredMixin, ListView):
     model = Task
     template_name = 'todo/task_list.html'
     context_object_name = 'tasks'
+    # 每页任务数，按游标分页
+    page_size = 20
 
     def get_queryset(self):
-        # 只显示当前用户的任务
-        return Task.objects.filter(user=self.request.user)
+        # 只显示当前用户的任务，筛选条件来自查询参数
+        return filter_tasks(Task.objects.filter(user=self.request.user), self.request.GET)
+
+    def get_template_names(self):
+        # 页面脚本通过 fetch 请求时只返回任务列表片段
+        if self.request.headers.get('x-requested-with') == 'XMLHttpRequest':
+            return ['todo/task_list_page.html']
+        return super().get_template_names()
 
     def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        # 添加统计数据
-        context['total_tasks'] = self.get_queryset().count()
-        context['completed_tasks'] = self.get_queryset().filter(done=True).count()
-        context['pending_tasks'] = self.get_queryset().filter(done=False).count()
+        sort = get_sort(self.request.GET)
+        try:
+            tasks, next_cursor = paginate_tasks(
+                self.object_list, sort, self.request.GET.get('cursor'), self.page_size)
+        except ValueError:
+            raise Http404("无效的分页游标")
+
+        context = super().get_context_data(object_list=tasks, **kwargs)
+        # 添加统计数据（一次聚合查询，结果缓存）
+        context.update(build_list_context(
+            self.request, sort, next_cursor, get_user_stats(self.request.user)))
         return context
 
 
 # 任务详情视图
+@method_decorator(cache_user_page(), name='dispatch')
 class TaskDetailView(LoginRequiredMixin, DetailView):
     model = Task
     template_name = 'todo/task_detail.html'
@@ -78,62 +123,72 @@ class TaskDeleteView(LoginRequiredMixin, DeleteView):
         return Task.objects.filter(user=self.request.user)
 
 
+def toggle_response(request, pk, done):
+    """状态切换的响应：页面脚本请求时返回 JSON，否则回到详情页，同步和异步视图共用"""
+    if done is None:
+        raise Http404("任务不存在")
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        return JsonResponse({'id': pk, 'done': done})
+    return redirect('task-detail', pk=pk)
+
+
+def mark_response(request, ids, done, updated):
+    """批量标记的响应：页面脚本请求时返回 JSON，否则回到任务列表，同步和异步视图共用"""
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        return JsonResponse({'ids': ids, 'done': done, 'updated': updated})
+    return redirect('task-list')
+
+
 # 切换任务完成状态
 @login_required
+@require_POST
 def toggle_task_status(request, pk):
-    task = get_object_or_404(Task, pk=pk, user=request.user)
-    task.done = not task.done
-    task.save()
-    return redirect('task-detail', pk=pk)
+    return toggle_response(request, pk, toggle_task(request.user, pk))
 
 
-# 统计信息视图
+# 批量标记任务完成状态
 @login_required
-def task_stats(request):
-    # 获取当前用户的所有任务
-    tasks = Task.objects.filter(user=request.user)
+@require_POST
+def mark_tasks_status(request):
+    try:
+        ids, done = read_mark_request(request.POST)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    return mark_response(request, ids, done, mark_tasks(request.user, ids, done))
+
 
+def build_stats_context(stats, recent_tasks):
+    """由统计摘要构建统计页面的上下文，同步和异步视图共用"""
     # 基本统计
-    total_tasks = tasks.count()
-    completed_tasks = tasks.filter(done=True).count()
-    pending_tasks = total_tasks - completed_tasks
+    total_tasks = stats['total']
+    completed_tasks = stats['completed']
+    pending_tasks = stats['pending']
     completion_rate = round((completed_tasks / total_tasks) * 100) if total_tasks > 0 else 0
 
     # 计算环形图角度（360度的百分比）
     completion_angle = completion_rate * 3.6  # 这里预先计算好角度
 
     # 优先级分布
-    priority_counts = tasks.values('priority').annotate(count=Count('id')).order_by('priority')
-    priority_data = {
-        'High': 0,
-        'Medium': 0,
-        'Low': 0
-    }
-    for item in priority_counts:
-        priority_data[item['priority']] = item['count']
+    priority_data = stats['priority']
 
     # 计算百分比
     priority_percentages = {}
     for priority, count in priority_data.items():
         priority_percentages[priority] = round((count / total_tasks) * 100) if total_tasks > 0 else 0
 
-    # 最近任务
-    recent_tasks = tasks.order_by('-created_at')[:5]
-
     # 周变化统计
-    one_week_ago = timezone.now() - timedelta(days=7)
-    last_week_tasks = tasks.filter(created_at__lte=one_week_ago)
-    last_week_completed = last_week_tasks.filter(done=True).count()
+    last_week_total = stats['last_week_total']
+    last_week_completed = stats['last_week_completed']
 
     weekly_change = {
-        'total_tasks': total_tasks - last_week_tasks.count(),
+        'total_tasks': total_tasks - last_week_total,
         'completed_tasks': completed_tasks - last_week_completed,
-        'pending_tasks': pending_tasks - (last_week_tasks.count() - last_week_completed),
+        'pending_tasks': pending_tasks - (last_week_total - last_week_completed),
         'completion_rate': completion_rate - (
-            round((last_week_completed / last_week_tasks.count()) * 100) if last_week_tasks.count() > 0 else 0)
+            round((last_week_completed / last_week_total) * 100) if last_week_total > 0 else 0)
     }
 
-    context = {
+    return {
         'total_tasks': total_tasks,
         'completed_tasks': completed_tasks,
         'pending_tasks': pending_tasks,
@@ -145,4 +200,25 @@ def task_stats(request):
         'weekly_change': weekly_change
     }
 
-    return render(request, 'todo/task_stats.html', context)
+
+# 统计信息视图，包含随时间变化的周统计，缓存时间与统计数据相同
+@login_required
+@cache_user_page(STATS_CACHE_TIMEOUT)
+def task_stats(request):
+    # 全部计数来自一次条件聚合查询，结果缓存，任务变化时由信号失效
+    stats = get_user_stats(request.user)
+    # 最近任务
+    recent_tasks = Task.objects.filter(user=request.user).order_by('-created_at')[:5]
+    context = build_stats_context(stats, recent_tasks)
+
+    # TemplateResponse 延迟到中间件之后渲染，性能记录可以单独统计模板渲染耗时
+    return TemplateResponse(request, 'todo/task_stats.html', context)
+
+
+# 性能统计，仅管理员可见
+@staff_member_required
+def performance_stats(request):
+    """各视图最近请求的耗时、查询数、模板渲染耗时和响应大小的分位数"""
+    if request.method == 'POST' and request.POST.get('reset'):
+        profile_store.reset()
+    return JsonResponse(profile_store.summary(), json_dumps_params={'ensure_ascii': False, 'indent': 2})